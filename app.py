@@ -1,19 +1,114 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort
+from flask import (Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort,
+                   Response, has_request_context, stream_with_context)
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from markupsafe import Markup, escape
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import base64
+import json
 import os
+import re
+import threading
+
+# Perfiles de rendimiento de SQLite (variable de entorno TASKS_DB_PROFILE)
+SQLITE_PROFILES = {
+    # Valores de fábrica de SQLite y de SQLAlchemy
+    'default': {'pragmas': {}, 'engine_options': {}, 'immediate_writes': False},
+    # Varios procesos (workers de gunicorn) leyendo y escribiendo a la vez
+    'tuned': {
+        'pragmas': {
+            'journal_mode': 'WAL',      # los lectores no bloquean al escritor ni al revés
+            'synchronous': 'NORMAL',    # con WAL, fsync en los checkpoints y no en cada commit
+            'busy_timeout': 10000,      # ms esperando al otro escritor antes de "database is locked"
+            'cache_size': -65536,       # KiB negativos: 64 MiB de caché de páginas por conexión
+            'mmap_size': 268435456,     # 256 MiB de la BD leídos con mmap
+            'temp_store': 'MEMORY',
+        },
+        'engine_options': {
+            # Conexiones abiertas (con sus pragmas y su caché) reutilizadas entre peticiones
+            'pool_size': 8,
+            'max_overflow': 8,
+            'pool_timeout': 10,
+        },
+        # Las peticiones que escriben empiezan con BEGIN IMMEDIATE: esperan su
+        # turno con busy_timeout en lugar de fallar al pasar de lectura a escritura
+        'immediate_writes': True,
+    },
+}
+
+
+def is_sqlite_file(uri):
+    """True si la URI es una BD SQLite en disco (las de memoria usan StaticPool, sin pool_size)"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite':
+        return False
+    return url.database not in (None, '', ':memory:') and url.query.get('mode') != 'memory'
+
 
 # Configuración
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tasks.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('TASKS_DATABASE_URI', 'sqlite:///tasks.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['TASKS_DB_PROFILE'] = os.environ.get('TASKS_DB_PROFILE', 'tuned')
+db_profile = SQLITE_PROFILES[app.config['TASKS_DB_PROFILE']]
+if is_sqlite_file(app.config['SQLALCHEMY_DATABASE_URI']):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_profile['engine_options']
 # Cambia esta clave por una más segura en producción
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev_secret_key_123')
 
 db = SQLAlchemy(app)
 
+
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Aplica los pragmas del perfil a cada conexión nueva del pool"""
+    if db_profile['immediate_writes']:
+        # Las transacciones las abre begin_transaction(), no el driver sqlite3
+        dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for name, value in db_profile['pragmas'].items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+def begin_transaction(connection):
+    """BEGIN IMMEDIATE en peticiones que escriben; BEGIN (diferido) en el resto"""
+    writing = has_request_context() and request.method not in ('GET', 'HEAD', 'OPTIONS')
+    connection.exec_driver_sql('BEGIN IMMEDIATE' if writing else 'BEGIN')
+
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', configure_sqlite_connection)
+        if db_profile['immediate_writes']:
+            event.listen(db.engine, 'begin', begin_transaction)
+
+# Paginación de la API: tareas por página si no se indica ?limit= y máximo permitido
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+# Filas que se leen de la BD de cada vez al emitir NDJSON
+NDJSON_BATCH_SIZE = 500
+# Operaciones masivas: elementos por transacción y máximo por petición
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_ITEMS = 100_000
+# Respuestas de GET /api/tasks guardadas en memoria por versión de la tabla (0 = sin caché)
+TASKS_CACHE_SIZE = 128
+# Búsqueda: resultados por página si no se indica ?limit= y máximo permitido
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+# bm25 se calcula para cada coincidencia: con términos que aparecen en
+# casi todas las tareas solo se ordenan las N coincidencias más recientes
+SEARCH_RANK_CANDIDATES = 10_000
+
 # Modelo
 class Task(db.Model):
+    __table_args__ = (
+        # Listado por fecha y paginación por (created_at, id) sin recorrer la tabla
+        db.Index('ix_task_created_at_id', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -30,6 +125,221 @@ class Task(db.Model):
         }
 
 
+class TableVersion(db.Model):
+    """Contador de cambios por tabla: sube con cada escritura (ETag de la API)"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Índice de texto completo de las tareas (SQLite FTS5). Es una tabla de
+# "contenido externo": guarda solo el índice y los triggers lo mantienen
+# al día con cada INSERT, UPDATE y DELETE sobre task, incluidos los masivos
+TASK_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        title, description, content='task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+)
+
+# Marcas que devuelve FTS5 alrededor de cada coincidencia (se cambian por
+# <mark> después de escapar el texto)
+SEARCH_MARK_START = '\x02'
+SEARCH_MARK_END = '\x03'
+
+
+def init_db():
+    """
+    Crea las tablas, los índices y la fila de versión que falten (también en
+    una BD ya existente). Se llama al importar la app; con varios workers
+    conviene lanzar antes `flask --app app init-db` una vez
+    """
+    db.create_all()
+    for index in Task.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    if db.session.get(TableVersion, Task.__tablename__) is None:
+        db.session.add(TableVersion(name=Task.__tablename__))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otro worker la ha creado a la vez
+            db.session.rollback()
+    if db.engine.dialect.name == 'sqlite':
+        init_search_index()
+
+
+def init_search_index():
+    """Crea task_fts y sus triggers; si la tabla es nueva, indexa las tareas existentes"""
+    exists = db.session.execute(
+        db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'")
+    ).first()
+    for statement in TASK_FTS_DDL:
+        db.session.execute(db.text(statement))
+    if exists is None:
+        db.session.execute(db.text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def bump_tasks_version():
+    """
+    Marca la tabla de tareas como modificada (en la misma transacción que la
+    escritura). Si falta la fila de versión la crea, con una versión sacada
+    del reloj para no repetir un ETag que algún cliente ya tenga
+    """
+    now = datetime.utcnow()
+    result = db.session.execute(
+        db.update(TableVersion)
+        .where(TableVersion.name == Task.__tablename__)
+        .values(version=TableVersion.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.session.add(TableVersion(name=Task.__tablename__,
+                                    version=int(now.timestamp() * 1000), updated_at=now))
+
+
+# Cualquier escritura en task hecha con la sesión (rutas, operaciones masivas,
+# scripts de carga) sube la versión al hacer commit: ETags y tasks_cache nunca
+# sirven una tabla antigua aunque quien escribe no llame a bump_tasks_version()
+@event.listens_for(db.session, 'after_flush')
+def track_task_flush(session, flush_context):
+    """Objetos Task creados, modificados o borrados en el flush"""
+    if any(isinstance(obj, Task) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['tasks_changed'] = True
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def track_task_statements(orm_execute_state):
+    """INSERT/UPDATE/DELETE sobre task ejecutados con session.execute()"""
+    state = orm_execute_state
+    # Con update(Task)/delete(Task) .table es una copia anotada: se compara el nombre
+    table = getattr(state.statement, 'table', None)
+    if ((state.is_insert or state.is_update or state.is_delete)
+            and getattr(table, 'name', None) == Task.__tablename__):
+        state.session.info['tasks_changed'] = True
+
+
+@event.listens_for(db.session, 'before_commit')
+def bump_version_on_commit(session):
+    session.flush()
+    if session.info.pop('tasks_changed', False):
+        bump_tasks_version()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_task_changes(session):
+    session.info.pop('tasks_changed', None)
+
+
+def tasks_version():
+    """(versión, fecha de la última escritura) sin leer ninguna tarea"""
+    row = db.session.execute(
+        db.select(TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.name == Task.__tablename__)
+    ).one_or_none()
+    if row is None:
+        # Una versión constante daría 304 con datos viejos para siempre
+        raise RuntimeError(f"Falta la fila de versión de '{Task.__tablename__}': ejecuta init_db()")
+    return row.version, row.updated_at.replace(tzinfo=timezone.utc)
+
+
+def conditional_response(etag, last_modified, build):
+    """
+    Responde 304 si el cliente ya tiene esta versión (If-None-Match o, si
+    no lo envía, If-Modified-Since); si no, llama a build() para generar la
+    respuesta. En los dos casos se añaden ETag (fuerte) y Last-Modified
+
+    Last-Modified solo lleva segundos: mientras no haya pasado el segundo
+    de la última escritura otra escritura podría llevar la misma fecha, así
+    que ni se envía ni se usa If-Modified-Since (RFC 9110, 8.8.2.2)
+    """
+    last_modified_header = last_modified.replace(microsecond=0)
+    strong_date = datetime.now(timezone.utc) >= last_modified_header + timedelta(seconds=1)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = (strong_date and request.if_modified_since is not None and
+                        last_modified_header <= request.if_modified_since)
+    response = Response(status=304) if not_modified else build()
+    response.set_etag(etag)
+    if strong_date:
+        response.last_modified = last_modified_header
+    # Los clientes pueden guardar la respuesta, pero deben revalidarla siempre
+    response.cache_control.no_cache = True
+    return response
+
+
+class TasksCache:
+    """Respuestas ya generadas de GET /api/tasks; se vacía al cambiar la versión"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.version = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, version, key):
+        with self.lock:
+            if version != self.version:
+                return None
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, version, key, entry):
+        if not self.max_size:
+            return
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.entries.clear()
+            self.entries[key] = entry
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+tasks_cache = TasksCache(TASKS_CACHE_SIZE)
+
+
+def encode_cursor(task):
+    """Cursor opaco con la posición (created_at, id) de la última tarea devuelta"""
+    raw = f'{task.created_at.isoformat()}|{task.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, task_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(task_id)
+    except ValueError:
+        abort(400, description='Cursor inválido')
+
+
+def tasks_after(cursor=None):
+    """Tareas de la más reciente a la más antigua, a partir de un cursor (keyset)"""
+    query = Task.query.order_by(Task.created_at.desc(), Task.id.desc())
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        # (created_at, id) < (?, ?) usa el índice como rango; el OR equivalente
+        # hace que SQLite recorra el índice desde el principio
+        query = query.filter(db.tuple_(Task.created_at, Task.id) < (created_at, task_id))
+    return query
+
+
 # Rutas web
 @app.route('/')
 def index():
@@ -56,10 +366,71 @@ def logout():
     return redirect(url_for('index'))
 
 
+def fts_query(text):
+    """
+    Texto libre -> consulta FTS5: cada palabra entre comillas (sin operadores
+    ni errores de sintaxis) y la última como prefijo, para buscar mientras
+    se escribe. None si no hay ninguna palabra
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def highlight(fragment):
+    """Fragmento de FTS5 -> HTML seguro con <mark> en las coincidencias"""
+    if fragment is None:
+        return None
+    return Markup(str(escape(fragment))
+                  .replace(SEARCH_MARK_START, '<mark>')
+                  .replace(SEARCH_MARK_END, '</mark>'))
+
+
+def search_tasks(text, limit, offset=0):
+    """
+    Tareas que contienen todas las palabras de `text`, de más a menos
+    relevante (bm25, el título pesa más que la descripción); si hay más
+    de SEARCH_RANK_CANDIDATES coincidencias solo se ordenan las más recientes
+    Devuelve una lista de {'task', 'rank', 'title', 'description'}, con
+    título y fragmento de la descripción resaltados en HTML
+    """
+    query = fts_query(text)
+    if query is None:
+        return []
+    rows = db.session.execute(db.text("""
+        SELECT rowid AS id, rank,
+               highlight(task_fts, 0, :mark_start, :mark_end) AS title,
+               snippet(task_fts, 1, :mark_start, :mark_end, '…', 16) AS description
+        FROM task_fts
+        WHERE task_fts MATCH :query AND rank MATCH 'bm25(10.0, 1.0)'
+          AND rowid >= (SELECT coalesce(min(rowid), 0) FROM (
+                SELECT rowid FROM task_fts WHERE task_fts MATCH :query
+                ORDER BY rowid DESC LIMIT :candidates))
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """), {'query': query, 'limit': limit, 'offset': offset,
+           'candidates': SEARCH_RANK_CANDIDATES,
+           'mark_start': SEARCH_MARK_START, 'mark_end': SEARCH_MARK_END}).all()
+    tasks = {t.id: t for t in Task.query.filter(Task.id.in_([row.id for row in rows]))}
+    return [{'task': tasks[row.id], 'rank': row.rank,
+             'title': highlight(row.title), 'description': highlight(row.description)}
+            for row in rows if row.id in tasks]
+
+
 @app.route('/tasks')
 def list_tasks():
+    q = request.args.get('q', '').strip()
+    if q and db.engine.dialect.name != 'sqlite':
+        # Mismo límite que /api/tasks/search (501): se muestra la lista sin filtrar
+        flash('La búsqueda necesita SQLite con FTS5: se muestran todas las tareas.', 'warning')
+        q = ''
+    if fts_query(q) is not None:
+        results = search_tasks(q, limit=SEARCH_MAX_PAGE_SIZE)
+        return render_template('tasks.html', tasks=[r['task'] for r in results], q=q,
+                               highlights={r['task'].id: r for r in results})
     tasks = Task.query.order_by(Task.created_at.desc()).all()
-    return render_template('tasks.html', tasks=tasks)
+    return render_template('tasks.html', tasks=tasks, q='')
 
 
 @app.route('/tasks/new', methods=['GET', 'POST'])
@@ -103,8 +474,93 @@ def delete_task(task_id):
 # API REST (JSON)
 @app.route('/api/tasks', methods=['GET'])
 def api_get_tasks():
-    tasks = Task.query.order_by(Task.created_at.desc()).all()
-    return jsonify([t.to_dict() for t in tasks])
+    """
+    Lista paginada: ?limit=N (por defecto API_PAGE_SIZE) y ?cursor=... para
+    la página siguiente, que llega en las cabeceras Link (rel="next") y
+    X-Next-Cursor. Con ?format=ndjson o Accept: application/x-ndjson las
+    tareas se emiten una por línea según se leen, sin límite salvo ?limit=
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, API_MAX_PAGE_SIZE))
+
+    ndjson = (request.args.get('format') == 'ndjson' or
+              request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+              == 'application/x-ndjson')
+    version, last_modified = tasks_version()
+    # La misma URL da JSON o NDJSON según Accept: el ETag distingue los dos
+    etag = f'tasks-{version}-{"ndjson" if ndjson else "json"}'
+
+    if ndjson:
+        def build():
+            query = tasks_after(cursor)
+            if limit is not None:
+                query = query.limit(limit)
+
+            def generate():
+                for task in query.yield_per(NDJSON_BATCH_SIZE):
+                    yield app.json.dumps(task.to_dict()) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    else:
+        def build():
+            cache_key = (cursor, limit)
+            cached = tasks_cache.get(version, cache_key)
+            if cached is None:
+                cached = build_tasks_page(cursor, limit or API_PAGE_SIZE)
+                tasks_cache.put(version, cache_key, cached)
+            body, headers = cached
+            return Response(body, mimetype='application/json', headers=headers)
+
+    response = conditional_response(etag, last_modified, build)
+    response.vary.add('Accept')
+    return response
+
+
+@app.route('/api/tasks/search', methods=['GET'])
+def api_search_tasks():
+    """
+    Búsqueda de texto completo: ?q=palabras, ordenada por relevancia
+    ?limit=N (por defecto SEARCH_PAGE_SIZE) y ?offset=N; la página
+    siguiente llega en la cabecera Link (rel="next")
+    """
+    if db.engine.dialect.name != 'sqlite':
+        abort(501, description='La búsqueda necesita SQLite con FTS5')
+    q = request.args.get('q', '').strip()
+    if fts_query(q) is None:
+        abort(400, description='Falta el parámetro "q"')
+    limit = max(1, min(request.args.get('limit', SEARCH_PAGE_SIZE, type=int), SEARCH_MAX_PAGE_SIZE))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    version, last_modified = tasks_version()
+
+    def build():
+        # Una fila de más para saber si hay página siguiente
+        results = search_tasks(q, limit + 1, offset)
+        response = jsonify([{**r['task'].to_dict(), 'rank': r['rank'],
+                             'highlight': {'title': r['title'], 'description': r['description']}}
+                            for r in results[:limit]])
+        if len(results) > limit:
+            next_url = url_for('api_search_tasks', q=q, limit=limit, offset=offset + limit,
+                               _external=True)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+        return response
+
+    return conditional_response(f'search-{version}', last_modified, build)
+
+
+def build_tasks_page(cursor, limit):
+    """Cuerpo JSON y cabeceras de paginación de una página de /api/tasks"""
+    # Una fila de más para saber si hay página siguiente
+    tasks = tasks_after(cursor).limit(limit + 1).all()
+    page = tasks[:limit]
+    headers = {}
+    if len(tasks) > limit:
+        next_cursor = encode_cursor(page[-1])
+        next_url = url_for('api_get_tasks', cursor=next_cursor, limit=limit, _external=True)
+        headers['Link'] = f'<{next_url}>; rel="next"'
+        headers['X-Next-Cursor'] = next_cursor
+    return jsonify([t.to_dict() for t in page]).get_data(), headers
 
 
 @app.route('/api/tasks', methods=['POST'])
@@ -119,10 +575,179 @@ def api_create_task():
     return jsonify(task.to_dict()), 201
 
 
+def parse_bulk_body():
+    """
+    Cuerpo de /api/tasks/bulk: un array JSON o NDJSON (un elemento por línea)
+    Devuelve una lista de (elemento, error); las líneas NDJSON que no son
+    JSON válido quedan como error de ese elemento sin tumbar el resto
+    """
+    text = request.get_data(as_text=True)
+    is_ndjson = request.mimetype in ('application/x-ndjson', 'application/jsonl')
+    if not is_ndjson:
+        try:
+            items = json.loads(text)
+        except ValueError:
+            abort(400, description='JSON inválido')
+        if not isinstance(items, list):
+            abort(400, description='Se esperaba un array JSON o NDJSON')
+        parsed = [(item, None) for item in items]
+    else:
+        parsed = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                parsed.append((json.loads(line), None))
+            except ValueError:
+                parsed.append((None, 'Línea NDJSON inválida'))
+    if len(parsed) > BULK_MAX_ITEMS:
+        abort(413, description=f'Máximo {BULK_MAX_ITEMS} elementos por petición')
+    return parsed
+
+
+def validate_task_fields(item, require_title):
+    """Campos de una tarea ya comprobados, o un mensaje de error"""
+    if not isinstance(item, dict):
+        return None, 'Cada elemento debe ser un objeto JSON'
+    fields = {}
+    if 'title' in item or require_title:
+        title = item.get('title')
+        if not isinstance(title, str) or not title.strip():
+            return None, 'Falta campo "title"'
+        fields['title'] = title
+    if 'description' in item:
+        if item['description'] is not None and not isinstance(item['description'], str):
+            return None, '"description" debe ser texto'
+        fields['description'] = item['description']
+    if 'done' in item:
+        if not isinstance(item['done'], bool):
+            return None, '"done" debe ser true o false'
+        fields['done'] = item['done']
+    return fields, None
+
+
+def task_id_of(item):
+    """Id de un elemento de update/delete: un entero o un objeto con "id" """
+    task_id = item.get('id') if isinstance(item, dict) else item
+    if isinstance(task_id, bool) or not isinstance(task_id, int):
+        return None
+    return task_id
+
+
+def run_in_chunks(pending, results, write):
+    """
+    Escribe los elementos válidos en transacciones de BULK_CHUNK_SIZE
+    `pending` son pares (índice, datos) y `write(chunk)` hace la escritura
+    y devuelve {índice: resultado}. Si un bloque falla se deshace solo ese
+    bloque y sus elementos quedan con estado 500
+    """
+    for start in range(0, len(pending), BULK_CHUNK_SIZE):
+        chunk = pending[start:start + BULK_CHUNK_SIZE]
+        try:
+            chunk_results = write(chunk)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            app.logger.exception('Error en un bloque de la operación masiva')
+            chunk_results = {index: {'status': 500, 'error': type(e).__name__}
+                             for index, _ in chunk}
+        for index, result in chunk_results.items():
+            results[index] = {'index': index, **result}
+
+
+def bulk_response(results):
+    succeeded = sum(1 for r in results if r['status'] < 400)
+    return jsonify({'succeeded': succeeded, 'failed': len(results) - succeeded, 'results': results})
+
+
+@app.route('/api/tasks/bulk', methods=['POST'])
+def api_bulk_create_tasks():
+    """Crear muchas tareas: [{"title": ..., "description": ..., "done": ...}, ...]"""
+    results, pending = [], []
+    for index, (item, error) in enumerate(parse_bulk_body()):
+        fields = None
+        if error is None:
+            fields, error = validate_task_fields(item, require_title=True)
+        results.append({'index': index, 'status': 400, 'error': error} if error else None)
+        if error is None:
+            # Mismas columnas en todas las filas (y mismos valores por defecto que POST /api/tasks)
+            pending.append((index, {'description': '', 'done': False, **fields}))
+
+    def write(chunk):
+        # INSERT ... RETURNING en lote; los ids vuelven en el orden de las filas
+        ids = db.session.scalars(
+            db.insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            [fields for _, fields in chunk],
+        ).all()
+        return {index: {'status': 201, 'id': task_id} for (index, _), task_id in zip(chunk, ids)}
+
+    run_in_chunks(pending, results, write)
+    return bulk_response(results)
+
+
+@app.route('/api/tasks/bulk', methods=['PUT', 'PATCH'])
+def api_bulk_update_tasks():
+    """Actualizar muchas tareas: [{"id": 1, "done": true}, ...]"""
+    results, pending = [], []
+    for index, (item, error) in enumerate(parse_bulk_body()):
+        fields, task_id = None, None
+        if error is None:
+            task_id = task_id_of(item)
+            error = 'Falta campo "id" entero' if task_id is None else None
+        if error is None:
+            fields, error = validate_task_fields(item, require_title=False)
+        results.append({'index': index, 'status': 400, 'error': error} if error else None)
+        if error is None:
+            pending.append((index, {'id': task_id, **fields}))
+
+    def write(chunk):
+        ids = {fields['id'] for _, fields in chunk}
+        existing = set(db.session.scalars(db.select(Task.id).where(Task.id.in_(ids))))
+        found = [fields for _, fields in chunk if fields['id'] in existing and len(fields) > 1]
+        if found:
+            # UPDATE masivo por clave primaria (una sentencia por grupo de columnas)
+            db.session.execute(db.update(Task), found)
+        return {index: ({'status': 200, 'id': fields['id']} if fields['id'] in existing
+                        else {'status': 404, 'id': fields['id'], 'error': 'No existe'})
+                for index, fields in chunk}
+
+    run_in_chunks(pending, results, write)
+    return bulk_response(results)
+
+
+@app.route('/api/tasks/bulk', methods=['DELETE'])
+def api_bulk_delete_tasks():
+    """Eliminar muchas tareas: [1, 2, 3] o [{"id": 1}, ...]"""
+    results, pending = [], []
+    for index, (item, error) in enumerate(parse_bulk_body()):
+        task_id = None
+        if error is None:
+            task_id = task_id_of(item)
+            error = 'Se esperaba un id entero' if task_id is None else None
+        results.append({'index': index, 'status': 400, 'error': error} if error else None)
+        if error is None:
+            pending.append((index, task_id))
+
+    def write(chunk):
+        ids = {task_id for _, task_id in chunk}
+        existing = set(db.session.scalars(db.select(Task.id).where(Task.id.in_(ids))))
+        db.session.execute(db.delete(Task).where(Task.id.in_(existing)))
+        return {index: ({'status': 200, 'id': task_id} if task_id in existing
+                        else {'status': 404, 'id': task_id, 'error': 'No existe'})
+                for index, task_id in chunk}
+
+    run_in_chunks(pending, results, write)
+    return bulk_response(results)
+
+
 @app.route('/api/tasks/<int:task_id>', methods=['GET'])
 def api_get_task(task_id):
+    # Primero la fila (búsqueda por clave primaria): un id inexistente es 404, nunca 304
     task = Task.query.get_or_404(task_id)
-    return jsonify(task.to_dict())
+    version, last_modified = tasks_version()
+    # Cambia con cualquier escritura en la tabla: conservador pero sin comparar la fila
+    etag = f'task-{task_id}-{version}'
+    return conditional_response(etag, last_modified, lambda: jsonify(task.to_dict()))
 
 
 @app.route('/api/tasks/<int:task_id>', methods=['PUT'])
@@ -145,9 +770,18 @@ def api_delete_task(task_id):
     return jsonify({'result': True})
 
 
-# Inicialización de la base de datos al ejecutar directamente
+@app.cli.command('init-db')
+def init_db_command():
+    """Crea o completa la base de datos (tablas, índices y búsqueda)"""
+    init_db()
+    print('Base de datos lista')
+
+
+# Crear o completar la base de datos al cargar la app (también con gunicorn,
+# que importa el módulo sin pasar por __main__)
+with app.app_context():
+    init_db()
+
+
 if __name__ == '__main__':
-    # Crear base de datos si no existe
-    with app.app_context():
-        db.create_all()
     app.run(debug=True)
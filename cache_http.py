@@ -0,0 +1,342 @@
+"""
+CACHÉ HTTP PERSISTENTE CON REVALIDACIÓN CONDICIONAL
+Sustituye al patrón ScraperConCache (un JSON por hash MD5 con TTL fijo):
+- Un único archivo SQLite con índice por URL normalizada
+- Cuerpos comprimidos con zlib (sirve para HTML, JSON, lo que sea)
+- Revalidación con If-None-Match / If-Modified-Since: un 304 es un acierto
+- Expulsión LRU por tamaño total en bytes
+- No se guardan respuestas privadas (no-store, private, Vary, Authorization)
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+PUERTOS_POR_DEFECTO = {'http': 80, 'https': 443}
+# El cuerpo se guarda ya descomprimido, así que variar por codificación no importa
+VARY_IGNORADOS = {'accept-encoding'}
+
+
+def normalizar_url(url: str) -> str:
+    """
+    Normalizar una URL para usarla como clave
+
+    - Esquema y host en minúsculas, sin puerto por defecto
+    - Sin fragmento (#...)
+    - Parámetros de consulta ordenados
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or '').lower()
+    if partes.port and partes.port != PUERTOS_POR_DEFECTO.get(esquema):
+        host = f"{host}:{partes.port}"
+    if partes.username:
+        credenciales = partes.username + (f":{partes.password}" if partes.password else '')
+        host = f"{credenciales}@{host}"
+    consulta = ''
+    if partes.query:
+        consulta = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((esquema, host, partes.path or '/', consulta, ''))
+
+
+def es_almacenable(cabeceras, cabeceras_peticion=None) -> bool:
+    """
+    Decidir si una respuesta puede guardarse en una caché compartida
+
+    No se guarda si la respuesta lleva Cache-Control no-store o private,
+    si varía según cabeceras de la petición (Vary, salvo Accept-Encoding)
+    o si la petición iba autenticada (Authorization).
+    """
+    directivas = {d.split('=', 1)[0].strip().lower()
+                  for d in (cabeceras.get('Cache-Control') or '').split(',')}
+    if directivas & {'no-store', 'private'}:
+        return False
+    vary = {v.strip().lower() for v in (cabeceras.get('Vary') or '').split(',')} - {''}
+    if vary - VARY_IGNORADOS:
+        return False
+    return not (cabeceras_peticion and cabeceras_peticion.get('Authorization'))
+
+
+def peticion_autenticada(cliente, headers: Optional[Dict] = None,
+                         auth=None) -> bool:
+    """Saber si una petición de requests llevará credenciales"""
+    if auth is not None or getattr(cliente, 'auth', None) is not None:
+        return True
+    for cabeceras in (headers, getattr(cliente, 'headers', None)):
+        if cabeceras and any(c.lower() == 'authorization' for c in cabeceras):
+            return True
+    return False
+
+
+class CacheHTTP:
+    """Caché de respuestas HTTP en un archivo SQLite"""
+
+    def __init__(self, ruta: str = 'cache_http.db', max_bytes: int = 512 * 1024 * 1024,
+                 max_edad: float = 0, nivel_compresion: int = 6):
+        """
+        Abrir (o crear) la caché
+
+        Args:
+            ruta (str): Archivo SQLite donde se guardan las respuestas
+            max_bytes (int): Tamaño máximo de los cuerpos comprimidos
+            max_edad (float): Segundos durante los que una entrada se usa sin
+                preguntar al servidor (0 = revalidar siempre)
+            nivel_compresion (int): Nivel de zlib (1 rápido - 9 máximo)
+        """
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.max_edad = max_edad
+        self.nivel_compresion = nivel_compresion
+        self.estadisticas = {'aciertos': 0, 'revalidados': 0, 'descargas': 0,
+                             'expulsados': 0, 'no_almacenables': 0}
+        self._candado = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute('''
+            CREATE TABLE IF NOT EXISTS respuestas (
+                url TEXT PRIMARY KEY,
+                estado INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                cuerpo BLOB NOT NULL,
+                tamano INTEGER NOT NULL,
+                guardado REAL NOT NULL,
+                ultimo_uso REAL NOT NULL
+            )
+        ''')
+        self._conexion.execute(
+            'CREATE INDEX IF NOT EXISTS idx_respuestas_ultimo_uso ON respuestas(ultimo_uso)'
+        )
+        self._bytes_totales = self._conexion.execute(
+            'SELECT COALESCE(SUM(tamano), 0) FROM respuestas'
+        ).fetchone()[0]
+
+    def buscar(self, url: str) -> Optional[Dict]:
+        """
+        Buscar una entrada en la caché
+
+        Returns:
+            Dict: {'url', 'estado', 'etag', 'last_modified', 'content_type',
+                   'cuerpo', 'guardado'} o None
+        """
+        clave = normalizar_url(url)
+        with self._candado:
+            fila = self._conexion.execute(
+                'SELECT estado, etag, last_modified, content_type, cuerpo, guardado '
+                'FROM respuestas WHERE url = ?', (clave,)
+            ).fetchone()
+        if fila is None:
+            return None
+        estado, etag, last_modified, content_type, cuerpo, guardado = fila
+        return {
+            'url': clave,
+            'estado': estado,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'cuerpo': zlib.decompress(cuerpo),
+            'guardado': guardado,
+        }
+
+    def buscar_fresca(self, url: str) -> Optional[Dict]:
+        """Devolver la entrada solo si aún está dentro de max_edad (sin red)"""
+        if self.max_edad <= 0:
+            return None
+        entrada = self.buscar(url)
+        if entrada and time.time() - entrada['guardado'] < self.max_edad:
+            self._tocar(entrada['url'])
+            self.estadisticas['aciertos'] += 1
+            return entrada
+        return None
+
+    def cabeceras_condicionales(self, url: str) -> Dict[str, str]:
+        """Cabeceras If-None-Match / If-Modified-Since para revalidar la URL"""
+        clave = normalizar_url(url)
+        with self._candado:
+            fila = self._conexion.execute(
+                'SELECT etag, last_modified FROM respuestas WHERE url = ?', (clave,)
+            ).fetchone()
+        cabeceras = {}
+        if fila:
+            if fila[0]:
+                cabeceras['If-None-Match'] = fila[0]
+            if fila[1]:
+                cabeceras['If-Modified-Since'] = fila[1]
+        return cabeceras
+
+    def registrar_respuesta(self, url: str, estado: int, cabeceras,
+                            cuerpo: bytes, cabeceras_peticion=None) -> Optional[Dict]:
+        """
+        Actualizar la caché con una respuesta del servidor
+
+        - 304: la entrada guardada sigue siendo válida (acierto)
+        - 200: se guarda el cuerpo nuevo, salvo que no sea almacenable
+          (ver es_almacenable); entonces se borra la entrada anterior
+        - Otros códigos: no se cachean
+
+        Args:
+            url (str): URL pedida
+            estado (int): Código HTTP recibido
+            cabeceras: Cabeceras de la respuesta (dict o similar)
+            cuerpo (bytes): Cuerpo recibido
+            cabeceras_peticion: Cabeceras enviadas (para ver Authorization)
+
+        Returns:
+            Dict: Entrada que debe usar el llamador, o None si no aplica
+        """
+        if estado == 304:
+            entrada = self.buscar(url)
+            if entrada is not None:
+                self._revalidar(entrada['url'], cabeceras.get('ETag'), cabeceras.get('Last-Modified'))
+                self.estadisticas['revalidados'] += 1
+            return entrada
+        if estado != 200:
+            return None
+        if not es_almacenable(cabeceras, cabeceras_peticion):
+            self.borrar(url)
+            self.estadisticas['no_almacenables'] += 1
+            return None
+        self.guardar(url, estado, cabeceras, cuerpo)
+        self.estadisticas['descargas'] += 1
+        return {
+            'url': normalizar_url(url),
+            'estado': estado,
+            'etag': cabeceras.get('ETag'),
+            'last_modified': cabeceras.get('Last-Modified'),
+            'content_type': cabeceras.get('Content-Type'),
+            'cuerpo': cuerpo,
+            'guardado': time.time(),
+        }
+
+    def guardar(self, url: str, estado: int, cabeceras, cuerpo: bytes):
+        """Guardar (o reemplazar) una respuesta y expulsar lo necesario"""
+        clave = normalizar_url(url)
+        comprimido = zlib.compress(cuerpo, self.nivel_compresion)
+        ahora = time.time()
+        with self._candado:
+            anterior = self._conexion.execute(
+                'SELECT tamano FROM respuestas WHERE url = ?', (clave,)
+            ).fetchone()
+            self._conexion.execute(
+                'INSERT OR REPLACE INTO respuestas '
+                '(url, estado, etag, last_modified, content_type, cuerpo, tamano, guardado, ultimo_uso) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (clave, estado, cabeceras.get('ETag'), cabeceras.get('Last-Modified'),
+                 cabeceras.get('Content-Type'), comprimido, len(comprimido), ahora, ahora)
+            )
+            self._bytes_totales += len(comprimido) - (anterior[0] if anterior else 0)
+            self._expulsar()
+
+    def borrar(self, url: str):
+        """Quitar la entrada de una URL, si existe"""
+        clave = normalizar_url(url)
+        with self._candado:
+            fila = self._conexion.execute(
+                'SELECT tamano FROM respuestas WHERE url = ?', (clave,)
+            ).fetchone()
+            if fila:
+                self._conexion.execute('DELETE FROM respuestas WHERE url = ?', (clave,))
+                self._bytes_totales -= fila[0]
+
+    def _tocar(self, clave: str):
+        """Marcar una entrada como usada recientemente (para el LRU)"""
+        with self._candado:
+            self._conexion.execute(
+                'UPDATE respuestas SET ultimo_uso = ? WHERE url = ?', (time.time(), clave)
+            )
+
+    def _revalidar(self, clave: str, etag: Optional[str], last_modified: Optional[str]):
+        """Tras un 304: renovar la entrada y sus validadores si llegan nuevos"""
+        ahora = time.time()
+        with self._candado:
+            self._conexion.execute(
+                'UPDATE respuestas SET ultimo_uso = ?, guardado = ?, '
+                'etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) '
+                'WHERE url = ?',
+                (ahora, ahora, etag, last_modified, clave)
+            )
+
+    def _expulsar(self):
+        """Borrar las entradas menos usadas hasta caber en max_bytes (con el candado tomado)"""
+        while self._bytes_totales > self.max_bytes:
+            filas = self._conexion.execute(
+                'SELECT url, tamano FROM respuestas ORDER BY ultimo_uso LIMIT 64'
+            ).fetchall()
+            if not filas:
+                self._bytes_totales = 0
+                return
+            for url, tamano in filas:
+                if self._bytes_totales <= self.max_bytes:
+                    break
+                self._conexion.execute('DELETE FROM respuestas WHERE url = ?', (url,))
+                self._bytes_totales -= tamano
+                self.estadisticas['expulsados'] += 1
+
+    def cerrar(self):
+        """Cerrar la conexión con el archivo de caché"""
+        with self._candado:
+            self._conexion.close()
+
+
+def _respuesta_desde_cache(url: str, entrada: Dict,
+                           respuesta: Optional[requests.Response] = None) -> requests.Response:
+    """Construir (o completar) un requests.Response con el cuerpo guardado"""
+    if respuesta is None:
+        respuesta = requests.Response()
+        respuesta.url = url
+    respuesta.status_code = entrada['estado']
+    respuesta._content = entrada['cuerpo']
+    if entrada['content_type']:
+        respuesta.headers['Content-Type'] = entrada['content_type']
+    respuesta.desde_cache = True
+    return respuesta
+
+
+def obtener_con_cache(cliente, url: str, cache: Optional[CacheHTTP] = None,
+                      headers: Optional[Dict] = None, params: Optional[Dict] = None,
+                      **kwargs) -> requests.Response:
+    """
+    GET con caché para requests (sirve con una Session o con el módulo requests)
+
+    Sin caché equivale a cliente.get(). Con caché envía las cabeceras
+    condicionales y, si el servidor responde 304, devuelve un Response
+    con el cuerpo guardado y status_code 200. Las peticiones con
+    credenciales no consultan ni alimentan la caché.
+
+    Args:
+        cliente: requests.Session o el módulo requests
+        url (str): URL a pedir
+        cache (CacheHTTP): Caché a usar, o None
+        headers (Dict): Cabeceras adicionales
+        params (Dict): Parámetros de consulta
+        **kwargs: Resto de argumentos para get() (timeout, etc.)
+
+    Returns:
+        requests.Response: Respuesta (real o reconstruida desde la caché)
+    """
+    if cache is None or peticion_autenticada(cliente, headers, kwargs.get('auth')):
+        return cliente.get(url, headers=headers, params=params, **kwargs)
+
+    if params:
+        url = requests.Request('GET', url, params=params).prepare().url
+    fresca = cache.buscar_fresca(url)
+    if fresca is not None:
+        return _respuesta_desde_cache(url, fresca)
+
+    cabeceras = dict(headers or {})
+    cabeceras.update(cache.cabeceras_condicionales(url))
+    respuesta = cliente.get(url, headers=cabeceras, **kwargs)
+    peticion = getattr(respuesta, 'request', None)
+    entrada = cache.registrar_respuesta(url, respuesta.status_code,
+                                        respuesta.headers, respuesta.content,
+                                        peticion.headers if peticion is not None else None)
+    if respuesta.status_code == 304 and entrada is not None:
+        return _respuesta_desde_cache(url, entrada, respuesta)
+    respuesta.desde_cache = False
+    return respuesta
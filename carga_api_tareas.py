@@ -0,0 +1,440 @@
+"""
+PRUEBA DE CARGA DE LA API DE TAREAS (app.py)
+Mide los endpoints con el cliente de pruebas de Flask, sin red de por
+medio, sobre un archivo SQLite temporal. La BD de la aplicación
+(tasks.db) no se toca: la URI se cambia con TASKS_DATABASE_URI antes
+de importar app.
+
+- benchmark(): latencia (p50/p99) de /api/tasks con la tabla creciendo
+- benchmark_masivo(): tareas/s con /api/tasks/bulk frente a una
+  petición (y una transacción) por tarea
+- benchmark_condicional(): coste de un sondeo de /api/tasks sin
+  cambios en los datos (sin caché, con caché, 304 por If-None-Match)
+- benchmark_concurrencia(): lecturas y escrituras mezcladas desde 1, 4
+  y 16 procesos (como workers de gunicorn) con cada perfil de SQLite
+- benchmark_busqueda(): latencia de /api/tasks/search (FTS5) con 1M
+  tareas frente a un LIKE '%...%' sobre la tabla
+
+Uso:
+    python carga_api_tareas.py
+"""
+
+import atexit
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TAMANOS = (1_000, 10_000, 100_000, 1_000_000)
+# La lista completa (comportamiento anterior) se deja de medir a partir de aquí
+MAX_FILAS_LISTA_COMPLETA = 100_000
+LOTE_INSERCION = 50_000
+# Modo de diario con el que empieza la BD en benchmark_concurrencia()
+SQLITE_MODO_DIARIO = {'default': 'DELETE', 'tuned': 'WAL'}
+
+
+_uri_bd = None
+
+
+def cargar_app():
+    """
+    Importar app.py apuntando a una BD temporal propia (nunca a tasks.db)
+
+    La BD es la misma para todo el proceso y se borra al salir; cada
+    benchmark la vacía con bd_vacia()
+    """
+    global _uri_bd
+    if _uri_bd is None:
+        if 'app' in sys.modules:
+            raise RuntimeError("app.py ya está importado con su BD: "
+                               "ejecuta la prueba de carga en un proceso aparte")
+        directorio = tempfile.mkdtemp(prefix='carga_tareas_')
+        atexit.register(shutil.rmtree, directorio, True)
+        _uri_bd = f"sqlite:///{os.path.join(directorio, 'carga.db')}"
+        os.environ['TASKS_DATABASE_URI'] = _uri_bd
+    import app as modulo
+    return modulo
+
+
+def bd_vacia(modulo):
+    """Borrar y recrear las tablas (dentro de un app_context)"""
+    modulo.db.session.remove()
+    modulo.db.drop_all()
+    # El índice de búsqueda no forma parte de los modelos: se borra aparte
+    modulo.db.session.execute(modulo.db.text('DROP TABLE IF EXISTS task_fts'))
+    modulo.db.session.commit()
+    modulo.init_db()
+
+
+def percentiles(tiempos: List[float]) -> Dict[str, float]:
+    """p50 y p99 en milisegundos"""
+    ordenados = sorted(tiempos)
+    p99 = ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.99))]
+    return {'p50': statistics.median(ordenados) * 1000, 'p99': p99 * 1000}
+
+
+def medir(funcion: Callable[[], object], repeticiones: int) -> Dict[str, float]:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return percentiles(tiempos)
+
+
+def insertar_tareas(modulo, desde: int, hasta: int,
+                    textos: Optional[Callable[[int], Tuple[str, str]]] = None):
+    """
+    Insertar tareas [desde, hasta) en lotes; 3 tareas por segundo para que haya empates
+
+    Args:
+        textos (Callable): i -> (título, descripción); por defecto "Tarea i"
+    """
+    tabla = modulo.Task.__table__
+    base = datetime(2024, 1, 1)
+    textos = textos or (lambda i: (f"Tarea {i}", f"Descripción de la tarea {i}"))
+    for inicio in range(desde, hasta, LOTE_INSERCION):
+        filas = [dict(zip(('title', 'description'), textos(i)),
+                      done=i % 5 == 0, created_at=base + timedelta(seconds=i // 3))
+                 for i in range(inicio, min(hasta, inicio + LOTE_INSERCION))]
+        modulo.db.session.execute(tabla.insert(), filas)
+        modulo.db.session.commit()
+
+
+def benchmark(tamanos: Iterable[int] = TAMANOS, repeticiones: int = 200,
+              limite: int = 50) -> Dict[int, Dict[str, Dict[str, float]]]:
+    """
+    Latencia de /api/tasks con la tabla creciendo de 1k a 1M filas
+
+    - primera página y página del medio (cursor) con ?limit=
+    - primeras líneas del modo NDJSON (tiempo hasta empezar a recibir)
+    - lista completa como antes (.all() + jsonify), solo hasta 100k filas
+
+    Returns:
+        Dict: {filas: {caso: {'p50': ms, 'p99': ms}}}
+    """
+    modulo = cargar_app()
+    app, Task = modulo.app, modulo.Task
+    cliente = app.test_client()
+    # Sin caché de respuestas: se mide la consulta, no la página ya guardada
+    modulo.tasks_cache.max_size = 0
+    resultados = {}
+
+    def lista_completa():
+        with app.test_request_context():
+            tareas = Task.query.order_by(Task.created_at.desc()).all()
+            modulo.jsonify([t.to_dict() for t in tareas]).get_data()
+
+    def primeras_lineas_ndjson(num_lineas: int = 100):
+        respuesta = cliente.get('/api/tasks?format=ndjson', buffered=False)
+        lineas = 0
+        for trozo in respuesta.response:
+            lineas += trozo.count(b'\n') if isinstance(trozo, bytes) else trozo.count('\n')
+            if lineas >= num_lineas:
+                break
+        respuesta.close()
+
+    with app.app_context():
+        bd_vacia(modulo)
+        filas = 0
+        print(f"{'filas':>10} {'caso':<26} {'p50 ms':>8} {'p99 ms':>8}")
+        for tamano in sorted(tamanos):
+            insertar_tareas(modulo, filas, tamano)
+            filas = tamano
+            mitad = Task.query.order_by(Task.created_at.desc(), Task.id.desc()) \
+                .offset(filas // 2).first()
+            cursor = modulo.encode_cursor(mitad)
+            casos = {
+                'primera página': (lambda: cliente.get(f'/api/tasks?limit={limite}'),
+                                   repeticiones),
+                'página del medio (cursor)': (
+                    lambda: cliente.get(f'/api/tasks?limit={limite}&cursor={cursor}'),
+                    repeticiones),
+                'NDJSON, primeras 100': (primeras_lineas_ndjson, repeticiones // 4),
+            }
+            if filas <= MAX_FILAS_LISTA_COMPLETA:
+                casos['lista completa (antes)'] = (lista_completa, 5 if filas > 10_000 else 20)
+            resultados[filas] = {}
+            for nombre, (funcion, veces) in casos.items():
+                resultados[filas][nombre] = medir(funcion, veces)
+                print(f"{filas:>10,} {nombre:<26} {resultados[filas][nombre]['p50']:8.2f} "
+                      f"{resultados[filas][nombre]['p99']:8.2f}")
+        modulo.db.session.remove()
+        modulo.db.engine.dispose()
+    return resultados
+
+
+def benchmark_masivo(num_tareas: int = 5_000) -> Dict[str, float]:
+    """
+    Tareas por segundo creando, actualizando y borrando num_tareas una a
+    una (POST/PUT/DELETE /api/tasks) frente a /api/tasks/bulk
+
+    Returns:
+        Dict[str, float]: {caso: tareas por segundo}
+    """
+    modulo = cargar_app()
+    cliente = modulo.app.test_client()
+    tareas = [{'title': f"Tarea {i}", 'description': f"Descripción {i}"} for i in range(num_tareas)]
+    ids = []
+    resultados = {}
+
+    def cronometrar(nombre, funcion):
+        inicio = time.perf_counter()
+        funcion()
+        resultados[nombre] = num_tareas / (time.perf_counter() - inicio)
+        print(f"  {nombre:<26} {resultados[nombre]:10,.0f} tareas/s")
+
+    def crear_una_a_una():
+        ids[:] = [cliente.post('/api/tasks', json=tarea).get_json()['id'] for tarea in tareas]
+
+    def crear_masivo_ndjson():
+        cuerpo = '\n'.join(json.dumps(tarea) for tarea in tareas)
+        respuesta = cliente.post('/api/tasks/bulk', data=cuerpo, content_type='application/x-ndjson')
+        ids[:] = [r['id'] for r in respuesta.get_json()['results']]
+
+    def crear_masivo_json():
+        respuesta = cliente.post('/api/tasks/bulk', json=tareas)
+        ids[:] = [r['id'] for r in respuesta.get_json()['results']]
+
+    print(f"{num_tareas:,} tareas:")
+    with modulo.app.app_context():
+        bd_vacia(modulo)
+        cronometrar('POST una a una', crear_una_a_una)
+        cronometrar('PUT una a una', lambda: [cliente.put(f'/api/tasks/{i}', json={'done': True})
+                                              for i in ids])
+        cronometrar('DELETE una a una', lambda: [cliente.delete(f'/api/tasks/{i}') for i in ids])
+        cronometrar('POST bulk (NDJSON)', crear_masivo_ndjson)
+        cronometrar('DELETE bulk', lambda: cliente.delete('/api/tasks/bulk', json=ids))
+        cronometrar('POST bulk (array JSON)', crear_masivo_json)
+        cronometrar('PUT bulk', lambda: cliente.put(
+            '/api/tasks/bulk', json=[{'id': i, 'done': True} for i in ids]))
+        modulo.db.session.remove()
+    return resultados
+
+def benchmark_condicional(num_tareas: int = 10_000, limite: int = 100,
+                          repeticiones: int = 500) -> Dict[str, Dict[str, float]]:
+    """
+    Latencia de un cliente que sondea /api/tasks?limit= sin que cambie nada
+
+    Returns:
+        Dict: {caso: {'p50': ms, 'p99': ms}}
+    """
+    modulo = cargar_app()
+    cliente = modulo.app.test_client()
+    url = f'/api/tasks?limit={limite}'
+    cache = modulo.tasks_cache
+    resultados = {}
+
+    def sin_cache():
+        cache.version = None
+        cliente.get(url)
+
+    with modulo.app.app_context():
+        bd_vacia(modulo)
+        insertar_tareas(modulo, 0, num_tareas)
+        etag = cliente.get(url).headers['ETag']
+        casos = {
+            'sin caché (serializa)': sin_cache,
+            'caché por versión': lambda: cliente.get(url),
+            'If-None-Match (304)': lambda: cliente.get(url, headers={'If-None-Match': etag}),
+        }
+        print(f"Sondeo de {url} con {num_tareas:,} tareas:")
+        for nombre, funcion in casos.items():
+            resultados[nombre] = medir(funcion, repeticiones)
+            print(f"  {nombre:<24} p50 {resultados[nombre]['p50']:6.2f} ms  "
+                  f"p99 {resultados[nombre]['p99']:6.2f} ms")
+        modulo.db.session.remove()
+    return resultados
+
+
+def _trabajador_mixto(uri: str, perfil: str, filas: int, duracion: float,
+                     proporcion_escrituras: float, proporcion_exportaciones: float,
+                     semilla: int, listos, salida, inicio):
+    """Proceso que simula un worker: importa app con el perfil y lanza peticiones"""
+    import logging
+
+    os.environ['TASKS_DATABASE_URI'] = uri
+    os.environ['TASKS_DB_PROFILE'] = perfil
+    # Los errores se cuentan; no hace falta la traza de cada "database is locked"
+    logging.disable(logging.CRITICAL)
+    import app as modulo
+
+    cliente = modulo.app.test_client()
+    aleatorio = random.Random(semilla)
+    correctas = errores = 0
+    latencias_escritura = []
+    listos.put(True)
+    inicio.wait()
+    fin = time.monotonic() + duracion
+    while time.monotonic() < fin:
+        escritura = aleatorio.random() < proporcion_escrituras
+        antes = time.perf_counter()
+        if escritura:
+            if aleatorio.random() < 0.5:
+                respuesta = cliente.post('/api/tasks', json={'title': f"Nueva {semilla}"})
+            else:
+                respuesta = cliente.put(f'/api/tasks/{aleatorio.randint(1, filas)}',
+                                        json={'done': aleatorio.random() < 0.5})
+        elif aleatorio.random() < proporcion_exportaciones:
+            # Lectura larga: la tabla entera en NDJSON
+            respuesta = cliente.get('/api/tasks?format=ndjson')
+            respuesta.get_data()
+        elif aleatorio.random() < 0.5:
+            respuesta = cliente.get('/api/tasks?limit=20')
+        else:
+            respuesta = cliente.get(f'/api/tasks/{aleatorio.randint(1, filas)}')
+        if escritura:
+            latencias_escritura.append(time.perf_counter() - antes)
+        if respuesta.status_code >= 500:
+            errores += 1
+        else:
+            correctas += 1
+    salida.put((correctas, errores, latencias_escritura))
+
+
+def benchmark_concurrencia(trabajadores: Iterable[int] = (1, 4, 16), duracion: float = 5.0,
+                           perfiles: Iterable[str] = ('default', 'tuned'), filas: int = 10_000,
+                           proporcion_escrituras: float = 0.2,
+                           proporcion_exportaciones: float = 0.01) -> Dict[str, Dict[int, Dict]]:
+    """
+    Peticiones/s, latencia de las escrituras y errores (500, casi siempre
+    "database is locked") con varios procesos leyendo y escribiendo la
+    misma BD a la vez. Un 1% de las lecturas exporta la tabla entera en
+    NDJSON: sin WAL esa lectura larga bloquea a todos los escritores
+
+    Returns:
+        Dict: {perfil: {procesos: {'peticiones_s', 'errores', 'escritura_p50', 'escritura_p99'}}}
+    """
+    modulo = cargar_app()
+    with modulo.app.app_context():
+        ruta_bd = modulo.db.engine.url.database
+    contexto = multiprocessing.get_context('spawn')
+    resultados = {}
+    print(f"Mezcla {1 - proporcion_escrituras:.0%} lecturas / {proporcion_escrituras:.0%} "
+          f"escrituras, {duracion:g} s por caso:")
+    for perfil in perfiles:
+        resultados[perfil] = {}
+        for num in trabajadores:
+            with modulo.app.app_context():
+                bd_vacia(modulo)
+                insertar_tareas(modulo, 0, filas)
+                modulo.db.session.remove()
+                modulo.db.engine.dispose()
+            # El modo WAL queda guardado en el archivo: cada perfil parte de su modo
+            conexion = sqlite3.connect(ruta_bd)
+            modo = SQLITE_MODO_DIARIO.get(perfil, 'DELETE')
+            conexion.execute(f'PRAGMA journal_mode={modo}')
+            conexion.close()
+
+            listos, salida, inicio = contexto.Queue(), contexto.Queue(), contexto.Event()
+            procesos = [contexto.Process(target=_trabajador_mixto, args=(
+                            modulo.app.config['SQLALCHEMY_DATABASE_URI'], perfil, filas, duracion,
+                            proporcion_escrituras, proporcion_exportaciones, semilla,
+                            listos, salida, inicio))
+                        for semilla in range(num)]
+            for proceso in procesos:
+                proceso.start()
+            for _ in procesos:
+                listos.get()
+            inicio.set()
+            totales = [salida.get() for _ in procesos]
+            for proceso in procesos:
+                proceso.join()
+            correctas = sum(c for c, _, _ in totales)
+            errores = sum(e for _, e, _ in totales)
+            escrituras = percentiles([t for _, _, tiempos in totales for t in tiempos] or [0.0])
+            resultados[perfil][num] = {'peticiones_s': correctas / duracion, 'errores': errores,
+                                       'escritura_p50': escrituras['p50'],
+                                       'escritura_p99': escrituras['p99']}
+            print(f"  {perfil:<8} {num:>2} procesos: {correctas / duracion:6.0f} peticiones/s  "
+                  f"escritura p50 {escrituras['p50']:6.1f} ms  p99 {escrituras['p99']:7.1f} ms  "
+                  f"{errores:>4} errores")
+    return resultados
+
+
+def generador_textos(num_palabras: int = 5_000, semilla: int = 42):
+    """
+    Textos con un vocabulario inventado de num_palabras palabras repartidas
+    como en un idioma real (Zipf: pocas muy frecuentes, muchas raras)
+
+    Returns:
+        Tuple: (función i -> (título, descripción), vocabulario por frecuencia)
+    """
+    aleatorio = random.Random(semilla)
+    silabas = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ra', 'se', 'ti', 'vo', 'za',
+               'cho', 'lle', 'ñu', 'tra', 'pre', 'con', 'des', 'mar', 'sol', 'ven']
+    vocabulario = []
+    while len(vocabulario) < num_palabras:
+        palabra = ''.join(aleatorio.choice(silabas) for _ in range(aleatorio.randint(2, 4)))
+        if palabra not in vocabulario:
+            vocabulario.append(palabra)
+    # Pesos acumulados calculados una vez (choices() los recalcula si recibe pesos)
+    acumulados = list(itertools.accumulate(1 / rango for rango in range(1, num_palabras + 1)))
+
+    def textos(i: int) -> Tuple[str, str]:
+        titulo = ' '.join(aleatorio.choices(vocabulario, cum_weights=acumulados,
+                                            k=aleatorio.randint(3, 6)))
+        descripcion = ' '.join(aleatorio.choices(vocabulario, cum_weights=acumulados,
+                                                 k=aleatorio.randint(8, 20)))
+        return titulo.capitalize(), descripcion.capitalize() + '.'
+
+    return textos, vocabulario
+
+
+def benchmark_busqueda(filas: int = 1_000_000, repeticiones: int = 50) -> Dict[str, Dict[str, float]]:
+    """
+    Latencia de /api/tasks/search sobre `filas` tareas con palabras raras,
+    intermedias y muy frecuentes, y de un filtro LIKE como referencia
+
+    Returns:
+        Dict: {caso: {'p50': ms, 'p99': ms}}
+    """
+    modulo = cargar_app()
+    cliente = modulo.app.test_client()
+    textos, vocabulario = generador_textos()
+    rara, media, frecuente = vocabulario[-1], vocabulario[200], vocabulario[0]
+    consultas = {
+        f'rara ({rara})': rara,
+        f'intermedia ({media})': media,
+        f'frecuente ({frecuente})': frecuente,
+        'dos palabras': f'{media} {vocabulario[300]}',
+        'prefijo (3 letras)': media[:3],
+    }
+    resultados = {}
+    with modulo.app.app_context():
+        bd_vacia(modulo)
+        inicio = time.perf_counter()
+        insertar_tareas(modulo, 0, filas, textos)
+        print(f"{filas:,} tareas insertadas e indexadas en {time.perf_counter() - inicio:.0f} s")
+        for nombre, q in consultas.items():
+            total = modulo.db.session.execute(
+                modulo.db.text('SELECT count(*) FROM task_fts WHERE task_fts MATCH :q'),
+                {'q': modulo.fts_query(q)}).scalar()
+            resultados[nombre] = medir(lambda: cliente.get('/api/tasks/search',
+                                                           query_string={'q': q}), repeticiones)
+            print(f"  {nombre:<28} {total:>9,} coincidencias  p50 {resultados[nombre]['p50']:7.2f} ms"
+                  f"  p99 {resultados[nombre]['p99']:7.2f} ms")
+        # Sin índice, ordenar por relevancia exige todas las coincidencias: LIKE recorre la tabla entera
+        like = modulo.Task.query.filter(modulo.db.or_(modulo.Task.title.like(f'%{rara}%'),
+                                                      modulo.Task.description.like(f'%{rara}%')))
+        resultados['LIKE (antes)'] = medir(lambda: like.all(), 3)
+        print(f"  {'LIKE %rara% (antes)':<28} {'':>23}  p50 {resultados['LIKE (antes)']['p50']:7.2f} ms")
+        modulo.db.session.remove()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
+    benchmark_masivo()
+    benchmark_condicional()
+    benchmark_concurrencia()
+    benchmark_busqueda()
@@ -0,0 +1,245 @@
+"""
+CRAWLER CON POOL DE HILOS
+Versión robusta del patrón ScraperMultihilo de ejercicio19b.py:
+- concurrent.futures.ThreadPoolExecutor en lugar de hilos a mano
+- Una requests.Session por hilo (conexiones keep-alive reutilizadas),
+  o un único cliente HTTP/2 compartido con http2=True (ver transporte.py)
+- Reparto acotado: nunca hay más de max_pendientes URLs enviadas al pool,
+  así que la lista de URLs puede ser un generador enorme
+- Resultados en orden de finalización a través de un generador
+- Cancelación (cancelar() o cortar el bucle) y callback de progreso
+- Limitador de tasa y caché HTTP opcionales, como el resto de scrapers
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from cache_http import CacheHTTP, obtener_con_cache
+from limitador import LimitadorTasa
+from parser_html import crear_soup
+from transporte import ERRORES_ESTADO, MetricasTransporte, crear_cliente, crear_sesion
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def parsear_html(contenido: bytes):
+    """Parser por defecto: convierte el cuerpo de la respuesta en BeautifulSoup"""
+    return crear_soup(contenido)
+
+
+class CrawlerHilos:
+    """Descargador concurrente basado en un pool de hilos"""
+
+    def __init__(self, num_hilos: int = 8, max_pendientes: Optional[int] = None,
+                 timeout: float = 10, headers: Optional[Dict] = None,
+                 parser: Callable[[bytes], object] = parsear_html,
+                 limitador: Optional[LimitadorTasa] = None,
+                 cache: Optional[CacheHTTP] = None,
+                 al_progresar: Optional[Callable[[int, Dict], None]] = None,
+                 http2: bool = False, metricas: Optional[MetricasTransporte] = None):
+        """
+        Inicializar el crawler
+
+        Args:
+            num_hilos (int): Hilos del pool (peticiones en vuelo como máximo)
+            max_pendientes (int): URLs enviadas al pool sin recoger como
+                máximo (por defecto 2 * num_hilos)
+            timeout (float): Tiempo máximo por petición en segundos
+            headers (Dict): Cabeceras HTTP enviadas en cada petición
+            parser (Callable): Función que recibe los bytes y devuelve el resultado
+            limitador (LimitadorTasa): Limitador de tasa por host compartido
+            cache (CacheHTTP): Caché de respuestas con revalidación condicional
+            al_progresar (Callable): Se llama como al_progresar(completadas,
+                resultado) cada vez que termina una URL
+            http2 (bool): Un cliente HTTP/2 (httpx) compartido por todos los
+                hilos en lugar de una Session por hilo
+            metricas (MetricasTransporte): Dónde contar peticiones y
+                conexiones (por defecto transporte.METRICAS)
+        """
+        self.num_hilos = num_hilos
+        self.max_pendientes = max_pendientes or 2 * num_hilos
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.parser = parser
+        self.limitador = limitador
+        self.cache = cache
+        self.al_progresar = al_progresar
+        self.http2 = http2
+        self.metricas = metricas
+        self._cancelado = threading.Event()
+        self._local = threading.local()
+        self._sesiones: List = []
+        self._candado = threading.Lock()
+
+    def _sesion(self):
+        """Session del hilo actual (se crea la primera vez)"""
+        sesion = getattr(self._local, 'sesion', None)
+        if sesion is None and self.http2:
+            # HTTP/2 multiplexa: un cliente para todos los hilos
+            with self._candado:
+                if not self._sesiones:
+                    self._sesiones.append(crear_cliente(
+                        http2=True, headers=self.headers,
+                        pool_por_host=self.num_hilos, metricas=self.metricas))
+                sesion = self._local.sesion = self._sesiones[0]
+        elif sesion is None:
+            # Cada hilo tiene como mucho una petición en vuelo:
+            # una conexión por host le basta
+            sesion = crear_sesion(headers=self.headers, pool_por_host=1,
+                                  metricas=self.metricas)
+            self._local.sesion = sesion
+            with self._candado:
+                self._sesiones.append(sesion)
+        return sesion
+
+    def _descargar_una(self, url: str) -> Dict:
+        """Descargar y parsear una URL en el hilo actual"""
+        if self._cancelado.is_set():
+            return {'url': url, 'estado': None, 'resultado': None, 'error': 'cancelado'}
+        try:
+            if self.limitador:
+                self.limitador.adquirir(url)
+            logger.debug(f"Descargando: {url}")
+            respuesta = obtener_con_cache(self._sesion(), url, self.cache,
+                                          timeout=self.timeout)
+            respuesta.raise_for_status()
+        except ERRORES_ESTADO as e:
+            estado = e.response.status_code
+            # 429/503: pausar el host el tiempo que pida el servidor
+            if self.limitador and estado in (429, 503):
+                self.limitador.penalizar(url, retry_after=e.response.headers.get('Retry-After'))
+            logger.error(f"Error descargando {url}: {e!r}")
+            return {'url': url, 'estado': estado, 'resultado': None, 'error': repr(e)}
+        except Exception as e:
+            # Red, limitador, caché...: el error es de esta URL, no del crawl
+            logger.error(f"Error descargando {url}: {e!r}")
+            return {'url': url, 'estado': None, 'resultado': None, 'error': repr(e)}
+        try:
+            resultado = self.parser(respuesta.content)
+        except Exception as e:
+            logger.error(f"Error parseando {url}: {e!r}")
+            return {'url': url, 'estado': respuesta.status_code, 'resultado': None,
+                    'error': repr(e)}
+        return {'url': url, 'estado': respuesta.status_code, 'resultado': resultado, 'error': None}
+
+    def descargar(self, urls: Iterable[str]) -> Iterator[Dict]:
+        """
+        Descargar y parsear un iterable de URLs
+
+        Las URLs se consumen de forma perezosa. Si se deja de iterar el
+        generador (break) o se llama a cancelar(), las URLs que aún no han
+        empezado se descartan y el pool se cierra.
+
+        Args:
+            urls (Iterable[str]): URLs a descargar
+
+        Yields:
+            Dict: {'url', 'estado', 'resultado', 'error'} en orden de finalización
+        """
+        self._cancelado.clear()
+        urls_pendientes = iter(urls)
+        completadas = 0
+        pool = ThreadPoolExecutor(max_workers=self.num_hilos,
+                                  thread_name_prefix='crawler')
+        en_vuelo = set()
+        try:
+            while True:
+                while len(en_vuelo) < self.max_pendientes and not self._cancelado.is_set():
+                    url = next(urls_pendientes, None)
+                    if url is None:
+                        break
+                    en_vuelo.add(pool.submit(self._descargar_una, url))
+                if not en_vuelo:
+                    break
+                hechos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    resultado = futuro.result()
+                    if resultado['error'] == 'cancelado':
+                        continue
+                    completadas += 1
+                    if self.al_progresar:
+                        self.al_progresar(completadas, resultado)
+                    yield resultado
+        finally:
+            for futuro in en_vuelo:
+                futuro.cancel()
+            pool.shutdown(wait=True)
+            self._cerrar_sesiones()
+
+    def descargar_todo(self, urls: Iterable[str]) -> List[Dict]:
+        """
+        Versión que devuelve una lista
+
+        Returns:
+            List[Dict]: Resultados en orden de finalización
+        """
+        return list(self.descargar(urls))
+
+    def cancelar(self):
+        """Parar el crawl: no se envían más URLs y las pendientes se descartan"""
+        self._cancelado.set()
+
+    def _cerrar_sesiones(self):
+        with self._candado:
+            for sesion in self._sesiones:
+                sesion.close()
+            self._sesiones.clear()
+        # Las sesiones de los hilos terminados ya no son válidas
+        self._local = threading.local()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_paginas: int = 200, latencia: float = 0.02,
+              niveles=(4, 16, 64)) -> Dict[str, float]:
+    """
+    Comparar WebScraper (una página cada vez) con CrawlerHilos contra un
+    servidor local con latencia artificial
+
+    Returns:
+        Dict[str, float]: Páginas/segundo de cada configuración
+    """
+    from ejercicio19 import WebScraper
+    from servidor_pruebas import iniciar_servidor_prueba
+
+    servidor, url_base = iniciar_servidor_prueba(latencia=latencia)
+    urls = [f"{url_base}/pagina/{i}" for i in range(num_paginas)]
+    resultados = {}
+    nivel_log = logging.getLogger('ejercicio19').level
+    try:
+        scraper = WebScraper(delay=0)
+        logging.getLogger('ejercicio19').setLevel(logging.WARNING)
+        inicio = time.perf_counter()
+        for url in urls:
+            scraper.descargar_pagina(url)
+        resultados['WebScraper'] = num_paginas / (time.perf_counter() - inicio)
+        logger.info(f"WebScraper (secuencial): {resultados['WebScraper']:8.1f} páginas/s")
+
+        for nivel in niveles:
+            crawler = CrawlerHilos(num_hilos=nivel)
+            inicio = time.perf_counter()
+            ok = sum(1 for r in crawler.descargar(urls) if r['error'] is None)
+            nombre = f"CrawlerHilos({nivel})"
+            resultados[nombre] = ok / (time.perf_counter() - inicio)
+            logger.info(f"{nombre:<23}: {resultados[nombre]:8.1f} páginas/s "
+                        f"({ok}/{num_paginas} ok)")
+    finally:
+        logging.getLogger('ejercicio19').setLevel(nivel_log)
+        servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    logger.info("=" * 60)
+    logger.info("BENCHMARK: crawler con pool de hilos")
+    logger.info("=" * 60)
+    benchmark()
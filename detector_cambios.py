@@ -0,0 +1,229 @@
+"""
+DETECCIÓN DE CAMBIOS CON ÍNDICE DE HASHES
+Compara el estado nuevo de un catálogo con el anterior en tiempo lineal:
+- Cada elemento se identifica por un campo (o varios) configurable
+- Se guarda un hash del contenido por elemento: solo los que cambian
+  de hash se comparan campo a campo
+- Informa de nuevos, eliminados y modificados (con diff por campo)
+- El estado vive en SQLite indexado por id: cada ejecución solo escribe
+  las filas que cambiaron, no el archivo entero
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+TAMANO_CONSULTA = 500  # Ids por consulta IN (...) para no pasar el límite de SQLite
+
+CampoId = Union[None, str, Sequence[str], Callable[[Dict], object]]
+
+
+def hash_contenido(item: Dict) -> str:
+    """Hash estable del contenido (independiente del orden de las claves)"""
+    texto = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def identificar(item: Dict, campo_id: CampoId, hash_item: str = None) -> str:
+    """
+    Id de un elemento según campo_id (ver DetectorCambios)
+
+    Con campo_id None el id es el hash del contenido (se calcula si no se pasa)
+    """
+    if campo_id is None:
+        return hash_item or hash_contenido(item)
+    if callable(campo_id):
+        return str(campo_id(item))
+    if isinstance(campo_id, str):
+        return str(item.get(campo_id))
+    return json.dumps([item.get(campo) for campo in campo_id],
+                      ensure_ascii=False, default=str)
+
+
+def diff_campos(antes: Dict, despues: Dict) -> Dict[str, Dict]:
+    """Campos que cambiaron: {campo: {'antes': valor, 'despues': valor}}"""
+    cambios = {}
+    for campo in antes.keys() | despues.keys():
+        if antes.get(campo) != despues.get(campo):
+            cambios[campo] = {'antes': antes.get(campo), 'despues': despues.get(campo)}
+    return cambios
+
+
+class DetectorCambios:
+    """Estado persistente de un catálogo y comparación incremental"""
+
+    def __init__(self, archivo_estado: str = 'estado.db', campo_id: CampoId = None):
+        """
+        Args:
+            archivo_estado (str): Archivo SQLite donde se guarda el estado
+            campo_id: Campo que identifica cada elemento ('url'), varios
+                (('tienda', 'sku')) o una función item -> id. Con None el id
+                es el propio hash, así que un cambio se ve como baja + alta
+        """
+        self.archivo_estado = archivo_estado
+        self.campo_id = campo_id
+        self._conexion = sqlite3.connect(archivo_estado)
+        self._conexion.executescript('''
+            CREATE TABLE IF NOT EXISTS elementos (
+                id TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                datos TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+        ''')
+
+    def identificar(self, item: Dict, hash_item: str) -> str:
+        """Calcular el id de un elemento según campo_id"""
+        return identificar(item, self.campo_id, hash_item)
+
+    @property
+    def ejecuciones(self) -> int:
+        """Número de comparaciones guardadas hasta ahora"""
+        fila = self._conexion.execute(
+            "SELECT valor FROM meta WHERE clave = 'ejecuciones'"
+        ).fetchone()
+        return int(fila[0]) if fila else 0
+
+    def _cargar_datos(self, ids: List[str]) -> Dict[str, Dict]:
+        """Leer el contenido guardado de unos ids concretos"""
+        datos = {}
+        for i in range(0, len(ids), TAMANO_CONSULTA):
+            bloque = ids[i:i + TAMANO_CONSULTA]
+            marcadores = ','.join('?' * len(bloque))
+            for id_, texto in self._conexion.execute(
+                f'SELECT id, datos FROM elementos WHERE id IN ({marcadores})', bloque
+            ):
+                datos[id_] = json.loads(texto)
+        return datos
+
+    def comparar(self, datos_nuevos: Iterable[Dict], guardar: bool = True) -> Dict[str, List]:
+        """
+        Comparar el estado nuevo con el guardado
+
+        Args:
+            datos_nuevos (Iterable[Dict]): Elementos actuales del catálogo
+            guardar (bool): Aplicar los cambios al estado persistente
+
+        Returns:
+            Dict: {'nuevos': [items], 'eliminados': [items],
+                   'modificados': [{'id', 'cambios': {campo: {'antes', 'despues'}}}]}
+        """
+        # Solo (id, hash) del estado anterior: O(n) en memoria, sin los datos
+        anteriores = dict(self._conexion.execute('SELECT id, hash FROM elementos'))
+
+        actuales: Dict[str, tuple] = {}
+        for item in datos_nuevos:
+            hash_item = hash_contenido(item)
+            id_ = self.identificar(item, hash_item)
+            if id_ in actuales:
+                logger.warning(f"Id duplicado '{id_}': se usa el último elemento")
+            actuales[id_] = (hash_item, item)
+
+        nuevos = [id_ for id_ in actuales if id_ not in anteriores]
+        eliminados = [id_ for id_ in anteriores if id_ not in actuales]
+        modificados = [id_ for id_, (hash_item, _) in actuales.items()
+                       if id_ in anteriores and anteriores[id_] != hash_item]
+
+        datos_previos = self._cargar_datos(eliminados + modificados)
+        resultado = {
+            'nuevos': [actuales[id_][1] for id_ in nuevos],
+            'eliminados': [datos_previos[id_] for id_ in eliminados],
+            'modificados': [
+                {'id': id_, 'cambios': diff_campos(datos_previos[id_], actuales[id_][1])}
+                for id_ in modificados
+            ],
+        }
+
+        if guardar:
+            self._guardar(actuales, nuevos, eliminados, modificados)
+        return resultado
+
+    def importar(self, datos: Iterable[Dict]):
+        """
+        Tomar datos de una ejecución anterior como estado guardado (p. ej. al
+        migrar desde el antiguo estado.json); cuenta como una ejecución, así
+        que la siguiente comparación ya informa de cambios
+        """
+        if self.ejecuciones:
+            raise ValueError(f"{self.archivo_estado} ya tiene estado: no se importa encima")
+        self.comparar(datos)
+
+    def _guardar(self, actuales, nuevos, eliminados, modificados):
+        """Escribir solo las filas que cambiaron, en una transacción"""
+        def filas(ids):
+            for id_ in ids:
+                hash_item, item = actuales[id_]
+                yield id_, hash_item, json.dumps(item, ensure_ascii=False, default=str)
+
+        with self._conexion:
+            self._conexion.executemany(
+                'INSERT OR REPLACE INTO elementos (id, hash, datos) VALUES (?, ?, ?)',
+                filas(nuevos + modificados)
+            )
+            self._conexion.executemany(
+                'DELETE FROM elementos WHERE id = ?', ((id_,) for id_ in eliminados)
+            )
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('ejecuciones', ?)",
+                (str(self.ejecuciones + 1),)
+            )
+
+    def cerrar(self):
+        """Cerrar el archivo de estado"""
+        self._conexion.close()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_items: int = 100_000, porcentaje_cambios: float = 0.01) -> Dict[str, float]:
+    """
+    Comparar la búsqueda lineal en listas (el MonitorCambios original)
+    con el índice de hashes, sobre un catálogo con un 1% de cambios
+
+    Returns:
+        Dict[str, float]: Segundos de cada método
+    """
+    import os
+    import tempfile
+
+    anteriores = [{'id': i, 'nombre': f'Producto {i}', 'precio': f'${i}.99'}
+                  for i in range(num_items)]
+    paso = max(1, int(1 / porcentaje_cambios))
+    nuevos = [dict(item, precio='$0.00') if i % paso == 0 else item
+              for i, item in enumerate(anteriores)]
+
+    resultados = {}
+    # La versión con listas es O(n²): se mide sobre una muestra repartida
+    # por todo el catálogo y se extrapola (nuevos + eliminados = 2 pasadas)
+    muestra = nuevos[::max(1, num_items // 1_000)]
+    inicio = time.perf_counter()
+    [d for d in muestra if d not in anteriores]
+    resultados['listas'] = (time.perf_counter() - inicio) * 2 * num_items / len(muestra)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        detector = DetectorCambios(os.path.join(directorio, 'estado.db'), campo_id='id')
+        detector.comparar(anteriores)
+        inicio = time.perf_counter()
+        cambios = detector.comparar(nuevos)
+        resultados['hashes'] = time.perf_counter() - inicio
+        detector.cerrar()
+
+    print(f"{num_items} elementos, {len(cambios['modificados'])} modificados:")
+    print(f"  listas (estimado): {resultados['listas']:9.2f} s")
+    print(f"  índice de hashes:  {resultados['hashes']:9.2f} s "
+          f"({resultados['listas'] / resultados['hashes']:.0f}x)")
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
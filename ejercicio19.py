@@ -8,18 +8,23 @@ Sistema completo que incluye:
 - Exportación a CSV y JSON
 """
 
-import requests
 from bs4 import BeautifulSoup
-import csv
 import json
-import time
 from datetime import datetime
 import pandas as pd
 from urllib.parse import urljoin
 import re
-from typing import List, Dict
+from typing import Iterable, List, Dict
 import logging
 
+from cache_http import CacheHTTP, obtener_con_cache
+from exportadores import SumideroCSV
+from extractor_tablas import iterar_filas_tabla
+from motor_descargas import MotorDescargas
+from normalizador_precios import normalizar_precios
+from parser_html import crear_soup
+from transporte import ERRORES_RED, crear_sesion
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,40 +36,65 @@ logger = logging.getLogger(__name__)
 class WebScraper:
     """Clase principal para web scraping"""
     
-    def __init__(self, delay=1):
+    def __init__(self, delay=1, cache: CacheHTTP = None):
         """
         Inicializar el scraper
         
         Args:
             delay (int): Segundos de espera entre requests (buena práctica)
+            cache (CacheHTTP): Caché HTTP opcional para no volver a descargar
+                páginas que no han cambiado
         """
         self.delay = delay
-        self.session = requests.Session()
+        self.cache = cache
         # Usar un User-Agent realista para evitar bloqueos
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        # Pool por host explícito y keep-alive (ver transporte.py)
+        self.session = crear_sesion(headers=self.headers)
+        # Motor asíncrono: el delay se aplica por host, no como sleep global
+        self.motor = MotorDescargas(max_concurrencia=16, max_por_host=1,
+                                    delay_por_host=delay, headers=self.headers,
+                                    cache=cache)
     
     def descargar_pagina(self, url: str) -> BeautifulSoup:
         """
         Descargar y parsear una página web
         
+        Usa la Session compartida (la conexión se reutiliza entre llamadas)
+        y el mismo limitador por host que el motor asíncrono
+        
         Args:
             url (str): URL de la página a descargar
             
         Returns:
-            BeautifulSoup: Objeto parseado del HTML
+            BeautifulSoup: Objeto parseado del HTML, o None si falla
         """
         try:
             logger.info(f"Descargando: {url}")
-            response = self.session.get(url, headers=self.headers, timeout=10)
+            if self.motor.limitador:
+                self.motor.limitador.adquirir(url)
+            response = obtener_con_cache(self.session, url, self.cache, timeout=10)
             response.raise_for_status()
-            time.sleep(self.delay)  # Respetar el servidor
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.RequestException as e:
+            return crear_soup(response.content)
+        except ERRORES_RED as e:
             logger.error(f"Error descargando {url}: {e}")
             return None
     
+    def descargar_paginas(self, urls: Iterable[str]) -> Dict[str, BeautifulSoup]:
+        """
+        Descargar y parsear muchas páginas a la vez con el motor asíncrono
+        
+        Args:
+            urls (Iterable[str]): URLs a descargar
+            
+        Returns:
+            Dict[str, BeautifulSoup]: URL -> página parseada (None si falla)
+        """
+        return {resultado['url']: resultado['resultado']
+                for resultado in self.motor.descargar_todo(urls)}
+    
     def extraer_noticias_ejemplo(self) -> List[Dict]:
         """
         Ejemplo: Extraer noticias de un sitio (usando ejemplo local)
@@ -96,7 +126,7 @@ class WebScraper:
         </html>
         """
         
-        soup = BeautifulSoup(html_ejemplo, 'html.parser')
+        soup = crear_soup(html_ejemplo)
         noticias = []
         
         # Buscar todos los artículos
@@ -150,32 +180,26 @@ class WebScraper:
         </html>
         """
         
-        soup = BeautifulSoup(html_ejemplo, 'html.parser')
+        soup = crear_soup(html_ejemplo)
         productos = []
         
-        # Buscar todos los productos
-        items = soup.find_all('div', class_='producto')
+        # Buscar todos los productos con nombre y precio
+        items = [item for item in soup.find_all('div', class_='producto')
+                 if item.find('h3', class_='nombre') and item.find('span', class_='precio')]
+        # Limpiar todos los precios de una vez (moneda, separadores, rangos)
+        precios = normalizar_precios([item.find('span', class_='precio').text for item in items])
         
-        for item in items:
+        for item, precio in zip(items, precios):
             nombre = item.find('h3', class_='nombre')
-            precio_elem = item.find('span', class_='precio')
             disponibilidad = item.find('span', class_='disponibilidad')
             
-            if nombre and precio_elem:
-                # Limpiar precio (remover $ y convertir a float)
-                precio_texto = precio_elem.text.replace('$', '').strip()
-                try:
-                    precio = float(precio_texto)
-                except ValueError:
-                    precio = 0.0
-                
-                producto = {
-                    'nombre': nombre.text.strip(),
-                    'precio': precio,
-                    'disponibilidad': disponibilidad.text.strip() if disponibilidad else 'N/A'
-                }
-                productos.append(producto)
-                logger.info(f"Producto extraído: {producto['nombre']} - ${producto['precio']}")
+            producto = {
+                'nombre': nombre.text.strip(),
+                'precio': 0.0 if pd.isna(precio) else float(precio),
+                'disponibilidad': disponibilidad.text.strip() if disponibilidad else 'N/A'
+            }
+            productos.append(producto)
+            logger.info(f"Producto extraído: {producto['nombre']} - ${producto['precio']}")
         
         return productos
     
@@ -223,25 +247,10 @@ class WebScraper:
         </html>
         """
         
-        soup = BeautifulSoup(html_ejemplo, 'html.parser')
-        tabla = soup.find('table', class_='estadisticas')
-        
-        if not tabla:
-            return []
-        
-        # Extraer encabezados
-        encabezados = []
-        for th in tabla.find_all('th'):
-            encabezados.append(th.text.strip())
-        
-        # Extraer filas
+        # Extracción en streaming: cada fila se entrega al cerrarse,
+        # sin construir el DOM de toda la tabla
         datos = []
-        for tr in tabla.find_all('tbody')[0].find_all('tr'):
-            celdas = tr.find_all('td')
-            fila = {}
-            for i, celda in enumerate(celdas):
-                if i < len(encabezados):
-                    fila[encabezados[i]] = celda.text.strip()
+        for fila in iterar_filas_tabla(html_ejemplo, clase='estadisticas'):
             datos.append(fila)
             logger.info(f"Fila extraída: {fila}")
         
@@ -272,7 +281,7 @@ class WebScraper:
         </html>
         """
         
-        soup = BeautifulSoup(html_ejemplo, 'html.parser')
+        soup = crear_soup(html_ejemplo)
         
         resultados = {}
         
@@ -295,23 +304,21 @@ class WebScraper:
         logger.info(f"Selectores CSS aplicados: {resultados}")
         return resultados
     
-    def guardar_csv(self, datos: List[Dict], nombre_archivo: str):
+    def guardar_csv(self, datos: Iterable[Dict], nombre_archivo: str):
         """
         Guardar datos en formato CSV
         
         Args:
-            datos (List[Dict]): Lista de diccionarios
-            nombre_archivo (str): Nombre del archivo CSV
+            datos (Iterable[Dict]): Lista o generador de diccionarios; las
+                columnas que aparezcan en filas posteriores también se guardan
+            nombre_archivo (str): Nombre del archivo CSV (.csv.gz para comprimir)
         """
-        if not datos:
-            logger.warning(f"No hay datos para guardar en {nombre_archivo}")
-            return
-        
         try:
-            with open(nombre_archivo, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=datos[0].keys())
-                writer.writeheader()
-                writer.writerows(datos)
+            with SumideroCSV(nombre_archivo) as sumidero:
+                sumidero.escribir_todos(datos)
+            if not sumidero.registros_escritos:
+                logger.warning(f"No hay datos para guardar en {nombre_archivo}")
+                return
             logger.info(f"Datos guardados en {nombre_archivo}")
         except Exception as e:
             logger.error(f"Error guardando CSV: {e}")
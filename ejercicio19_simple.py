@@ -7,10 +7,11 @@ Extracción de datos web - Versión fácil de entender
 # PASO 1: IMPORTAR LAS LIBRERÍAS QUE NECESITAMOS
 # ============================================================================
 
-import requests                    # Para descargar páginas web
-from bs4 import BeautifulSoup     # Para leer el HTML
 import csv                         # Para guardar datos en Excel-like
 import json                        # Para guardar datos en formato JSON
+from parser_html import crear_soup  # Elige el parser más rápido instalado
+from transporte import sesion_compartida  # Reutiliza las conexiones
+from normalizador_precios import precio as leer_precio  # '$1,299.99' -> 1299.99
 
 
 # ============================================================================
@@ -33,8 +34,9 @@ def descargar_pagina(url):
     }
     
     try:
-        # Descargar la página
-        respuesta = requests.get(url, headers=headers, timeout=5)
+        # Descargar la página (la sesión compartida reutiliza la conexión
+        # en lugar de abrir una nueva cada vez, como haría requests.get)
+        respuesta = sesion_compartida().get(url, headers=headers, timeout=5)
         print(f"✓ Página descargada: {url}")
         return respuesta.text  # Devolver el HTML
     except Exception as e:
@@ -56,7 +58,9 @@ def parsear_html(html_texto):
     Devuelve:
         BeautifulSoup: Objeto que podemos consultar
     """
-    soup = BeautifulSoup(html_texto, 'html.parser')
+    # crear_soup usa lxml si está instalado (mucho más rápido)
+    # y si no, el 'html.parser' de siempre
+    soup = crear_soup(html_texto)
     return soup
 
 
@@ -168,9 +172,9 @@ def extraer_productos_simple():
         # Extraer nombre
         nombre = producto.find('h3').text
         
-        # Extraer precio (viene con $, lo quitamos)
+        # Extraer precio (viene con $ y quizá con comas de miles)
         precio_texto = producto.find('span', class_='precio').text
-        precio = float(precio_texto.replace('$', ''))
+        precio = leer_precio(precio_texto)
         
         print(f"Producto: {nombre}")
         print(f"Precio: ${precio}")
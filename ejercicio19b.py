@@ -11,6 +11,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
 import logging
 
+from renderizado import PoliticaRenderizado
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -21,15 +23,31 @@ logger = logging.getLogger(__name__)
 class ScraperSelenium:
     """Clase para web scraping de sitios con JavaScript"""
     
-    def __init__(self):
-        """Inicializar el driver de Selenium (Chrome)"""
+    def __init__(self, pool=None):
+        """
+        Inicializar el driver de Selenium (Chrome)
+        
+        Args:
+            pool (PoolNavegadores): Pool de navegadores ya arrancados; con él
+                inicializar_driver() toma uno prestado en lugar de arrancar
+                Chrome y cerrar_driver() lo devuelve limpio al pool
+        """
         self.driver = None
+        self.pool = pool
     
     def inicializar_driver(self):
         """
         Inicializar el navegador Chrome
         Nota: Requiere ChromeDriver descargado
         """
+        if self.pool is not None:
+            try:
+                self.driver = self.pool.adquirir()
+                logger.info("✓ Driver tomado del pool de navegadores")
+                return True
+            except Exception as e:
+                logger.warning(f"⚠ No hay navegador disponible en el pool: {e}")
+                return False
         try:
             # Opciones del navegador
             opciones = webdriver.ChromeOptions()
@@ -48,10 +66,14 @@ class ScraperSelenium:
             return False
     
     def cerrar_driver(self):
-        """Cerrar el navegador"""
-        if self.driver:
+        """Cerrar el navegador (o devolverlo al pool)"""
+        if self.driver and self.pool is not None:
+            self.pool.liberar(self.driver)
+            logger.info("Driver devuelto al pool")
+        elif self.driver:
             self.driver.quit()
             logger.info("Driver cerrado")
+        self.driver = None
     
     def esperar_elemento(self, selector, timeout=10):
         """
@@ -74,6 +96,29 @@ class ScraperSelenium:
             logger.warning(f"⚠ Timeout esperando: {selector}")
             return None
     
+    def obtener_pagina(self, url, selectores_requeridos, requisito_json=None):
+        """
+        Obtener una página dinámica por la vía más barata
+        
+        Primero un GET normal (los datos suelen venir en el HTML o en JSON
+        embebido como __NEXT_DATA__ o ld+json); solo si faltan los
+        selectores requeridos se renderiza con el navegador, bloqueando
+        imágenes, fuentes, CSS y scripts de analítica.
+        
+        Args:
+            url (str): Página a obtener
+            selectores_requeridos (List[str]): Selectores CSS con los datos
+            requisito_json (Callable): JSON embebido -> True si ya basta
+            
+        Returns:
+            Dict: {'url', 'modo': 'estatico' | 'navegador', 'soup', 'json'}
+        """
+        with PoliticaRenderizado(selectores_requeridos, requisito_json=requisito_json,
+                                 pool=self.pool) as politica:
+            pagina = politica.obtener(url)
+        logger.info(f"✓ {url} obtenida en modo {pagina['modo']}")
+        return pagina
+    
     def simular_ejemplo_dinamico(self):
         """
         Ejemplo simulado de web scraping con contenido dinámico
@@ -87,7 +132,8 @@ class ScraperSelenium:
             'URL': 'https://ejemplo-dinamico.com',
             'Método': 'Selenium + WebDriverWait',
             'Pasos': [
-                '1. Cargar página con JavaScript',
+                '0. Probar antes un GET normal + JSON embebido (obtener_pagina)',
+                '1. Cargar página con JavaScript (sin imágenes, fuentes ni analítica)',
                 '2. Esperar elemento específico',
                 '3. Extraer datos del DOM modificado',
                 '4. Manejar eventos (clicks, scroll)',
@@ -136,7 +182,7 @@ class PatronesAvanzados:
         codigo = '''
 # Scraping de múltiples páginas
 import requests
-from bs4 import BeautifulSoup
+from parser_html import crear_soup
 import time
 
 def scraping_paginado(url_base, num_paginas=5):
@@ -145,7 +191,7 @@ def scraping_paginado(url_base, num_paginas=5):
     for pagina in range(1, num_paginas + 1):
         url = f"{url_base}?page={pagina}"
         response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = crear_soup(response.content)
         
         # Extraer datos de la página actual
         items = soup.find_all('div', class_='item')
@@ -158,6 +204,23 @@ def scraping_paginado(url_base, num_paginas=5):
         time.sleep(2)  # Respetar servidor
     
     return datos
+
+# Re-crawls diarios: modo incremental. Sigue los enlaces rel=next y se
+# para en la primera página cuyos items ya se vieron en la ejecución
+# anterior (índice de ids en SQLite), así que un listado de cientos de
+# páginas se revisa con un par de peticiones
+from paginacion import PaginadorIncremental
+
+def scraping_incremental(url_base):
+    selectores = {
+        'principal': 'div.item',
+        'campos': {'titulo': 'h2', 'precio': 'span.precio'}
+    }
+    paginador = PaginadorIncremental(selectores, campo_id='titulo')
+    datos = paginador.recorrer_todo(url_base)  # Solo los items nuevos
+    logger.info(f"✓ {len(datos)} items nuevos en "
+                f"{paginador.estadisticas['paginas']} páginas")
+    return datos
         '''
         logger.info(codigo)
         return codigo
@@ -174,6 +237,7 @@ def scraping_paginado(url_base, num_paginas=5):
         codigo = '''
 # Scraping con autenticación
 import requests
+from parser_html import crear_soup
 
 session = requests.Session()
 
@@ -188,7 +252,7 @@ response = session.post('https://ejemplo.com/login', data=credenciales)
 
 # 2. Ahora podemos acceder a páginas protegidas
 response = session.get('https://ejemplo.com/datos-privados')
-soup = BeautifulSoup(response.content, 'html.parser')
+soup = crear_soup(response.content)
 
 # Extraer datos de la página protegida
 datos = soup.find_all('div', class_='contenido')
@@ -207,14 +271,13 @@ datos = soup.find_all('div', class_='contenido')
         
         codigo = '''
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import logging
+from parser_html import crear_soup
+from transporte import crear_sesion
 
 def crear_sesion_robusta():
     """Crear sesión con reintentos automáticos"""
-    session = requests.Session()
-    
     # Configurar reintentos
     retry = Retry(
         total=3,  # Número de reintentos
@@ -222,11 +285,9 @@ def crear_sesion_robusta():
         status_forcelist=[500, 502, 503, 504]
     )
     
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    
-    return session
+    # Pool por host explícito y keep-alive TCP; cuenta conexiones
+    # y handshakes TLS en transporte.METRICAS
+    return crear_sesion(reintentos=retry, pool_por_host=16)
 
 # Usar la sesión
 session = crear_sesion_robusta()
@@ -234,7 +295,7 @@ session = crear_sesion_robusta()
 try:
     response = session.get('https://ejemplo.com', timeout=10)
     response.raise_for_status()
-    soup = BeautifulSoup(response.content, 'html.parser')
+    soup = crear_soup(response.content)
 except requests.exceptions.RequestException as e:
     logging.error(f"Error: {e}")
         '''
@@ -251,54 +312,34 @@ except requests.exceptions.RequestException as e:
         logger.info("="*60)
         
         codigo = '''
-import threading
-import requests
-from queue import Queue
-from bs4 import BeautifulSoup
+import logging
+from crawler_hilos import CrawlerHilos
+from parser_html import crear_soup
 
-class ScraperMultihilo:
-    def __init__(self, urls, num_workers=5):
-        self.urls = urls
-        self.num_workers = num_workers
-        self.queue = Queue()
-        self.resultados = []
-    
-    def worker(self):
-        """Función ejecutada por cada hilo"""
-        while not self.queue.empty():
-            url = self.queue.get()
-            try:
-                response = requests.get(url, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                titulo = soup.find('h1')
-                if titulo:
-                    self.resultados.append({
-                        'url': url,
-                        'titulo': titulo.text
-                    })
-            except Exception as e:
-                logging.error(f"Error scraping {url}: {e}")
-            finally:
-                self.queue.task_done()
-    
-    def ejecutar(self):
-        """Iniciar scraping multi-hilo"""
-        # Llenar la cola
-        for url in self.urls:
-            self.queue.put(url)
-        
-        # Crear y iniciar hilos
-        hilos = []
-        for _ in range(self.num_workers):
-            t = threading.Thread(target=self.worker)
-            t.start()
-            hilos.append(t)
-        
-        # Esperar a que se completen
-        for t in hilos:
-            t.join()
-        
-        return self.resultados
+def extraer_titulo(contenido):
+    """Parser de cada página (se ejecuta en el hilo que la descargó)"""
+    soup = crear_soup(contenido)
+    titulo = soup.find('h1')
+    return titulo.text if titulo else None
+
+def mostrar_progreso(completadas, resultado):
+    if completadas % 100 == 0:
+        logging.info(f"{completadas} páginas descargadas")
+
+# Pool de hilos con una requests.Session por hilo; nunca hay más de
+# max_pendientes URLs en cola, así que urls puede ser un generador enorme
+crawler = CrawlerHilos(num_hilos=5, parser=extraer_titulo,
+                       al_progresar=mostrar_progreso)
+
+resultados = []
+for r in crawler.descargar(urls):  # En orden de finalización
+    if r['error']:
+        logging.error(f"Error scraping {r['url']}: {r['error']}")
+    elif r['resultado']:
+        resultados.append({'url': r['url'], 'titulo': r['resultado']})
+
+# crawler.cancelar() (desde otro hilo o desde el callback) o un break
+# en el bucle descartan las URLs que aún no han empezado
         '''
         logger.info(codigo)
         return codigo
@@ -4,13 +4,26 @@ Scripts que puedes copiar y adaptar a tus necesidades
 """
 
 import requests
-from bs4 import BeautifulSoup
-import csv
 import json
-import time
 import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from cache_http import obtener_con_cache
+from detector_cambios import DetectorCambios
+from exportadores import SumideroCSV, SumideroJSON, SumideroJSONL, SumideroParquet
+from extractor_tablas import iterar_filas_tabla
+from limitador import LimitadorTasa
+from normalizador_precios import (normalizar_precios, normalizar_puntuaciones,
+                                  precio, puntuacion)
+from parser_html import crear_soup
+from pipeline_procesos import PipelineDosEtapas
+from plan_selectores import compilar_plan
+from registro_eventos import EscritorEventos
+from transporte import crear_sesion
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -22,29 +35,41 @@ logger = logging.getLogger(__name__)
 class ScraperBasico:
     """Scraper robusto y reutilizable"""
     
-    def __init__(self, delay=1):
+    def __init__(self, delay=1, limitador=None, cache=None):
         self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.cache = cache  # CacheHTTP opcional (revalida con 304)
+        # Un token bucket por host: cada servidor se limita por separado.
+        # Se puede pasar un limitador compartido entre varios scrapers.
+        # Con delay=0 no hay límite de tasa, pero se respetan Retry-After y backoff.
+        self.limitador = limitador or LimitadorTasa(
+            tasa=1 / delay if delay > 0 else None, rafaga=1
+        )
+        self.session = crear_sesion(headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
         })
     
     def obtener(self, url, max_reintentos=3):
         """Obtener página con reintentos"""
         for intento in range(max_reintentos):
+            self.limitador.adquirir(url)
             try:
                 logger.info(f"Intento {intento+1}: GET {url}")
-                response = self.session.get(url, timeout=10)
+                response = obtener_con_cache(self.session, url, self.cache, timeout=10)
                 response.raise_for_status()
-                time.sleep(self.delay)
                 return response.text
             except requests.RequestException as e:
                 logger.warning(f"Error: {e}")
                 if intento < max_reintentos - 1:
-                    espera = 2 ** intento  # Backoff exponencial
-                    logger.info(f"Reintentando en {espera} segundos...")
-                    time.sleep(espera)
+                    # Backoff con jitter (o Retry-After) solo para este host
+                    retry_after = e.response.headers.get('Retry-After') if e.response is not None else None
+                    espera = self.limitador.penalizar(url, intento, retry_after)
+                    logger.info(f"Reintentando en {espera:.1f} segundos...")
         return None
+    
+    def obtener_varias(self, urls, num_hilos=8, max_reintentos=3):
+        """Obtener varias páginas en paralelo; el limitador reparte los turnos por host"""
+        with ThreadPoolExecutor(max_workers=num_hilos) as executor:
+            return list(executor.map(lambda url: self.obtener(url, max_reintentos), urls))
 
 
 # ============================================================================
@@ -57,40 +82,27 @@ class ExtractorTabla:
     @staticmethod
     def html_a_lista_diccionarios(html_tabla):
         """Convertir tabla HTML a lista de diccionarios"""
-        soup = BeautifulSoup(html_tabla, 'html.parser')
-        tabla = soup.find('table')
-        
-        if not tabla:
-            return []
-        
-        # Extraer encabezados
-        encabezados = []
-        for th in tabla.find_all('th'):
-            encabezados.append(th.text.strip())
-        
-        # Extraer filas
-        datos = []
-        for tr in tabla.find_all('tbody')[0].find_all('tr'):
-            fila = {}
-            celdas = tr.find_all('td')
-            for i, celda in enumerate(celdas):
-                if i < len(encabezados):
-                    fila[encabezados[i]] = celda.text.strip()
-            datos.append(fila)
+        return list(ExtractorTabla.iterar_filas(html_tabla))
+    
+    @staticmethod
+    def iterar_filas(fuente, indice=0, clase=None):
+        """
+        Recorrer las filas de una tabla sin cargar el DOM completo
         
-        return datos
+        Acepta str/bytes, un archivo abierto o response.iter_content(),
+        y entrega cada fila (dict) en cuanto se cierra. Expande
+        colspan/rowspan y detecta las filas de encabezado.
+        """
+        return iterar_filas_tabla(fuente, indice=indice, clase=clase)
     
     @staticmethod
     def guardar_csv(datos, archivo):
-        """Guardar datos en CSV"""
-        if not datos:
+        """Guardar datos (lista o iterador de dicts) en CSV"""
+        with SumideroCSV(archivo) as sumidero:
+            sumidero.escribir_todos(datos)
+        if not sumidero.registros_escritos:
             logger.warning("No hay datos para guardar")
             return
-        
-        with open(archivo, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=datos[0].keys())
-            writer.writeheader()
-            writer.writerows(datos)
         logger.info(f"✓ Guardado en {archivo}")
     
     @staticmethod
@@ -110,23 +122,23 @@ class ExtractorProducto:
     
     @staticmethod
     def extraer_precio(texto_precio):
-        """Limpiar y convertir precio a float"""
-        import re
-        # Buscar números y puntos
-        match = re.search(r'\d+[\.,]\d+', texto_precio)
-        if match:
-            precio = match.group(0).replace(',', '.')
-            return float(precio)
-        return None
+        """Limpiar y convertir precio a float (para muchos, extraer_precios)"""
+        return precio(texto_precio)
     
     @staticmethod
     def extraer_puntuacion(texto_puntuacion):
-        """Extraer puntuación de reseñas"""
-        import re
-        match = re.search(r'[\d.]+', texto_puntuacion)
-        if match:
-            return float(match.group(0))
-        return None
+        """Extraer puntuación de reseñas (para muchas, extraer_puntuaciones)"""
+        return puntuacion(texto_puntuacion)
+    
+    @staticmethod
+    def extraer_precios(textos_precio):
+        """Columna de precios en texto -> floats (NaN si no hay precio)"""
+        return normalizar_precios(textos_precio)
+    
+    @staticmethod
+    def extraer_puntuaciones(textos_puntuacion):
+        """Columna de puntuaciones en texto -> floats (NaN si no hay)"""
+        return normalizar_puntuaciones(textos_puntuacion)
     
     @staticmethod
     def scraping_productos_ejemplo():
@@ -152,18 +164,21 @@ class ExtractorProducto:
         </div>
         '''
         
-        soup = BeautifulSoup(html, 'html.parser')
-        productos = []
+        soup = crear_soup(html)
+        elementos = soup.find_all('div', class_='producto')
+        
+        # Precios y puntuaciones se normalizan en bloque, no uno a uno
+        precios = ExtractorProducto.extraer_precios(
+            [prod.find('span', class_='precio').text for prod in elementos])
+        ratings = ExtractorProducto.extraer_puntuaciones(
+            [prod.find('div', class_='rating').text for prod in elementos])
         
-        for prod in soup.find_all('div', class_='producto'):
-            nombre = prod.find('h2').text.strip()
-            precio_texto = prod.find('span', class_='precio').text
-            rating_texto = prod.find('div', class_='rating').text
-            
+        productos = []
+        for prod, precio_prod, rating in zip(elementos, precios, ratings):
             producto = {
-                'nombre': nombre,
-                'precio': ExtractorProducto.extraer_precio(precio_texto),
-                'rating': ExtractorProducto.extraer_puntuacion(rating_texto),
+                'nombre': prod.find('h2').text.strip(),
+                'precio': None if math.isnan(precio_prod) else float(precio_prod),
+                'rating': None if math.isnan(rating) else float(rating),
                 'fecha_extraccion': datetime.now().isoformat()
             }
             productos.append(producto)
@@ -179,48 +194,64 @@ class ExtractorProducto:
 class MonitorCambios:
     """Monitorear cambios en un sitio web"""
     
-    def __init__(self, url, archivo_estado='estado.json'):
+    def __init__(self, url, archivo_estado='estado.db', campo_id=None, archivo_json=None):
+        """
+        Args:
+            url (str): Sitio monitoreado
+            archivo_estado (str): Archivo SQLite con el estado (índice de hashes)
+            campo_id: Campo que identifica cada elemento (p. ej. 'url'); con
+                None un elemento modificado cuenta como eliminado + nuevo
+            archivo_json (str): Estado en el formato antiguo (lista JSON) que se
+                importa si archivo_estado aún no existe; por defecto el .json
+                junto a archivo_estado (estado.json)
+        """
         self.url = url
         self.archivo_estado = archivo_estado
-        self.estado_anterior = self.cargar_estado()
+        if archivo_json is None:
+            archivo_json = os.path.splitext(archivo_estado)[0] + '.json'
+        migrar = not os.path.exists(archivo_estado) and os.path.exists(archivo_json)
+        self.detector = DetectorCambios(archivo_estado, campo_id=campo_id)
+        if migrar:
+            self.importar_json(archivo_json)
     
-    def cargar_estado(self):
-        """Cargar último estado guardado"""
+    def importar_json(self, archivo_json):
+        """Importar el estado guardado por versiones anteriores en JSON"""
         try:
-            with open(self.archivo_estado, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return None
-    
-    def guardar_estado(self, datos):
-        """Guardar estado actual"""
-        with open(self.archivo_estado, 'w') as f:
-            json.dump(datos, f)
+            with open(archivo_json, 'r') as f:
+                datos = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo importar {archivo_json}: {e}")
+            return
+        self.detector.importar(datos)
+        logger.info(f"📥 Estado importado de {archivo_json}: {len(datos)} elementos")
     
     def detectar_cambios(self, datos_nuevos):
-        """Comparar datos con estado anterior"""
-        if self.estado_anterior is None:
+        """Comparar datos con estado anterior (solo se reescriben los cambios)"""
+        primera_vez = self.detector.ejecuciones == 0
+        resultado = self.detector.comparar(datos_nuevos)
+        if primera_vez:
             logger.info("📌 Primera ejecución - guardando estado")
-            self.guardar_estado(datos_nuevos)
             return {"estado": "primera_vez"}
         
         cambios = []
         
         # Detectar elementos nuevos
-        nuevos = [d for d in datos_nuevos if d not in self.estado_anterior]
-        if nuevos:
-            cambios.append(f"Elementos nuevos: {len(nuevos)}")
-            logger.info(f"✨ {len(nuevos)} elementos nuevos")
+        if resultado['nuevos']:
+            cambios.append(f"Elementos nuevos: {len(resultado['nuevos'])}")
+            logger.info(f"✨ {len(resultado['nuevos'])} elementos nuevos")
         
         # Detectar elementos eliminados
-        eliminados = [d for d in self.estado_anterior if d not in datos_nuevos]
-        if eliminados:
-            cambios.append(f"Elementos eliminados: {len(eliminados)}")
-            logger.info(f"🗑️ {len(eliminados)} elementos eliminados")
+        if resultado['eliminados']:
+            cambios.append(f"Elementos eliminados: {len(resultado['eliminados'])}")
+            logger.info(f"🗑️ {len(resultado['eliminados'])} elementos eliminados")
+        
+        # Detectar elementos modificados (diff por campo)
+        if resultado['modificados']:
+            cambios.append(f"Elementos modificados: {len(resultado['modificados'])}")
+            logger.info(f"✏️ {len(resultado['modificados'])} elementos modificados")
         
         if cambios:
-            self.guardar_estado(datos_nuevos)
-            return {"cambios": cambios, "fecha": datetime.now().isoformat()}
+            return {"cambios": cambios, "fecha": datetime.now().isoformat(), **resultado}
         
         return {"cambios": []}
 
@@ -234,20 +265,34 @@ class ExportadorDatos:
     
     @staticmethod
     def a_csv(datos, archivo):
-        """Exportar a CSV"""
-        if not datos:
-            return
-        with open(archivo, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=datos[0].keys())
-            writer.writeheader()
-            writer.writerows(datos)
-        logger.info(f"✓ Exportado a {archivo}")
+        """Exportar a CSV (acepta iteradores; el esquema crece con las filas)"""
+        with SumideroCSV(archivo) as sumidero:
+            sumidero.escribir_todos(datos)
+        if sumidero.registros_escritos:
+            logger.info(f"✓ Exportado a {archivo}")
     
     @staticmethod
     def a_json(datos, archivo):
-        """Exportar a JSON"""
-        with open(archivo, 'w', encoding='utf-8') as f:
-            json.dump(datos, f, indent=2, ensure_ascii=False)
+        """Exportar a JSON (array), escribiendo por lotes"""
+        with SumideroJSON(archivo) as sumidero:
+            sumidero.escribir_todos(datos)
+        logger.info(f"✓ Exportado a {archivo}")
+    
+    @staticmethod
+    def a_jsonl(datos, archivo):
+        """Exportar a JSON Lines (.jsonl, .jsonl.gz o .jsonl.zst)"""
+        with SumideroJSONL(archivo) as sumidero:
+            sumidero.escribir_todos(datos)
+        logger.info(f"✓ Exportado a {archivo}")
+    
+    @staticmethod
+    def a_parquet(datos, archivo, filas_por_grupo=100_000, esquema=None):
+        """
+        Exportar a Parquet escribiendo un grupo de filas cada filas_por_grupo
+        registros (requiere pyarrow). El esquema se infiere del primer grupo.
+        """
+        with SumideroParquet(archivo, tamano_lote=filas_por_grupo, esquema=esquema) as sumidero:
+            sumidero.escribir_todos(datos)
         logger.info(f"✓ Exportado a {archivo}")
     
     @staticmethod
@@ -276,7 +321,7 @@ class ExportadorDatos:
                 <tr>
                     {''.join(f'<th>{col}</th>' for col in datos[0].keys())}
                 </tr>
-                {''.join(f'<tr>{"".join(f"<td>{row.get(col, "")}</td>" for col in datos[0].keys())}</tr>' for row in datos)}
+                {''.join(f'<tr>{"".join(f"<td>{row.get(col, str())}</td>" for col in datos[0].keys())}</tr>' for row in datos)}
             </table>
             <p><small>Generado: {datetime.now()}</small></p>
         </body>
@@ -341,26 +386,27 @@ class LimpiadorDatos:
 # ============================================================================
 
 class LoggerScraping:
-    """Logger para trackear scraping"""
+    """Logger para trackear scraping (escritura por lotes en segundo plano)"""
     
-    def __init__(self, archivo_log='scraping.log'):
+    def __init__(self, archivo_log='scraping.log', depuracion=False, **opciones):
+        """
+        Args:
+            archivo_log (str): Archivo JSON Lines de eventos
+            depuracion (bool): Escribir y hacer flush en cada evento
+            **opciones: tamano_lote, intervalo_vaciado, max_bytes, copias,
+                tamano_cola, bloquear_si_llena (ver EscritorEventos)
+        """
         self.archivo_log = archivo_log
-        self.log_file = open(archivo_log, 'a', encoding='utf-8')
+        self.escritor = EscritorEventos(archivo_log, depuracion=depuracion,
+                                        eco=logger, **opciones)
     
     def registrar(self, evento, detalles):
-        """Registrar evento de scraping"""
-        entrada = {
-            'timestamp': datetime.now().isoformat(),
-            'evento': evento,
-            'detalles': detalles
-        }
-        self.log_file.write(json.dumps(entrada, ensure_ascii=False) + '\n')
-        self.log_file.flush()
-        logger.info(f"[{evento}] {detalles}")
+        """Registrar evento de scraping (se escribe en el hilo de fondo)"""
+        self.escritor.registrar(evento, detalles)
     
     def cerrar(self):
-        """Cerrar archivo de log"""
-        self.log_file.close()
+        """Vaciar eventos pendientes y cerrar archivo de log"""
+        self.escritor.cerrar()
 
 
 # ============================================================================
@@ -394,15 +440,10 @@ class PipelineCompleto:
         self.logger.registrar('descarga', 'HTML descargado exitosamente')
         
         # 2. Parsear
-        soup = BeautifulSoup(html, 'html.parser')
-        datos = []
-        
-        for elemento in soup.select(selectores.get('principal', '')):
-            item = {}
-            for clave, selector in selectores.get('campos', {}).items():
-                elem = elemento.select_one(selector)
-                item[clave] = elem.text.strip() if elem else 'N/A'
-            datos.append(item)
+        # El plan se compila una vez por diccionario de selectores y
+        # rellena todos los campos de cada elemento en un solo recorrido
+        soup = crear_soup(html)
+        datos = compilar_plan(selectores).aplicar(soup)
         
         self.logger.registrar('parseo', f'{len(datos)} elementos encontrados')
         
@@ -419,6 +460,79 @@ class PipelineCompleto:
         self.logger.cerrar()
         
         return datos
+    
+    def ejecutar_varias(self, urls, selectores, nombre_archivo, num_procesos=None,
+                        punto_control=None):
+        """
+        Pipeline para muchas URLs: los hilos descargan mientras los
+        procesos parsean, así el parseo no frena la siguiente descarga
+        
+        Args:
+            urls: Iterable de URLs a scrapear
+            selectores: Dict con selectores CSS
+            nombre_archivo: Nombre base para guardado
+            num_procesos: Procesos de parseo (por defecto, los núcleos)
+            punto_control: PuntoControl para guardar el progreso; creado con
+                reanudar=True continúa donde se quedó sin repetir páginas
+        
+        Returns:
+            int: Elementos guardados (cada página va directa a los archivos,
+                no se acumulan en memoria)
+        """
+        self.logger.registrar('inicio', 'Scraping en dos etapas')
+        pipeline = PipelineDosEtapas(selectores, num_procesos=num_procesos,
+                                     headers=dict(self.scraper.session.headers),
+                                     limitador=self.scraper.limitador,
+                                     cache=self.scraper.cache)
+        
+        if punto_control is not None:
+            # Las URLs pasan por la frontera: al reanudar solo salen las pendientes
+            punto_control.registrar_limitador(self.scraper.limitador)
+            punto_control.frontera.agregar_varias(urls)
+            urls = (url for url, _ in punto_control.frontera)
+            salidas = [
+                punto_control.registrar_sumidero(
+                    'csv', SumideroCSV(f'{nombre_archivo}.csv', reanudable=True)),
+                punto_control.registrar_sumidero(
+                    'json', SumideroJSON(f'{nombre_archivo}.json', reanudable=True)),
+            ]
+        else:
+            salidas = [SumideroCSV(f'{nombre_archivo}.csv'),
+                       SumideroJSON(f'{nombre_archivo}.json')]
+        
+        total = 0
+        try:
+            for pagina in pipeline.procesar(urls):
+                if pagina['error']:
+                    self.logger.registrar('error', f"{pagina['url']}: {pagina['error']}")
+                    continue
+                self.logger.registrar('parseo', f"{pagina['url']}: {len(pagina['datos'])} elementos")
+                limpios = LimpiadorDatos.procesar_datos(pagina['datos'])
+                for sumidero in salidas:
+                    sumidero.escribir_todos(limpios)
+                total += len(limpios)
+                if punto_control is not None:
+                    punto_control.completada(pagina['url'])
+        except BaseException:
+            if punto_control is not None:
+                # Dejar los archivos a medias para reanudar
+                punto_control.cerrar(terminado=False)
+            else:
+                # Sin punto de control no hay reanudación: los archivos finales no se tocan
+                for sumidero in salidas:
+                    sumidero.abortar()
+            raise
+        
+        if punto_control is not None:
+            punto_control.cerrar()
+        else:
+            for sumidero in salidas:
+                sumidero.cerrar()
+        
+        self.logger.registrar('guardado', f'{total} elementos guardados')
+        self.logger.cerrar()
+        
+        return total
 
 
 # ============================================================================
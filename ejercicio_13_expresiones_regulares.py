@@ -21,6 +21,34 @@ patron_fecha = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
 # Patrón para contraseña fuerte
 patron_contraseña = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
 
+# Patrones para extraer datos dentro de un texto (sin ^ ni $)
+# Usuario y dominio con longitud máxima (64 y 255, como en el RFC 5321):
+# sin límite, en una palabra larga sin '@' cada posición recorre la
+# palabra entera hasta el final y la búsqueda se vuelve cuadrática
+patron_buscar_email = re.compile(r'[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]{1,255}\.[a-zA-Z]{2,}')
+patron_numero = re.compile(r'\d+')
+patron_palabra = re.compile(r'\b[a-zA-Z]+\b')
+patron_hashtag = re.compile(r'#\w+')
+patron_mencion = re.compile(r'@\w+')
+
+# Todas las entidades en una sola alternancia con grupos con nombre.
+# El orden importa: en cada posición gana la primera alternativa que
+# encaja, así el '@dominio' de un email no cuenta como mención
+patron_entidades = re.compile(
+    r'(?P<url>https?://[^\s]+)'
+    r'|(?P<email>[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]{1,255}\.[a-zA-Z]{2,})'
+    r'|(?P<hashtag>#\w+)'
+    r'|(?P<mencion>@\w+)'
+    r'|(?P<numero>\d+)'
+)
+
+# Todo hasta el último espacio en blanco (para cortar bloques de texto)
+patron_hasta_ultimo_espacio = re.compile(r'.*\s', re.DOTALL)
+
+# Caracteres seguidos sin espacios que se guardan esperando el siguiente
+# bloque; más que eso (base64, JavaScript minificado...) se procesa ya
+LONGITUD_MAXIMA_ENTIDAD = 4096
+
 # ===== FUNCIONES DE VALIDACIÓN =====
 
 def validar_email(email):
@@ -82,45 +110,121 @@ def extraer_emails(texto):
     """
     Extrae todos los emails de un texto
     """
-    patron = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(patron, texto)
+    emails = patron_buscar_email.findall(texto)
     return emails
 
 def extraer_numeros(texto):
     """
     Extrae todos los números del texto
     """
-    numeros = re.findall(r'\d+', texto)
+    numeros = patron_numero.findall(texto)
     return [int(n) for n in numeros]
 
 def extraer_palabras(texto):
     """
     Extrae todas las palabras (sin números ni caracteres especiales)
     """
-    palabras = re.findall(r'\b[a-zA-Z]+\b', texto)
+    palabras = patron_palabra.findall(texto)
     return palabras
 
 def extraer_urls(texto):
     """
     Extrae todas las URLs de un texto
     """
-    urls = re.findall(r'https?://[^\s]+', texto)
+    urls = patron_url.findall(texto)
     return urls
 
 def extraer_hashtags(texto):
     """
     Extrae todos los hashtags
     """
-    hashtags = re.findall(r'#\w+', texto)
+    hashtags = patron_hashtag.findall(texto)
     return hashtags
 
 def extraer_menciones(texto):
     """
     Extrae todas las menciones (@usuario)
     """
-    menciones = re.findall(r'@\w+', texto)
+    menciones = patron_mencion.findall(texto)
     return menciones
 
+# ===== EXTRACCIÓN EN UNA SOLA PASADA =====
+
+# Tipo de entidad (nombre del grupo) -> clave en el resultado
+CLAVES_ENTIDADES = {
+    'email': 'emails',
+    'url': 'urls',
+    'hashtag': 'hashtags',
+    'mencion': 'menciones',
+    'numero': 'numeros',
+}
+
+def iterar_entidades(texto, inicio=0, fin=None):
+    """
+    Recorre el texto una sola vez y devuelve (tipo, valor) por cada
+    email, URL, hashtag, mención o número, en orden de aparición
+    Ejemplo: 'Escribe a ana@web.com #ayuda' -> ('email', 'ana@web.com'), ('hashtag', '#ayuda')
+    """
+    if fin is None:
+        fin = len(texto)
+    for coincidencia in patron_entidades.finditer(texto, inicio, fin):
+        tipo = coincidencia.lastgroup
+        valor = coincidencia.group()
+        yield tipo, int(valor) if tipo == 'numero' else valor
+
+def iterar_entidades_bloques(bloques):
+    """
+    Igual que iterar_entidades pero sobre un texto que llega por trozos
+    (p. ej. un archivo grande leído bloque a bloque)
+    Ninguna entidad contiene espacios: cada bloque se procesa hasta su
+    último espacio y el resto se une al bloque siguiente, así una
+    entidad partida entre dos bloques se encuentra entera
+    Lo pendiente nunca pasa de LONGITUD_MAXIMA_ENTIDAD caracteres: una
+    racha sin espacios más larga se procesa tal cual (una entidad aún
+    más larga puede salir partida en dos)
+    """
+    resto = ''
+    for bloque in bloques:
+        texto = resto + bloque
+        corte = patron_hasta_ultimo_espacio.match(texto)
+        fin = corte.end() if corte is not None else 0
+        if len(texto) - fin > LONGITUD_MAXIMA_ENTIDAD:
+            # Racha sin espacios demasiado larga: no se espera a que acabe
+            fin = len(texto)
+        if fin:
+            yield from iterar_entidades(texto, 0, fin)
+        resto = texto[fin:]
+    if resto:
+        yield from iterar_entidades(resto)
+
+def agrupar_entidades(entidades):
+    """
+    Agrupa pares (tipo, valor) en listas por tipo
+    """
+    resultado = {clave: [] for clave in CLAVES_ENTIDADES.values()}
+    for tipo, valor in entidades:
+        resultado[CLAVES_ENTIDADES[tipo]].append(valor)
+    return resultado
+
+def extraer_entidades(texto):
+    """
+    Extrae emails, URLs, hashtags, menciones y números en una sola pasada
+    A diferencia de llamar a cada extraer_* por separado, no repite lo que
+    ya forma parte de otra entidad (el '@empresa' de un email no es una
+    mención y el 2 de 'ana2@web.com' no es un número)
+    """
+    return agrupar_entidades(iterar_entidades(texto))
+
+def extraer_entidades_archivo(ruta, tamaño_bloque=1024 * 1024, encoding='utf-8'):
+    """
+    Extrae todas las entidades de un archivo leyéndolo una sola vez por
+    bloques de tamaño_bloque caracteres (memoria acotada a un bloque más
+    LONGITUD_MAXIMA_ENTIDAD)
+    """
+    with open(ruta, encoding=encoding) as archivo:
+        bloques = iter(lambda: archivo.read(tamaño_bloque), '')
+        return agrupar_entidades(iterar_entidades_bloques(bloques))
+
 # ===== FUNCIONES DE REEMPLAZO Y LIMPIEZA =====
 
 def limpiar_espacios(texto):
@@ -219,6 +323,65 @@ def encontrar_patrones(texto, patron_str):
         })
     return coincidencias
 
+# ===== BENCHMARK =====
+
+def benchmark(num_palabras=400000):
+    """
+    Compara las cinco funciones extraer_* por separado con la extracción
+    en una sola pasada, en memoria y leyendo de archivo por bloques
+    """
+    import os
+    import random
+    import tempfile
+    import time
+
+    aleatorio = random.Random(42)
+    palabras = ('el', 'la', 'de', 'que', 'precio', 'noticia', 'datos', 'información')
+    partes = []
+    for i in range(num_palabras):
+        azar = aleatorio.random()
+        if azar < 0.005:
+            partes.append(f"usuario{i}@correo.com")
+        elif azar < 0.01:
+            partes.append(f"https://sitio.com/articulo/{i}")
+        elif azar < 0.015:
+            partes.append(f"#tema{i}")
+        elif azar < 0.02:
+            partes.append(f"@perfil{i}")
+        elif azar < 0.04:
+            partes.append(str(i))
+        else:
+            partes.append(aleatorio.choice(palabras))
+    texto = ' '.join(partes)
+
+    def cinco_pasadas(contenido):
+        return [extraer_emails(contenido), extraer_urls(contenido), extraer_hashtags(contenido),
+                extraer_menciones(contenido), extraer_numeros(contenido)]
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as archivo:
+        archivo.write(texto)
+    try:
+        def cinco_pasadas_archivo():
+            with open(archivo.name, encoding='utf-8') as entrada:
+                return cinco_pasadas(entrada.read())
+
+        casos = [
+            ('5 pasadas (extraer_*)', lambda: cinco_pasadas(texto)),
+            ('1 pasada (extraer_entidades)', lambda: extraer_entidades(texto)),
+            ('archivo: read() + 5 pasadas', cinco_pasadas_archivo),
+            ('archivo: por bloques, 1 pasada', lambda: extraer_entidades_archivo(archivo.name)),
+        ]
+        resultados = {}
+        print(f"Texto de {len(texto):,} caracteres:")
+        for nombre, funcion in casos:
+            inicio = time.perf_counter()
+            funcion()
+            resultados[nombre] = time.perf_counter() - inicio
+            print(f"  {nombre:<32} {resultados[nombre]:.3f} s")
+    finally:
+        os.remove(archivo.name)
+    return resultados
+
 # ===== MENÚ INTERACTIVO =====
 
 def menu_expresiones_regulares():
@@ -404,7 +567,13 @@ if __name__ == "__main__":
     print(f"  Emails: {extraer_emails(texto_ejemplo)}")
     print(f"  Números: {extraer_numeros(texto_ejemplo)}")
     
-    print("\n3. Análisis de contraseña:")
+    print("\n3. Todas las entidades en una sola pasada:")
+    texto_ejemplo = "Sigue a @scraper, escribe a ana2@web.com o visita https://web.com #datos 2024"
+    print(f"  Texto: {texto_ejemplo}")
+    for tipo, valores in extraer_entidades(texto_ejemplo).items():
+        print(f"  {tipo}: {valores}")
+    
+    print("\n4. Análisis de contraseña:")
     contraseña = "MiContraseña123!"
     analisis = analizar_contraseña(contraseña)
     print(f"  Contraseña: {contraseña}")
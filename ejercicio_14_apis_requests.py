@@ -6,6 +6,9 @@ import json
 from datetime import datetime
 import time
 
+from cache_http import obtener_con_cache
+from transporte import crear_sesion, sesion_compartida
+
 # ===== CONSTANTES =====
 
 # APIs públicas gratuitas (sin autenticación requerida)
@@ -21,18 +24,22 @@ TIMEOUT = 5
 
 # ===== FUNCIONES DE PETICIONES BÁSICAS =====
 
-def hacer_peticion_get(url, params=None, headers=None):
+def hacer_peticion_get(url, params=None, headers=None, cache=None):
     """
     Realiza una petición GET a una URL
     Args:
         url: URL a donde hacer la petición
         params: Parámetros de consulta (dict)
         headers: Encabezados HTTP (dict)
+        cache: CacheHTTP opcional (revalida con If-None-Match/If-Modified-Since)
     Returns:
         Diccionario con respuesta o error
     """
     try:
-        respuesta = requests.get(url, params=params, headers=headers, timeout=TIMEOUT)
+        # Sesión compartida: reutiliza conexiones (y handshakes TLS)
+        # entre llamadas en lugar de abrir una por petición
+        respuesta = obtener_con_cache(sesion_compartida(), url, cache, params=params,
+                                      headers=headers, timeout=TIMEOUT)
         respuesta.raise_for_status()  # Lanza excepción si hay error HTTP
         
         return {
@@ -78,7 +85,7 @@ def hacer_peticion_post(url, datos=None, json_data=None, headers=None):
     Realiza una petición POST a una URL
     """
     try:
-        respuesta = requests.post(
+        respuesta = sesion_compartida().post(
             url,
             data=datos,
             json=json_data,
@@ -242,7 +249,7 @@ def demostrar_codigos_http():
     
     for url, codigo_esperado, descripcion in casos_prueba:
         try:
-            resp = requests.get(url, timeout=3)
+            resp = sesion_compartida().get(url, timeout=3)
             print(f"{resp.status_code} - {descripcion}: {url}")
         except Exception as e:
             print(f"Error - {descripcion}: {e}")
@@ -255,7 +262,7 @@ def demostrar_sesiones():
     """
     print("\n=== USANDO SESIONES ===")
     
-    sesion = requests.Session()
+    sesion = crear_sesion()
     
     # Las cookies y configuración se mantienen entre peticiones
     respuesta1 = sesion.get(f"{API_JSONPLACEHOLDER}/posts/1")
@@ -14,6 +14,17 @@ ARCHIVO_PRODUCTOS = "productos.csv"
 
 # ===== FUNCIONES PARA GENERAR DATOS DE EJEMPLO =====
 
+def guardar_tabla(df, archivo_csv):
+    """
+    Guarda una tabla en CSV y, si pyarrow está instalado, también su versión
+    Parquet (mismo nombre, extensión .parquet) con los tipos de cada columna
+    """
+    df.to_csv(archivo_csv, index=False, encoding='utf-8')
+    try:
+        df.to_parquet(Path(archivo_csv).with_suffix('.parquet'), index=False)
+    except ImportError:
+        pass
+
 def generar_datos_ejemplo():
     """
     Genera archivos CSV de ejemplo para análisis
@@ -36,7 +47,7 @@ def generar_datos_ejemplo():
     }
     
     df_productos = pd.DataFrame(productos_data)
-    df_productos.to_csv(ARCHIVO_PRODUCTOS, index=False, encoding='utf-8')
+    guardar_tabla(df_productos, ARCHIVO_PRODUCTOS)
     print(f"✓ Archivo '{ARCHIVO_PRODUCTOS}' creado ({len(df_productos)} productos)")
     
     # Crear datos de clientes
@@ -59,7 +70,7 @@ def generar_datos_ejemplo():
     }
     
     df_clientes = pd.DataFrame(clientes_data)
-    df_clientes.to_csv(ARCHIVO_CLIENTES, index=False, encoding='utf-8')
+    guardar_tabla(df_clientes, ARCHIVO_CLIENTES)
     print(f"✓ Archivo '{ARCHIVO_CLIENTES}' creado ({len(df_clientes)} clientes)")
     
     # Crear datos de ventas
@@ -74,27 +85,54 @@ def generar_datos_ejemplo():
     }
     
     df_ventas = pd.DataFrame(ventas_data)
-    df_ventas.to_csv(ARCHIVO_VENTAS, index=False, encoding='utf-8')
+    guardar_tabla(df_ventas, ARCHIVO_VENTAS)
     print(f"✓ Archivo '{ARCHIVO_VENTAS}' creado ({len(df_ventas)} ventas)\n")
     
     return df_productos, df_clientes, df_ventas
 
 # ===== FUNCIONES DE CARGA Y EXPLORACIÓN =====
 
-def cargar_datos():
+def leer_tabla(archivo_csv, columnas=None):
+    """
+    Lee una tabla prefiriendo su versión Parquet (mismo nombre, extensión .parquet)
+    Parquet guarda los tipos y permite leer solo las columnas pedidas sin
+    parsear el resto; si no existe o es más antiguo que el CSV, se lee el CSV
+    Args:
+        archivo_csv: Ruta del CSV
+        columnas: Lista de columnas a cargar (None = todas)
+    """
+    archivo_parquet = Path(archivo_csv).with_suffix('.parquet')
+    archivo_csv = Path(archivo_csv)
+    if archivo_parquet.exists() and (
+        not archivo_csv.exists() or archivo_parquet.stat().st_mtime >= archivo_csv.stat().st_mtime
+    ):
+        try:
+            return pd.read_parquet(archivo_parquet, columns=columnas)
+        except ImportError:
+            print("⚠ pyarrow no instalado, leyendo CSV")
+    return pd.read_csv(archivo_csv, usecols=columnas)
+
+def cargar_datos(columnas=None):
     """
-    Carga todos los archivos CSV
+    Carga todos los archivos (Parquet si existe, si no CSV)
+    Args:
+        columnas: Dict opcional {'productos'|'clientes'|'ventas': [columnas]}
+                  para cargar solo las columnas necesarias de cada tabla
     """
     print("=== CARGANDO DATOS ===\n")
+    columnas = columnas or {}
     
     try:
-        df_productos = pd.read_csv(ARCHIVO_PRODUCTOS)
-        df_clientes = pd.read_csv(ARCHIVO_CLIENTES)
-        df_ventas = pd.read_csv(ARCHIVO_VENTAS)
+        df_productos = leer_tabla(ARCHIVO_PRODUCTOS, columnas.get('productos'))
+        df_clientes = leer_tabla(ARCHIVO_CLIENTES, columnas.get('clientes'))
+        df_ventas = leer_tabla(ARCHIVO_VENTAS, columnas.get('ventas'))
         
-        # Convertir fechas
-        df_clientes['fecha_registro'] = pd.to_datetime(df_clientes['fecha_registro'])
-        df_ventas['fecha'] = pd.to_datetime(df_ventas['fecha'])
+        # Convertir fechas: el CSV las trae como texto (en el Parquet de
+        # guardar_tabla() ya son fechas y la conversión no cambia nada)
+        if 'fecha_registro' in df_clientes:
+            df_clientes['fecha_registro'] = pd.to_datetime(df_clientes['fecha_registro'])
+        if 'fecha' in df_ventas:
+            df_ventas['fecha'] = pd.to_datetime(df_ventas['fecha'])
         
         print("✓ Datos cargados exitosamente\n")
         return df_productos, df_clientes, df_ventas
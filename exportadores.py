@@ -0,0 +1,563 @@
+"""
+EXPORTADORES EN STREAMING (SUMIDEROS)
+Escriben registros a medida que llegan, sin tener la lista completa en memoria:
+- CSV con evolución de esquema: las columnas que aparecen tarde se añaden
+  al final en lugar de perderse
+- JSON Lines (un registro por línea) y JSON (array, mismo formato que json.dump)
+- Compresión gzip o zstd (según la extensión o el parámetro compresion)
+- Parquet por grupos de filas con esquema inferido y estable (requiere pyarrow)
+- Escritura por lotes y renombrado atómico al cerrar: el archivo final
+  nunca se ve a medio escribir
+- Reanudables (reanudable=True): punto_control() devuelve el offset ya
+  escrito y reanudar() continúa un temporal a medias desde ese punto
+
+Uso:
+    with abrir_sumidero('productos.jsonl.gz') as sumidero:
+        for registro in registros:
+            sumidero.escribir(registro)
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 1000
+
+EXTENSIONES_COMPRESION = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def _abrir_texto(ruta: str, modo: str, compresion: Optional[str]):
+    """Abrir un archivo de texto (modo 'wt' o 'rt') con o sin compresión"""
+    if compresion is None:
+        return open(ruta, modo, encoding='utf-8', newline='')
+    if compresion == 'gzip':
+        return gzip.open(ruta, modo, encoding='utf-8', newline='')
+    if compresion == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("La compresión zstd requiere 'pip install zstandard'")
+        return zstandard.open(ruta, modo, encoding='utf-8', newline='')
+    raise ValueError(f"Compresión no soportada: {compresion}")
+
+
+def detectar_compresion(archivo: str) -> Optional[str]:
+    """Deducir la compresión de la extensión ('.gz' -> gzip, '.zst' -> zstd)"""
+    return EXTENSIONES_COMPRESION.get(os.path.splitext(archivo)[1].lower())
+
+
+class Sumidero:
+    """Base de los sumideros: lotes, archivo temporal y renombrado atómico"""
+
+    # Si el formato admite continuar un temporal a medias (ver reanudar())
+    reanudable_soportado = True
+
+    def __init__(self, archivo: str, compresion: Optional[str] = 'auto',
+                 tamano_lote: int = TAMANO_LOTE, reanudable: bool = False):
+        """
+        Args:
+            archivo (str): Ruta final del archivo
+            compresion (str): 'gzip', 'zstd', None o 'auto' (según la extensión)
+            tamano_lote (int): Registros acumulados antes de escribir al disco
+            reanudable (bool): Usar un temporal de nombre fijo que otra
+                ejecución pueda continuar con reanudar()
+        """
+        self.archivo = archivo
+        self.compresion = detectar_compresion(archivo) if compresion == 'auto' else compresion
+        self.tamano_lote = tamano_lote
+        self.registros_escritos = 0
+        self._lote: List[Dict] = []
+        self.reanudable = reanudable
+        directorio, nombre = os.path.split(os.path.abspath(archivo))
+        if reanudable:
+            if not self.reanudable_soportado:
+                raise ValueError(f"{type(self).__name__} no se puede reanudar")
+            self._temporal = os.path.join(directorio, f".{nombre}.parcial")
+        else:
+            self._temporal = os.path.join(directorio, f".{nombre}.{os.getpid()}.tmp")
+        self._salida = None
+        self._iniciado = False  # Cabecera del formato ya escrita en el temporal
+        self._cerrado = False
+
+    # ----- API pública -----
+
+    def escribir(self, registro: Dict):
+        """Añadir un registro (se escribe al completar el lote)"""
+        self._lote.append(registro)
+        if len(self._lote) >= self.tamano_lote:
+            self.vaciar()
+
+    def escribir_todos(self, registros: Iterable[Dict]) -> int:
+        """Escribir todos los registros de un iterable; devuelve cuántos se escribieron"""
+        for registro in registros:
+            self.escribir(registro)
+        return self.registros_escritos + len(self._lote)
+
+    def vaciar(self):
+        """Escribir el lote pendiente en el archivo temporal"""
+        if not self._lote:
+            return
+        self._preparar_salida()
+        self._escribir_lote(self._lote)
+        self._sincronizar()
+        self.registros_escritos += len(self._lote)
+        self._lote = []
+
+    def cerrar(self) -> int:
+        """
+        Vaciar, cerrar y mover el temporal a su ruta final (os.replace es atómico)
+
+        Returns:
+            int: Registros escritos
+        """
+        if self._cerrado:
+            return self.registros_escritos
+        self.vaciar()
+        if not self._iniciado and not self._crear_si_vacio():
+            self._cerrado = True
+            return 0
+        self._preparar_salida()
+        self._finalizar()
+        self._salida.close()
+        self._completar_temporal()
+        os.replace(self._temporal, self.archivo)
+        self._cerrado = True
+        logger.info(f"✓ {self.registros_escritos} registros exportados a {self.archivo}")
+        return self.registros_escritos
+
+    def punto_control(self) -> Dict:
+        """
+        Vaciar el lote y asegurar en disco lo escrito hasta ahora
+
+        Con compresión se cierra el bloque comprimido actual; el siguiente
+        lote empieza otro (gzip y zstd admiten bloques concatenados).
+
+        Returns:
+            Dict: Estado para reanudar() (offset del temporal y contadores)
+        """
+        self.vaciar()
+        if self._salida is not None:
+            if self.compresion:
+                self._salida.close()
+                self._salida = None
+            else:
+                self._salida.flush()
+                os.fsync(self._salida.fileno())
+        offset = os.path.getsize(self._temporal) if self._iniciado else 0
+        return {'offset': offset, 'registros_escritos': self.registros_escritos,
+                **self._estado_formato()}
+
+    def reanudar(self, estado: Dict):
+        """
+        Continuar un temporal a medias desde un punto_control() anterior
+
+        Lo escrito después del punto de control se descarta (trunca el archivo).
+        """
+        if self._salida is not None or self.registros_escritos:
+            raise ValueError("Solo se puede reanudar un sumidero sin usar")
+        if not estado.get('offset'):
+            return
+        if not os.path.exists(self._temporal):
+            raise FileNotFoundError(f"No existe el temporal a reanudar: {self._temporal}")
+        with open(self._temporal, 'r+b') as f:
+            f.truncate(estado['offset'])
+        self.registros_escritos = estado['registros_escritos']
+        self._restaurar_formato(estado)
+        self._iniciado = True
+        logger.info(f"Reanudando {self.archivo} tras {self.registros_escritos} registros")
+
+    def abortar(self, conservar_temporal: bool = False):
+        """
+        Descartar lo escrito sin tocar el archivo final
+
+        Args:
+            conservar_temporal (bool): Dejar el temporal para reanudar()
+                (lo escrito tras el último punto_control() se trunca al reanudar)
+        """
+        if self._salida is not None:
+            self._salida.close()
+            self._salida = None
+        if not conservar_temporal and os.path.exists(self._temporal):
+            os.remove(self._temporal)
+        self._lote = []
+        self._cerrado = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        elif self._cerrado:
+            pass
+        elif self.reanudable:
+            logger.warning(f"Exportación a {self.archivo} interrumpida: "
+                           f"el temporal {self._temporal} queda para reanudar()")
+            self.abortar(conservar_temporal=True)
+        else:
+            logger.warning(f"Exportación a {self.archivo} interrumpida: se descartan "
+                           f"{self.registros_escritos + len(self._lote)} registros, "
+                           f"el archivo final no se modifica")
+            self.abortar()
+        return False
+
+    def _preparar_salida(self):
+        """Abrir el temporal (o volver a abrirlo en modo añadir) si hace falta"""
+        if self._salida is not None:
+            return
+        self._salida = self._abrir()
+        if not self._iniciado:
+            self._iniciar()
+            self._iniciado = True
+
+    # ----- Puntos de extensión -----
+
+    def _abrir(self):
+        """Abrir el archivo temporal de salida"""
+        return _abrir_texto(self._temporal, 'at' if self._iniciado else 'wt', self.compresion)
+
+    def _sincronizar(self):
+        """Pasar al disco lo escrito en el último lote"""
+        self._salida.flush()
+
+    def _iniciar(self):
+        """Escribir la cabecera del formato (si la tiene)"""
+
+    def _escribir_lote(self, lote: List[Dict]):
+        raise NotImplementedError
+
+    def _finalizar(self):
+        """Escribir el cierre del formato (si lo tiene)"""
+
+    def _crear_si_vacio(self) -> bool:
+        """Si se crea el archivo aunque no haya registros"""
+        return True
+
+    def _completar_temporal(self):
+        """Último paso sobre el temporal ya cerrado, antes de renombrarlo"""
+
+    def _estado_formato(self) -> Dict:
+        """Estado propio del formato que hay que guardar en el punto de control"""
+        return {}
+
+    def _restaurar_formato(self, estado: Dict):
+        """Recuperar el estado propio del formato al reanudar"""
+
+
+class SumideroJSONL(Sumidero):
+    """JSON Lines: un objeto JSON por línea"""
+
+    def _escribir_lote(self, lote):
+        self._salida.write(''.join(
+            json.dumps(registro, ensure_ascii=False, default=str) + '\n' for registro in lote
+        ))
+
+
+class SumideroJSON(Sumidero):
+    """Array JSON con indent=2, idéntico a json.dump(lista, indent=2), escrito por partes"""
+
+    def _iniciar(self):
+        self._salida.write('[')
+
+    def _escribir_lote(self, lote):
+        partes = []
+        for registro in lote:
+            texto = json.dumps(registro, ensure_ascii=False, indent=2, default=str)
+            separador = ',' if self.registros_escritos or partes else ''
+            partes.append(separador + '\n  ' + texto.replace('\n', '\n  '))
+        self._salida.write(''.join(partes))
+
+    def _finalizar(self):
+        self._salida.write('\n]' if self.registros_escritos else ']')
+
+
+class SumideroCSV(Sumidero):
+    """CSV cuyo esquema crece con los registros: ninguna columna se pierde"""
+
+    def __init__(self, archivo: str, compresion: Optional[str] = 'auto',
+                 tamano_lote: int = TAMANO_LOTE, columnas: Optional[List[str]] = None,
+                 reanudable: bool = False):
+        """
+        Args:
+            columnas (List[str]): Columnas iniciales (por defecto, las del primer registro)
+        """
+        super().__init__(archivo, compresion, tamano_lote, reanudable)
+        self.columnas: List[str] = list(columnas or [])
+        self._columnas_cabecera = 0
+        self._escritor = None
+
+    def _iniciar(self):
+        if not self.columnas:
+            self.columnas = list(self._lote[0].keys())
+        self._escritor = csv.writer(self._salida)
+        self._escritor.writerow(self.columnas)
+        self._columnas_cabecera = len(self.columnas)
+
+    def _escribir_lote(self, lote):
+        conocidas = set(self.columnas)
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for registro in lote:
+            for clave in registro:
+                if clave not in conocidas:
+                    # Columna nueva: se añade al final del esquema
+                    self.columnas.append(clave)
+                    conocidas.add(clave)
+            escritor.writerow([registro.get(col, '') for col in self.columnas])
+        self._salida.write(buffer.getvalue())
+
+    def _crear_si_vacio(self):
+        return False  # Sin registros no hay cabecera que escribir
+
+    def _estado_formato(self):
+        return {'columnas': list(self.columnas), 'columnas_cabecera': self._columnas_cabecera}
+
+    def _restaurar_formato(self, estado):
+        self.columnas = list(estado['columnas'])
+        self._columnas_cabecera = estado['columnas_cabecera']
+
+    def _completar_temporal(self):
+        """Si el esquema creció, reescribir con la cabecera completa y filas rellenadas"""
+        if len(self.columnas) == self._columnas_cabecera:
+            return
+        logger.info(f"Esquema ampliado a {len(self.columnas)} columnas: reescribiendo cabecera")
+        reescrito = self._temporal + '.esquema'
+        ancho = len(self.columnas)
+        with _abrir_texto(self._temporal, 'rt', self.compresion) as origen, \
+                _abrir_texto(reescrito, 'wt', self.compresion) as destino:
+            lector = csv.reader(origen)
+            escritor = csv.writer(destino)
+            next(lector)  # Cabecera antigua
+            escritor.writerow(self.columnas)
+            for fila in lector:
+                if len(fila) < ancho:
+                    fila.extend([''] * (ancho - len(fila)))
+                escritor.writerow(fila)
+        os.replace(reescrito, self._temporal)
+        self._columnas_cabecera = ancho
+
+
+def _errores_arrow():
+    import pyarrow as pa
+    return (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError,
+            TypeError, OverflowError)
+
+
+def _inferir_tipo(valores: List):
+    """
+    Tipo Arrow de una columna del primer lote, pensado para que los lotes
+    siguientes quepan: enteros como float64 (un precio 10 luego es 10.5),
+    columnas vacías o con tipos mezclados como texto
+    """
+    import pyarrow as pa
+
+    try:
+        tipo = pa.array(valores).type
+    except _errores_arrow():
+        return pa.string()
+    if pa.types.is_null(tipo):
+        return pa.string()
+    if pa.types.is_integer(tipo):
+        return pa.float64()
+    return tipo
+
+
+def _columna_arrow(valores: List, tipo, nombre: str):
+    """
+    Convertir los valores de una columna al tipo del esquema
+
+    Primero directamente, después infiriendo y haciendo un cast seguro
+    (números a texto, por ejemplo); lo que aun así no encaja queda nulo
+    con un aviso en lugar de estropear el archivo entero.
+    """
+    import pyarrow as pa
+
+    errores = _errores_arrow()
+    try:
+        return pa.array(valores, type=tipo)
+    except errores:
+        pass
+    try:
+        return pa.array(valores).cast(tipo)
+    except errores:
+        pass
+    convertidos = []
+    for valor in valores:
+        try:
+            convertidos.append(pa.array([valor]).cast(tipo)[0].as_py())
+        except errores:
+            convertidos.append(None)
+    perdidos = sum(1 for v, c in zip(valores, convertidos) if v is not None and c is None)
+    if perdidos:
+        logger.warning(f"Campo '{nombre}': {perdidos} valores no encajan en {tipo} y quedan nulos")
+    return pa.array(convertidos, type=tipo)
+
+
+class SumideroParquet(Sumidero):
+    """
+    Parquet escrito por grupos de filas (un grupo por lote)
+
+    El esquema se infiere del primer lote y se mantiene fijo: los campos
+    ausentes quedan nulos y los que aparezcan después se descartan con un
+    aviso (un archivo Parquet no puede cambiar de esquema a mitad).
+    Para que los lotes siguientes quepan, los enteros se guardan como
+    float64 y las columnas siempre nulas o con tipos mezclados como texto;
+    los valores posteriores se convierten al tipo de su columna.
+    No es reanudable: el pie del archivo solo se escribe al cerrar.
+    """
+
+    reanudable_soportado = False
+
+    def __init__(self, archivo: str, compresion: Optional[str] = 'auto',
+                 tamano_lote: int = 100_000, esquema=None, reanudable: bool = False):
+        """
+        Args:
+            compresion (str): Códec interno de Parquet ('snappy', 'zstd', 'gzip'...)
+            tamano_lote (int): Filas por grupo de filas
+            esquema (pyarrow.Schema): Esquema fijo en lugar del inferido
+        """
+        super().__init__(archivo, None, tamano_lote, reanudable)
+        self.codec = 'snappy' if compresion in ('auto', None) else compresion
+        self.esquema = esquema
+        self._descartados = set()
+
+    def _abrir(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.esquema is None:
+            nombres = dict.fromkeys(clave for registro in self._lote for clave in registro)
+            self.esquema = pa.schema([
+                (nombre, _inferir_tipo([registro.get(nombre) for registro in self._lote]))
+                for nombre in nombres
+            ])
+        return pq.ParquetWriter(self._temporal, self.esquema, compression=self.codec)
+
+    def _sincronizar(self):
+        pass  # ParquetWriter escribe cada grupo de filas completo
+
+    def _escribir_lote(self, lote):
+        import pyarrow as pa
+
+        nombres = set(self.esquema.names)
+        for registro in lote:
+            for clave in registro.keys() - nombres - self._descartados:
+                logger.warning(f"Campo '{clave}' fuera del esquema Parquet: se descarta")
+                self._descartados.add(clave)
+        columnas = [_columna_arrow([registro.get(campo.name) for registro in lote],
+                                   campo.type, campo.name)
+                    for campo in self.esquema]
+        try:
+            # Solo falla con un esquema propio (p. ej. nulos en un campo no nullable)
+            tabla = pa.Table.from_arrays(columnas, schema=self.esquema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError) as e:
+            # Cerrar el writer y borrar el temporal: un Parquet a medias no sirve
+            self.abortar()
+            raise ValueError(f"Registro incompatible con el esquema {self.esquema}: {e}") from e
+        self._salida.write_table(tabla, row_group_size=len(lote))
+
+    def _crear_si_vacio(self):
+        return self.esquema is not None
+
+
+FORMATOS = {
+    '.csv': SumideroCSV,
+    '.jsonl': SumideroJSONL,
+    '.ndjson': SumideroJSONL,
+    '.json': SumideroJSON,
+    '.parquet': SumideroParquet,
+}
+
+
+def abrir_sumidero(archivo: str, formato: Optional[str] = None, **opciones) -> Sumidero:
+    """
+    Crear el sumidero adecuado según la extensión del archivo
+
+    Args:
+        archivo (str): Ruta final, p. ej. 'datos.csv', 'datos.jsonl.gz', 'datos.jsonl.zst'
+        formato (str): Forzar formato ('csv', 'jsonl', 'json', 'parquet')
+        **opciones: compresion, tamano_lote, reanudable, columnas (CSV), esquema (Parquet)
+
+    Returns:
+        Sumidero: Listo para escribir()
+    """
+    if formato is None:
+        base = archivo
+        if detectar_compresion(base):
+            base = os.path.splitext(base)[0]
+        formato = os.path.splitext(base)[1].lower()
+    else:
+        formato = '.' + formato.lstrip('.').lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (disponibles: {list(FORMATOS)})")
+    return FORMATOS[formato](archivo, **opciones)
+
+
+def exportar(registros: Iterable[Dict], archivo: str, **opciones) -> int:
+    """Exportar un iterable de registros de una vez; devuelve cuántos se escribieron"""
+    with abrir_sumidero(archivo, **opciones) as sumidero:
+        sumidero.escribir_todos(registros)
+    return sumidero.registros_escritos
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark_parquet(num_filas: int = 10_000_000, directorio: str = '.') -> Dict[str, float]:
+    """
+    Comparar CSV y Parquet: tamaño en disco y tiempo de carga con pandas
+
+    Los dos archivos se escriben desde el mismo generador de registros
+    (como haría un crawl) y se leen completos y con solo dos columnas.
+    """
+    import random
+    import time
+    import pandas as pd
+
+    def registros():
+        aleatorio = random.Random(42)
+        categorias = ['Electrónica', 'Accesorios', 'Audio', 'Memoria', 'Almacenamiento']
+        for i in range(num_filas):
+            yield {
+                'producto_id': i,
+                'nombre': f"Producto {i}",
+                'categoria': categorias[i % len(categorias)],
+                'precio': round(aleatorio.uniform(5, 1500), 2),
+                'stock': aleatorio.randint(0, 100),
+                'fecha': f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            }
+
+    rutas = {'csv': os.path.join(directorio, 'benchmark.csv'),
+             'parquet': os.path.join(directorio, 'benchmark.parquet')}
+    resultados = {}
+    for formato, ruta in rutas.items():
+        inicio = time.perf_counter()
+        exportar(registros(), ruta)
+        print(f"{formato:<8} escritura: {time.perf_counter() - inicio:7.2f} s  "
+              f"tamaño: {os.path.getsize(ruta) / 1024 / 1024:8.1f} MB")
+
+    lectores = {
+        'csv': lambda columnas: pd.read_csv(rutas['csv'], usecols=columnas),
+        'parquet': lambda columnas: pd.read_parquet(rutas['parquet'], columns=columnas),
+    }
+    for formato, leer in lectores.items():
+        for etiqueta, columnas in (('todas', None), ('2 columnas', ['categoria', 'precio'])):
+            inicio = time.perf_counter()
+            leer(columnas)
+            resultados[f"{formato} {etiqueta}"] = time.perf_counter() - inicio
+            print(f"{formato:<8} carga {etiqueta:<11}: {resultados[f'{formato} {etiqueta}']:7.2f} s")
+
+    for ruta in rutas.values():
+        os.remove(ruta)
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark_parquet()
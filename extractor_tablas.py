@@ -0,0 +1,328 @@
+"""
+EXTRACTOR DE TABLAS HTML EN STREAMING
+Lee tablas enormes sin construir el DOM completo:
+- El HTML se pasa por bloques a un parser por eventos (lxml si está
+  instalado, si no html.parser.HTMLParser de la librería estándar)
+- Cada fila se entrega en cuanto se cierra, así que la memoria depende
+  del tamaño de una fila (más el bloque que se está leyendo), no de la tabla
+- Detecta encabezados (<thead> o filas solo con <th>, también de varias filas)
+- Expande colspan y rowspan
+- Soporta varias tablas por página (y tablas anidadas)
+- Las filas de <tfoot> son datos aunque solo tengan <th> (totales)
+- iterar_filas_tabla deja de leer la fuente al cerrarse la tabla elegida
+
+La fuente puede ser un str/bytes, un archivo abierto o cualquier iterable
+de bloques (por ejemplo response.iter_content() de requests).
+"""
+
+import codecs
+from collections import deque
+from html.parser import HTMLParser
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+TAMANO_BLOQUE = 64 * 1024
+
+Fuente = Union[str, bytes, Iterable]
+
+# Marcadores que ocupan el lugar de la fila en la cola de eventos
+APERTURA = 'apertura'
+CIERRE = 'cierre'
+Evento = Tuple[int, List[str], Union[Dict[str, str], str]]
+
+
+class _EstadoTabla:
+    """Estado de una tabla abierta mientras se recorre"""
+
+    def __init__(self, indice: int, clases: List[str]):
+        self.indice = indice
+        self.clases = clases
+        self.en_thead = False
+        self.en_tfoot = False
+        self.filas_encabezado: List[List[str]] = []
+        self.encabezados: Optional[List[str]] = None
+        self.hay_datos = False
+        # Columna -> [texto, filas restantes] de los rowspan pendientes
+        self.rowspan: Dict[int, list] = {}
+        self.fila: Optional[List[Tuple[str, int, int, bool]]] = None
+        self.celda: Optional[List[str]] = None
+        self.celda_attrs: Tuple[int, int, bool] = (1, 1, False)
+
+
+def _entero(valor, por_defecto=1) -> int:
+    try:
+        return max(1, int(valor))
+    except (TypeError, ValueError):
+        return por_defecto
+
+
+class ManejadorTablas:
+    """Reacciona a los eventos del parser y va dejando filas completas en self.filas"""
+
+    def __init__(self):
+        self.pila: List[_EstadoTabla] = []
+        self.num_tablas = 0
+        # (indice_tabla, clases_tabla, fila) listas para entregar, en orden de
+        # documento; APERTURA/CIERRE en lugar de la fila marcan <table>/</table>
+        self.filas: Deque[Evento] = deque()
+
+    # ----- Eventos -----
+
+    def start(self, tag, attrs):
+        if tag == 'table':
+            clases = (attrs.get('class') or '').split()
+            self.pila.append(_EstadoTabla(self.num_tablas, clases))
+            self.filas.append((self.num_tablas, clases, APERTURA))
+            self.num_tablas += 1
+            return
+        if not self.pila:
+            return
+        tabla = self.pila[-1]
+        if tag in ('thead', 'tbody', 'tfoot'):
+            self._cerrar_fila(tabla)
+            tabla.en_thead = tag == 'thead'
+            tabla.en_tfoot = tag == 'tfoot'
+        elif tag == 'tr':
+            self._cerrar_fila(tabla)
+            tabla.fila = []
+        elif tag in ('td', 'th'):
+            self._cerrar_celda(tabla)
+            if tabla.fila is None:
+                tabla.fila = []
+            tabla.celda = []
+            tabla.celda_attrs = (_entero(attrs.get('colspan')),
+                                 _entero(attrs.get('rowspan')),
+                                 tag == 'th')
+
+    def end(self, tag):
+        if not self.pila:
+            return
+        tabla = self.pila[-1]
+        if tag == 'table':
+            self._cerrar_fila(tabla)
+            self.pila.pop()
+            self.filas.append((tabla.indice, tabla.clases, CIERRE))
+        elif tag in ('td', 'th'):
+            self._cerrar_celda(tabla)
+        elif tag == 'tr':
+            self._cerrar_fila(tabla)
+        elif tag in ('thead', 'tbody', 'tfoot'):
+            self._cerrar_fila(tabla)
+            tabla.en_thead = tabla.en_tfoot = False
+
+    def data(self, data):
+        if self.pila and self.pila[-1].celda is not None:
+            self.pila[-1].celda.append(data)
+
+    # ----- Construcción de filas -----
+
+    def _cerrar_celda(self, tabla: _EstadoTabla):
+        if tabla.celda is None:
+            return
+        colspan, rowspan, es_th = tabla.celda_attrs
+        tabla.fila.append((''.join(tabla.celda).strip(), colspan, rowspan, es_th))
+        tabla.celda = None
+
+    def _expandir(self, tabla: _EstadoTabla, celdas) -> List[str]:
+        """Colocar las celdas en su columna real aplicando colspan/rowspan"""
+        valores: List[str] = []
+        columna = 0
+
+        def rellenar_rowspan():
+            nonlocal columna
+            while columna in tabla.rowspan:
+                pendiente = tabla.rowspan[columna]
+                valores.append(pendiente[0])
+                pendiente[1] -= 1
+                if pendiente[1] == 0:
+                    del tabla.rowspan[columna]
+                columna += 1
+
+        for texto, colspan, rowspan, _ in celdas:
+            rellenar_rowspan()
+            for _ in range(colspan):
+                valores.append(texto)
+                if rowspan > 1:
+                    tabla.rowspan[columna] = [texto, rowspan - 1]
+                columna += 1
+        rellenar_rowspan()
+        # Rowspan que quedan más a la derecha tras un hueco
+        while tabla.rowspan and max(tabla.rowspan) >= columna:
+            if columna not in tabla.rowspan:
+                valores.append('')
+                columna += 1
+            rellenar_rowspan()
+        return valores
+
+    def _cerrar_fila(self, tabla: _EstadoTabla):
+        self._cerrar_celda(tabla)
+        if tabla.fila is None:
+            return
+        celdas, tabla.fila = tabla.fila, None
+        if not celdas:
+            return
+        valores = self._expandir(tabla, celdas)
+        es_encabezado = tabla.en_thead or (not tabla.en_tfoot and all(c[3] for c in celdas))
+
+        if es_encabezado:
+            if not tabla.hay_datos:
+                tabla.filas_encabezado.append(valores)
+            # Encabezados repetidos a mitad de tabla se ignoran
+            return
+
+        if tabla.encabezados is None:
+            tabla.encabezados = _nombres_columnas(tabla.filas_encabezado, len(valores))
+            tabla.filas_encabezado = []
+        tabla.hay_datos = True
+        fila = {}
+        for i, valor in enumerate(valores):
+            if i < len(tabla.encabezados):
+                fila[tabla.encabezados[i]] = valor
+        self.filas.append((tabla.indice, tabla.clases, fila))
+
+    def close(self):
+        """Cerrar las tablas que queden abiertas al final del documento"""
+        while self.pila:
+            self.end('table')
+
+
+class _ParserStdlib(HTMLParser):
+    """Adaptador de html.parser a ManejadorTablas"""
+
+    def __init__(self, manejador: ManejadorTablas):
+        super().__init__(convert_charrefs=True)
+        self.manejador = manejador
+
+    def handle_starttag(self, tag, attrs):
+        self.manejador.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.manejador.end(tag)
+
+    def handle_data(self, data):
+        self.manejador.data(data)
+
+    def close(self):
+        super().close()
+        self.manejador.close()
+
+
+def crear_parser(manejador: ManejadorTablas):
+    """Parser por eventos con feed()/close(): lxml si está disponible"""
+    try:
+        from lxml import etree
+    except ImportError:
+        return _ParserStdlib(manejador)
+    return etree.HTMLParser(target=manejador, recover=True)
+
+
+def _nombres_columnas(filas_encabezado: List[List[str]], num_columnas: int) -> List[str]:
+    """Combinar una o varias filas de encabezado en nombres de columna únicos"""
+    if not filas_encabezado:
+        return [f"col_{i + 1}" for i in range(num_columnas)]
+    ancho = max(len(f) for f in filas_encabezado)
+    nombres = []
+    vistos: Dict[str, int] = {}
+    for i in range(ancho):
+        partes = []
+        for fila in filas_encabezado:
+            texto = fila[i] if i < len(fila) else ''
+            if texto and texto not in partes:
+                partes.append(texto)
+        nombre = ' '.join(partes) or f"col_{i + 1}"
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}_{vistos[nombre]}"
+        else:
+            vistos[nombre] = 1
+        nombres.append(nombre)
+    return nombres
+
+
+def _bloques(fuente: Fuente, tamano_bloque: int, encoding: str) -> Iterator[str]:
+    """Normalizar la fuente a un iterador de bloques de texto"""
+    if isinstance(fuente, str):
+        for i in range(0, len(fuente), tamano_bloque):
+            yield fuente[i:i + tamano_bloque]
+        return
+    if isinstance(fuente, (bytes, bytearray)):
+        datos = fuente
+        fuente = (datos[i:i + tamano_bloque] for i in range(0, len(datos), tamano_bloque))
+    elif hasattr(fuente, 'read'):
+        archivo = fuente
+        fuente = iter(lambda: archivo.read(tamano_bloque), archivo.read(0))
+
+    decodificador = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for bloque in fuente:
+        if isinstance(bloque, (bytes, bytearray)):
+            bloque = decodificador.decode(bloque)
+        if bloque:
+            yield bloque
+    resto = decodificador.decode(b'', final=True)
+    if resto:
+        yield resto
+
+
+def _eventos_tablas(fuente: Fuente, tamano_bloque: int, encoding: str) -> Iterator[Evento]:
+    """Filas de todas las tablas más (indice, clases, APERTURA/CIERRE) al abrir y cerrar cada una"""
+    manejador = ManejadorTablas()
+    parser = crear_parser(manejador)
+    for bloque in _bloques(fuente, tamano_bloque, encoding):
+        parser.feed(bloque)
+        while manejador.filas:
+            yield manejador.filas.popleft()
+    parser.close()
+    while manejador.filas:
+        yield manejador.filas.popleft()
+
+
+def iterar_tablas(fuente: Fuente, tamano_bloque: int = TAMANO_BLOQUE,
+                  encoding: str = 'utf-8') -> Iterator[Tuple[int, List[str], Dict[str, str]]]:
+    """
+    Recorrer todas las tablas de un documento fila a fila
+
+    Args:
+        fuente: HTML como str/bytes, archivo abierto o iterable de bloques
+        tamano_bloque (int): Tamaño de los bloques que se pasan al parser
+        encoding (str): Codificación si la fuente entrega bytes
+
+    Yields:
+        Tuple: (indice_tabla, clases_de_la_tabla, fila como dict)
+    """
+    for indice_tabla, clases, fila in _eventos_tablas(fuente, tamano_bloque, encoding):
+        if isinstance(fila, dict):
+            yield indice_tabla, clases, fila
+
+
+def iterar_filas_tabla(fuente: Fuente, indice: int = 0, clase: Optional[str] = None,
+                       tamano_bloque: int = TAMANO_BLOQUE,
+                       encoding: str = 'utf-8') -> Iterator[Dict[str, str]]:
+    """
+    Filas de una sola tabla del documento
+
+    Las tablas se numeran al abrirse, en orden de documento (una tabla
+    cuenta aunque solo tenga encabezados; una exterior va antes que las
+    anidadas en ella). En cuanto la tabla elegida se cierra se deja de
+    leer la fuente.
+
+    Args:
+        fuente: HTML como str/bytes, archivo abierto o iterable de bloques
+        indice (int): Posición de la tabla entre las que cumplen el filtro
+        clase (str): Considerar solo tablas con esta clase CSS
+
+    Yields:
+        Dict[str, str]: Fila con los encabezados como claves
+    """
+    elegida = None  # Índice global de la tabla pedida, cuando se abra
+    encontradas = 0
+    for indice_tabla, clases, fila in _eventos_tablas(fuente, tamano_bloque, encoding):
+        if fila == APERTURA:
+            if elegida is None and (clase is None or clase in clases):
+                if encontradas == indice:
+                    elegida = indice_tabla
+                encontradas += 1
+        elif indice_tabla != elegida:
+            continue
+        elif fila == CIERRE:
+            return
+        else:
+            yield fila
@@ -0,0 +1,538 @@
+"""
+FRONTERA DE CRAWL CON DEDUPLICACIÓN
+Cola de URLs por visitar para crawls que siguen enlaces:
+- Normaliza cada URL (urljoin + normalizar_url de cache_http) antes de
+  compararla, así '/a', 'HTTP://Sitio/a#x' y 'http://sitio:80/a' son la misma
+- Deduplica con un filtro de Bloom escalable en memoria respaldado por
+  un conjunto exacto en disco (SQLite): el Bloom descarta casi todas las
+  consultas y el disco resuelve sus falsos positivos
+- Prioridad por profundidad (primero en anchura) y, dentro de la misma
+  profundidad, turnos por host para repartir la carga entre servidores
+- Si las URLs pendientes superan el presupuesto de memoria, las de menor
+  prioridad se vuelcan a disco y se recargan cuando hace falta
+
+Con la configuración por defecto el Bloom ocupa ~350 MB para 100 millones
+de URLs vistas (FiltroBloomEscalable.estimar_bytes); en disco se guardan
+16 bytes por URL.
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from cache_http import normalizar_url
+
+logger = logging.getLogger(__name__)
+
+ESQUEMAS_VALIDOS = ('http', 'https')
+TAMANO_LOTE_DISCO = 10_000  # URLs por transacción al escribir en disco
+
+
+def huella_url(url_normalizada: str) -> bytes:
+    """Huella de 16 bytes de una URL ya normalizada"""
+    return hashlib.blake2b(url_normalizada.encode('utf-8'), digest_size=16).digest()
+
+
+class FiltroBloom:
+    """Filtro de Bloom de tamaño fijo sobre huellas de 16 bytes"""
+
+    def __init__(self, capacidad: int, tasa_error: float):
+        self.capacidad = capacidad
+        self.tasa_error = tasa_error
+        self.num_bits = max(8, int(-capacidad * math.log(tasa_error) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacidad * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.elementos = 0
+
+    def _posiciones(self, huella: bytes) -> Iterator[int]:
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de las dos mitades
+        h1 = int.from_bytes(huella[:8], 'little')
+        h2 = int.from_bytes(huella[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, huella: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._posiciones(huella))
+
+    def agregar(self, huella: bytes):
+        bits = self.bits
+        for p in self._posiciones(huella):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.elementos += 1
+
+    @property
+    def lleno(self) -> bool:
+        return self.elementos >= self.capacidad
+
+
+class FiltroBloomEscalable:
+    """
+    Serie de filtros de Bloom que crece sin conocer el total de antemano
+
+    Cada filtro nuevo tiene el doble de capacidad y la mitad de tasa de
+    error, así la tasa de error total queda acotada (≈ 2 * tasa_error).
+    """
+
+    def __init__(self, capacidad_inicial: int = 1_000_000, tasa_error: float = 0.001):
+        self.capacidad_inicial = capacidad_inicial
+        self.tasa_error = tasa_error
+        self.filtros: List[FiltroBloom] = [FiltroBloom(capacidad_inicial, tasa_error / 2)]
+
+    def __contains__(self, huella: bytes) -> bool:
+        return any(huella in filtro for filtro in reversed(self.filtros))
+
+    def agregar(self, huella: bytes):
+        actual = self.filtros[-1]
+        if actual.lleno:
+            actual = FiltroBloom(actual.capacidad * 2, actual.tasa_error / 2)
+            self.filtros.append(actual)
+        actual.agregar(huella)
+
+    def __len__(self) -> int:
+        return sum(f.elementos for f in self.filtros)
+
+    @property
+    def bytes_memoria(self) -> int:
+        return sum(len(f.bits) for f in self.filtros)
+
+    def estimar_bytes(self, num_elementos: int) -> int:
+        """Memoria que ocuparían los filtros tras agregar num_elementos"""
+        capacidad, tasa = self.capacidad_inicial, self.tasa_error / 2
+        total_bytes = total_elementos = 0
+        while total_elementos < num_elementos:
+            total_bytes += int(-capacidad * math.log(tasa) / math.log(2) ** 2) // 8
+            total_elementos += capacidad
+            capacidad, tasa = capacidad * 2, tasa / 2
+        return total_bytes
+
+
+class ConjuntoVistas:
+    """Conjunto de URLs vistas: Bloom en memoria + conjunto exacto en SQLite"""
+
+    def __init__(self, conexion: sqlite3.Connection, capacidad_inicial: int = 1_000_000,
+                 tasa_error: float = 0.001, tamano_lote: Optional[int] = 10_000):
+        """
+        Args:
+            tamano_lote (int): Huellas nuevas que se acumulan antes de escribirlas;
+                None si las escribe el propietario (escribir_pendientes())
+        """
+        self._conexion = conexion
+        self._conexion.execute(
+            'CREATE TABLE IF NOT EXISTS vistas (huella BLOB PRIMARY KEY) WITHOUT ROWID'
+        )
+        self.tamano_lote = tamano_lote
+        self.bloom = FiltroBloomEscalable(capacidad_inicial, tasa_error)
+        # Huellas nuevas aún no escritas en disco
+        self._pendientes: set = set()
+        self.consultas_disco = 0
+        # Al reabrir, reconstruir el Bloom desde las huellas guardadas
+        for (huella,) in self._conexion.execute('SELECT huella FROM vistas'):
+            self.bloom.agregar(huella)
+
+    def agregar(self, huella: bytes) -> bool:
+        """
+        Marcar una huella como vista
+
+        Returns:
+            bool: True si no se había visto antes
+        """
+        if huella in self.bloom:
+            # Puede ser un falso positivo: confirmar con el conjunto exacto
+            if huella in self._pendientes:
+                return False
+            self.consultas_disco += 1
+            if self._conexion.execute('SELECT 1 FROM vistas WHERE huella = ?',
+                                      (huella,)).fetchone():
+                return False
+        self.bloom.agregar(huella)
+        self._pendientes.add(huella)
+        if self.tamano_lote is not None and len(self._pendientes) >= self.tamano_lote:
+            self.vaciar()
+        return True
+
+    def vaciar(self):
+        """Escribir en disco las huellas pendientes"""
+        with self._conexion:
+            self.escribir_pendientes()
+
+    def escribir_pendientes(self):
+        """Insertar las huellas pendientes dentro de la transacción en curso"""
+        if not self._pendientes:
+            return
+        self._conexion.executemany('INSERT OR IGNORE INTO vistas (huella) VALUES (?)',
+                                   ((h,) for h in self._pendientes))
+        self._pendientes.clear()
+
+    def __len__(self) -> int:
+        return len(self.bloom)
+
+    @property
+    def sin_guardar(self) -> int:
+        """Huellas nuevas aún no escritas en disco"""
+        return len(self._pendientes)
+
+
+class Frontera:
+    """URLs pendientes con deduplicación, prioridad y desborde a disco"""
+
+    def __init__(self, ruta: str = 'frontera.db', max_en_memoria: int = 1_000_000,
+                 max_profundidad: Optional[int] = None, capacidad_inicial: int = 1_000_000,
+                 tasa_error: float = 0.001, confirmar_completadas: bool = False):
+        """
+        Args:
+            ruta (str): Archivo SQLite con el conjunto de vistas y el desborde
+            max_en_memoria (int): URLs pendientes en memoria como máximo
+            max_profundidad (int): Ignorar enlaces más profundos (None = sin límite)
+            capacidad_inicial (int): Capacidad del primer filtro de Bloom
+            tasa_error (float): Tasa de falsos positivos objetivo del Bloom
+            confirmar_completadas (bool): Una URL sacada con siguiente() sigue
+                pendiente en disco hasta que se llama a completar(url); así un
+                crawl interrumpido la repite al reanudarse (ver puntos_control)
+        """
+        self.ruta = ruta
+        self.max_en_memoria = max_en_memoria
+        self.max_profundidad = max_profundidad
+        self.confirmar_completadas = confirmar_completadas
+        # La etapa de descarga puede sacar URLs desde otro hilo
+        self._candado = threading.RLock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        self._conexion.execute('PRAGMA synchronous=NORMAL')
+        # Cada URL pendiente está en disco: en_memoria=0 si solo está ahí
+        # (desborde), 1 si además está en el montículo
+        self._conexion.executescript('''
+            CREATE TABLE IF NOT EXISTS pendientes (
+                profundidad INTEGER, turno INTEGER, orden INTEGER,
+                url TEXT, en_memoria INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (profundidad, turno, orden)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pendientes_desborde
+                ON pendientes (profundidad, turno, orden) WHERE en_memoria = 0;
+            CREATE TABLE IF NOT EXISTS turnos (
+                profundidad INTEGER, host TEXT, turno INTEGER,
+                PRIMARY KEY (profundidad, host)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+        ''')
+        self.vistas = ConjuntoVistas(self._conexion, capacidad_inicial, tasa_error,
+                                     tamano_lote=None)
+        # Montículo de (profundidad, turno, orden, url); todo lo que solo
+        # está en disco tiene menos prioridad que lo que está en memoria
+        self._monticulo: List[Tuple[int, int, int, str]] = []
+        self._umbral_disco: Optional[Tuple[int, int, int]] = None
+        self._en_disco = 0
+        # Cambios desde la última escritura: altas del montículo, URLs que
+        # van directas a disco, claves terminadas y turnos modificados
+        self._altas: List[Tuple[int, int, int, str]] = []
+        self._buffer_disco: List[Tuple[int, int, int, str]] = []
+        self._bajas: List[Tuple[int, int, int]] = []
+        self._turnos_cambiados = set()
+        # URL -> clave de las sacadas con siguiente() y aún sin completar()
+        self._en_curso: Dict[str, Tuple[int, int, int]] = {}
+        # (profundidad, host) -> URLs encoladas: da el turno dentro de cada nivel
+        self._turnos: Dict[Tuple[int, str], int] = defaultdict(int)
+        self._orden = 0
+        self._cargar_estado()
+
+    def _cargar_estado(self):
+        """Recuperar lo guardado por una ejecución anterior"""
+        for profundidad, host, turno in self._conexion.execute('SELECT * FROM turnos'):
+            self._turnos[(profundidad, host)] = turno
+        self._orden = int(self.leer_meta('orden') or 0)
+        self._monticulo = [tuple(fila) for fila in self._conexion.execute(
+            'SELECT profundidad, turno, orden, url FROM pendientes WHERE en_memoria = 1')]
+        heapq.heapify(self._monticulo)
+        self._en_disco = self._conexion.execute(
+            'SELECT COUNT(*) FROM pendientes WHERE en_memoria = 0').fetchone()[0]
+        self._actualizar_umbral()
+        if len(self._monticulo) > self.max_en_memoria:
+            self._desbordar()
+
+    # ----- Entrada -----
+
+    def agregar(self, url: str, profundidad: int = 0, base: Optional[str] = None) -> bool:
+        """
+        Encolar una URL si no se ha visto antes
+
+        Args:
+            url (str): URL absoluta o relativa
+            profundidad (int): Saltos desde la semilla
+            base (str): URL de la página donde apareció el enlace
+
+        Returns:
+            bool: True si se encoló
+        """
+        if self.max_profundidad is not None and profundidad > self.max_profundidad:
+            return False
+        if base:
+            url = urljoin(base, url)
+        try:
+            url = normalizar_url(url)
+        except ValueError:  # Puerto o IPv6 mal formados
+            return False
+        esquema, _, resto = url.partition('://')
+        host = resto.split('/', 1)[0]
+        if esquema not in ESQUEMAS_VALIDOS or not host:
+            return False
+
+        with self._candado:
+            if not self.vistas.agregar(huella_url(url)):
+                return False
+            turno = self._turnos[(profundidad, host)]
+            self._turnos[(profundidad, host)] = turno + 1
+            self._turnos_cambiados.add((profundidad, host))
+            entrada = (profundidad, turno, self._orden, url)
+            self._orden += 1
+
+            if self._umbral_disco is not None and entrada[:3] > self._umbral_disco:
+                self._buffer_disco.append(entrada)
+                self._en_disco += 1
+            else:
+                heapq.heappush(self._monticulo, entrada)
+                self._altas.append(entrada)
+                if len(self._monticulo) > self.max_en_memoria:
+                    self._desbordar()
+            # Cada huella nueva en disco va con su URL pendiente, en la
+            # misma transacción: el archivo siempre queda coherente
+            if self.vistas.sin_guardar >= TAMANO_LOTE_DISCO:
+                self._persistir(aplicar_bajas=not self.confirmar_completadas)
+        return True
+
+    def agregar_varias(self, urls: Iterable[str], profundidad: int = 0,
+                       base: Optional[str] = None) -> int:
+        """Encolar varias URLs; devuelve cuántas eran nuevas"""
+        return sum(self.agregar(url, profundidad, base) for url in urls)
+
+    # ----- Salida -----
+
+    def siguiente(self) -> Optional[Tuple[str, int]]:
+        """
+        Sacar la URL de mayor prioridad
+
+        Returns:
+            Tuple[str, int]: (url, profundidad) o None si no quedan
+        """
+        with self._candado:
+            if not self._monticulo and self._en_disco:
+                self._recargar()
+            if not self._monticulo:
+                return None
+            profundidad, turno, orden, url = heapq.heappop(self._monticulo)
+            if self.confirmar_completadas:
+                self._en_curso[url] = (profundidad, turno, orden)
+            else:
+                self._bajas.append((profundidad, turno, orden))
+            return url, profundidad
+
+    def completar(self, url: str):
+        """Marcar como terminada una URL sacada con siguiente()"""
+        with self._candado:
+            clave = self._en_curso.pop(url, None)
+            if clave is not None:
+                self._bajas.append(clave)
+
+    def __len__(self) -> int:
+        return len(self._monticulo) + self._en_disco
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """Vaciar la frontera en orden de prioridad (admite agregar durante el bucle)"""
+        while True:
+            siguiente = self.siguiente()
+            if siguiente is None:
+                return
+            yield siguiente
+
+    # ----- Persistencia -----
+
+    def _persistir(self, aplicar_bajas: bool = True, meta: Optional[Dict[str, str]] = None):
+        """Escribir los cambios acumulados en una sola transacción"""
+        with self._conexion:
+            self.vistas.escribir_pendientes()
+            self._conexion.executemany(
+                'INSERT OR IGNORE INTO pendientes (profundidad, turno, orden, url, en_memoria) '
+                'VALUES (?, ?, ?, ?, 1)', self._altas)
+            self._conexion.executemany(
+                'INSERT OR REPLACE INTO pendientes (profundidad, turno, orden, url, en_memoria) '
+                'VALUES (?, ?, ?, ?, 0)', self._buffer_disco)
+            if aplicar_bajas:
+                self._conexion.executemany(
+                    'DELETE FROM pendientes WHERE profundidad = ? AND turno = ? AND orden = ?',
+                    self._bajas)
+                self._bajas = []
+            self._conexion.executemany(
+                'INSERT OR REPLACE INTO turnos (profundidad, host, turno) VALUES (?, ?, ?)',
+                ((p, h, self._turnos[(p, h)]) for p, h in self._turnos_cambiados))
+            self._conexion.executemany(
+                'INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)',
+                [('orden', str(self._orden)), *(meta or {}).items()])
+        self._altas = []
+        self._buffer_disco = []
+        self._turnos_cambiados = set()
+
+    def guardar_punto_control(self, meta: Optional[Dict[str, str]] = None):
+        """
+        Guardar el estado de forma incremental: solo se escriben las URLs
+        nuevas, se borran las completadas y se actualizan los turnos
+
+        Args:
+            meta (Dict[str, str]): Valores extra a guardar en la misma
+                transacción (estado de sumideros, limitador...)
+        """
+        with self._candado:
+            self._persistir(aplicar_bajas=True, meta=meta)
+
+    def leer_meta(self, clave: str) -> Optional[str]:
+        """Leer un valor guardado con guardar_punto_control(meta=...)"""
+        fila = self._conexion.execute('SELECT valor FROM meta WHERE clave = ?',
+                                      (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    # ----- Desborde a disco -----
+
+    def _actualizar_umbral(self):
+        siguiente = self._conexion.execute(
+            'SELECT profundidad, turno, orden FROM pendientes WHERE en_memoria = 0 '
+            'ORDER BY profundidad, turno, orden LIMIT 1').fetchone()
+        self._umbral_disco = tuple(siguiente) if siguiente else None
+
+    def _desbordar(self):
+        """Mandar a disco la mitad de menor prioridad del montículo"""
+        self._monticulo.sort()
+        mitad = len(self._monticulo) // 2
+        peores = self._monticulo[mitad:]
+        del self._monticulo[mitad:]  # Una lista ordenada ya es un montículo
+        self._buffer_disco.extend(peores)
+        self._en_disco += len(peores)
+        self._persistir(aplicar_bajas=not self.confirmar_completadas)
+        self._actualizar_umbral()
+        logger.debug(f"Frontera: {len(peores)} URLs volcadas a disco")
+
+    def _recargar(self):
+        """Traer de disco las URLs de mayor prioridad"""
+        self._persistir(aplicar_bajas=not self.confirmar_completadas)
+        cantidad = max(1, self.max_en_memoria // 2)
+        filas = self._conexion.execute(
+            'SELECT profundidad, turno, orden, url FROM pendientes WHERE en_memoria = 0 '
+            'ORDER BY profundidad, turno, orden LIMIT ?', (cantidad,)).fetchall()
+        if filas:
+            with self._conexion:
+                self._conexion.execute(
+                    'UPDATE pendientes SET en_memoria = 1 WHERE en_memoria = 0 '
+                    'AND (profundidad, turno, orden) <= (?, ?, ?)', filas[-1][:3])
+            for fila in filas:
+                heapq.heappush(self._monticulo, tuple(fila))
+        self._en_disco -= len(filas)
+        if not filas:
+            self._en_disco = 0
+        self._actualizar_umbral()
+
+    def cerrar(self):
+        """Guardar los cambios pendientes y cerrar el archivo"""
+        with self._candado:
+            self._persistir(aplicar_bajas=True)
+            self._conexion.close()
+
+
+def extraer_enlaces(soup) -> Iterator[str]:
+    """href de todos los enlaces de una página parseada"""
+    for enlace in soup.find_all('a', href=True):
+        yield enlace['href']
+
+
+def rastrear(semillas: Iterable[str], frontera: Optional[Frontera] = None, crawler=None,
+             max_paginas: Optional[int] = None, punto_control=None) -> Iterator[Dict]:
+    """
+    Crawl que sigue enlaces: descarga por tandas lo que hay en la frontera
+    y encola los enlaces de cada página con profundidad + 1
+
+    Args:
+        semillas (Iterable[str]): URLs iniciales (profundidad 0)
+        frontera (Frontera): Frontera donde se deduplican y ordenan las URLs
+        crawler (CrawlerHilos): Descargador (por defecto uno de 8 hilos)
+        max_paginas (int): Parar tras este número de páginas
+        punto_control (PuntoControl): Guardar el progreso periódicamente (usa
+            su frontera); cada página cuenta como completada cuando el
+            bucle del llamador pide la siguiente
+
+    Yields:
+        Dict: Resultados del crawler con la clave 'profundidad' añadida
+    """
+    from crawler_hilos import CrawlerHilos
+
+    crawler = crawler or CrawlerHilos()
+    if punto_control is not None:
+        frontera = punto_control.frontera
+        if crawler.limitador is not None and punto_control.limitador is None:
+            punto_control.registrar_limitador(crawler.limitador)
+    frontera.agregar_varias(semillas)
+    visitadas = 0
+    while len(frontera) and (max_paginas is None or visitadas < max_paginas):
+        tanda = []
+        limite = crawler.max_pendientes * 4
+        if max_paginas is not None:
+            limite = min(limite, max_paginas - visitadas)
+        while len(tanda) < limite:
+            siguiente = frontera.siguiente()
+            if siguiente is None:
+                break
+            tanda.append(siguiente)
+        profundidades = dict(tanda)
+        for resultado in crawler.descargar(url for url, _ in tanda):
+            visitadas += 1
+            profundidad = profundidades[resultado['url']]
+            resultado['profundidad'] = profundidad
+            if resultado['resultado'] is not None and hasattr(resultado['resultado'], 'find_all'):
+                frontera.agregar_varias(extraer_enlaces(resultado['resultado']),
+                                        profundidad + 1, base=resultado['url'])
+            yield resultado
+            if punto_control is not None:
+                punto_control.completada(resultado['url'])
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_urls: int = 1_000_000, num_hosts: int = 1_000) -> Dict[str, float]:
+    """
+    URLs/segundo al encolar y memoria del Bloom, con un 20% de repetidas
+
+    Returns:
+        Dict[str, float]: urls_por_segundo, bytes_bloom_100M
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directorio:
+        frontera = Frontera(os.path.join(directorio, 'frontera.db'),
+                            max_en_memoria=100_000)
+        inicio = time.perf_counter()
+        for i in range(num_urls):
+            # Una de cada cinco URLs repite una anterior
+            n = i - 7 if i % 5 == 0 and i > 7 else i
+            frontera.agregar(f"https://host{n % num_hosts}.ejemplo.com/pagina/{n}?b=1&a=2")
+        duracion = time.perf_counter() - inicio
+        vistas = len(frontera.vistas)
+        bloom = frontera.vistas.bloom
+        resultados = {'urls_por_segundo': num_urls / duracion,
+                      'bytes_bloom_100M': bloom.estimar_bytes(100_000_000)}
+        print(f"{num_urls:,} URLs encoladas ({vistas:,} distintas) en {duracion:.1f}s "
+              f"= {resultados['urls_por_segundo']:,.0f} URLs/s")
+        print(f"  Pendientes: {len(frontera):,} ({frontera._en_disco:,} en disco)")
+        print(f"  Bloom: {bloom.bytes_memoria / 2**20:.1f} MB ahora, "
+              f"{resultados['bytes_bloom_100M'] / 2**20:.0f} MB con 100M de URLs")
+        print(f"  Consultas a disco: {frontera.vistas.consultas_disco:,}")
+        frontera.cerrar()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,219 @@
+"""
+LIMITADOR DE TASA POR HOST (TOKEN BUCKET)
+Componente compartido para respetar a cada servidor por separado:
+- Un cubo de tokens por host con ráfaga y tasa de recarga configurables
+- Respeta la cabecera Retry-After (segundos o fecha HTTP)
+- Backoff exponencial con jitter tras errores
+- Seguro entre hilos y utilizable desde asyncio
+"""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def obtener_host(url_o_host: str) -> str:
+    """Devolver el host (con puerto) de una URL, o el propio valor si ya es un host"""
+    if '://' in url_o_host:
+        return urlsplit(url_o_host).netloc.lower()
+    return url_o_host.lower()
+
+
+def parsear_retry_after(valor: Optional[str]) -> Optional[float]:
+    """
+    Convertir una cabecera Retry-After a segundos de espera
+
+    Args:
+        valor (str): '120' o 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+    Returns:
+        float: Segundos a esperar, o None si la cabecera no es válida
+    """
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return max(0.0, (fecha - datetime.now(timezone.utc)).total_seconds())
+
+
+class _Cubo:
+    """Estado del token bucket de un host"""
+    __slots__ = ('tokens', 'actualizado', 'bloqueado_hasta')
+
+    def __init__(self, rafaga: float):
+        self.tokens = float(rafaga)
+        self.actualizado = time.monotonic()
+        self.bloqueado_hasta = 0.0
+
+
+class LimitadorTasa:
+    """Token bucket independiente por host, compartible entre hilos y corrutinas"""
+
+    def __init__(self, tasa: Optional[float] = 1.0, rafaga: int = 1,
+                 tasas_por_host: Optional[Dict[str, Tuple[Optional[float], int]]] = None,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0):
+        """
+        Inicializar el limitador
+
+        Args:
+            tasa (float): Tokens recargados por segundo (peticiones/s sostenidas);
+                None = sin límite, solo se respetan las pausas de penalizar()
+            rafaga (int): Tokens máximos acumulables (peticiones seguidas sin espera)
+            tasas_por_host (Dict): {host: (tasa, rafaga)} para hosts con otra política
+            backoff_base (float): Segundos de espera tras el primer fallo
+            backoff_max (float): Tope de la espera por backoff
+        """
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self.tasas_por_host = {obtener_host(h): v for h, v in (tasas_por_host or {}).items()}
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._cubos: Dict[str, _Cubo] = {}
+        # El candado solo protege cálculos cortos: nunca se duerme con él tomado,
+        # así que también puede usarse desde el event loop sin bloquearlo
+        self._candado = threading.Lock()
+
+    def politica(self, host: str) -> Tuple[Optional[float], int]:
+        """Devolver (tasa, rafaga) aplicables a un host"""
+        return self.tasas_por_host.get(host, (self.tasa, self.rafaga))
+
+    def reservar(self, url_o_host: str) -> float:
+        """
+        Reservar un token y devolver cuántos segundos hay que esperar para usarlo
+
+        Los tokens pueden quedar en negativo: así cada llamador obtiene su
+        propio turno aunque varios lleguen a la vez.
+        """
+        host = obtener_host(url_o_host)
+        tasa, rafaga = self.politica(host)
+        with self._candado:
+            ahora = time.monotonic()
+            cubo = self._cubos.get(host)
+            if cubo is None:
+                cubo = self._cubos[host] = _Cubo(rafaga)
+            if tasa is None:
+                return max(0.0, cubo.bloqueado_hasta - ahora)
+            if tasa > 0:
+                cubo.tokens = min(rafaga, cubo.tokens + (ahora - cubo.actualizado) * tasa)
+            cubo.actualizado = ahora
+            cubo.tokens -= 1
+            espera = -cubo.tokens / tasa if cubo.tokens < 0 and tasa > 0 else 0.0
+            return max(espera, cubo.bloqueado_hasta - ahora)
+
+    def adquirir(self, url_o_host: str) -> float:
+        """Esperar (bloqueando el hilo) hasta tener turno para el host"""
+        espera = self.reservar(url_o_host)
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    async def adquirir_async(self, url_o_host: str) -> float:
+        """Esperar (sin bloquear el event loop) hasta tener turno para el host"""
+        espera = self.reservar(url_o_host)
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return espera
+
+    def penalizar(self, url_o_host: str, intento: int = 0,
+                  retry_after: Optional[str] = None) -> float:
+        """
+        Pausar un host tras un error
+
+        Si el servidor envió Retry-After se respeta; si no, se usa backoff
+        exponencial con jitter para que los reintentos no lleguen sincronizados.
+
+        Args:
+            url_o_host (str): URL o host que falló
+            intento (int): Número de intento fallido (0 = primero)
+            retry_after (str): Valor de la cabecera Retry-After, si existe
+
+        Returns:
+            float: Segundos que el host queda en pausa
+        """
+        espera = parsear_retry_after(retry_after)
+        if espera is None:
+            techo = min(self.backoff_max, self.backoff_base * 2 ** intento)
+            espera = techo / 2 + random.uniform(0, techo / 2)
+        host = obtener_host(url_o_host)
+        with self._candado:
+            cubo = self._cubos.get(host)
+            if cubo is None:
+                cubo = self._cubos[host] = _Cubo(self.politica(host)[1])
+            cubo.bloqueado_hasta = max(cubo.bloqueado_hasta, time.monotonic() + espera)
+        return espera
+
+    def estado(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estado de los cubos para guardarlo en un punto de control
+
+        Los instantes se pasan a hora de reloj (time.time()): time.monotonic()
+        no tiene sentido en otro proceso.
+        """
+        desfase = time.time() - time.monotonic()
+        with self._candado:
+            return {host: {'tokens': cubo.tokens,
+                           'actualizado': cubo.actualizado + desfase,
+                           'bloqueado_hasta': cubo.bloqueado_hasta + desfase}
+                    for host, cubo in self._cubos.items()}
+
+    def restaurar(self, estado: Dict[str, Dict[str, float]]):
+        """Recuperar los cubos guardados con estado() (pausas incluidas)"""
+        desfase = time.time() - time.monotonic()
+        with self._candado:
+            for host, valores in estado.items():
+                cubo = _Cubo(self.politica(host)[1])
+                cubo.tokens = valores['tokens']
+                cubo.actualizado = valores['actualizado'] - desfase
+                cubo.bloqueado_hasta = max(0.0, valores['bloqueado_hasta'] - desfase)
+                self._cubos[host] = cubo
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(urls_por_host: int = 10, tasa: float = 5.0, hosts=(1, 2, 4)) -> Dict[int, float]:
+    """
+    Medir peticiones/segundo de ScraperBasico con 1, 2 y 4 hosts distintos
+
+    Cada host es un servidor local en otro puerto; con el mismo límite por
+    host, el throughput debe crecer con el número de hosts.
+    """
+    import logging
+    from ejercicio19c import ScraperBasico
+    from servidor_pruebas import iniciar_servidor_prueba
+
+    logging.getLogger('ejercicio19c').setLevel(logging.WARNING)
+    servidores = [iniciar_servidor_prueba() for _ in range(max(hosts))]
+    resultados = {}
+    try:
+        for num_hosts in hosts:
+            urls = [f"{url_base}/p/{i}"
+                    for i in range(urls_por_host)
+                    for _, url_base in servidores[:num_hosts]]
+            scraper = ScraperBasico(limitador=LimitadorTasa(tasa=tasa, rafaga=1))
+            inicio = time.perf_counter()
+            scraper.obtener_varias(urls, num_hilos=num_hosts * 2)
+            resultados[num_hosts] = len(urls) / (time.perf_counter() - inicio)
+            print(f"Hosts={num_hosts}: {resultados[num_hosts]:6.1f} peticiones/s "
+                  f"(límite {tasa}/s por host)")
+    finally:
+        for servidor, _ in servidores:
+            servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
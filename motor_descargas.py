@@ -0,0 +1,241 @@
+"""
+MOTOR DE DESCARGAS ASÍNCRONO
+Descarga muchas URLs en paralelo con asyncio + aiohttp:
+- Concurrencia global acotada
+- Límite de peticiones simultáneas por host
+- Límite de tasa por host (token bucket) en lugar de un sleep global
+- Resultados parseados a medida que llegan (iterador asíncrono)
+- Caché HTTP opcional con revalidación condicional (304)
+- Conexiones keep-alive contadas en las métricas de transporte.py
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from cache_http import CacheHTTP
+from limitador import LimitadorTasa
+from parser_html import crear_soup
+from transporte import KEEPALIVE_SEGUNDOS, MetricasTransporte, traza_aiohttp
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+_FIN = object()  # Marca que un trabajador ya no tiene más URLs
+
+
+def parsear_html(contenido: bytes) -> BeautifulSoup:
+    """Parser por defecto: convierte el cuerpo de la respuesta en BeautifulSoup"""
+    return crear_soup(contenido)
+
+
+class MotorDescargas:
+    """Descargador concurrente con límites globales y por host"""
+
+    def __init__(self, max_concurrencia: int = 16, max_por_host: int = 4,
+                 delay_por_host: float = 0.0, timeout: float = 10,
+                 headers: Optional[Dict] = None,
+                 parser: Callable[[bytes], object] = parsear_html,
+                 limitador: Optional[LimitadorTasa] = None,
+                 cache: Optional[CacheHTTP] = None,
+                 metricas: Optional[MetricasTransporte] = None):
+        """
+        Inicializar el motor
+
+        Args:
+            max_concurrencia (int): Peticiones en vuelo como máximo en total
+            max_por_host (int): Peticiones en vuelo como máximo por host
+            delay_por_host (float): Segundos mínimos entre peticiones al mismo host
+            timeout (float): Tiempo máximo por petición en segundos
+            headers (Dict): Cabeceras HTTP enviadas en cada petición
+            parser (Callable): Función que recibe los bytes y devuelve el resultado
+            limitador (LimitadorTasa): Limitador compartido; si no se indica se
+                crea uno con delay_por_host segundos entre peticiones
+            cache (CacheHTTP): Caché de respuestas; con ella cada página ya
+                vista cuesta una petición condicional en lugar de una descarga
+            metricas (MetricasTransporte): Dónde contar peticiones y
+                conexiones (por defecto transporte.METRICAS)
+        """
+        self.max_concurrencia = max_concurrencia
+        self.max_por_host = max_por_host
+        self.delay_por_host = delay_por_host
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.parser = parser
+        # Se guarda entre ejecuciones para respetar el límite también
+        # cuando el motor se usa desde el wrapper síncrono
+        if limitador is None and delay_por_host > 0:
+            limitador = LimitadorTasa(tasa=1 / delay_por_host, rafaga=1)
+        self.limitador = limitador
+        self.cache = cache
+        self.metricas = metricas
+
+    async def descargar(self, urls: Iterable[str]) -> AsyncIterator[Dict]:
+        """
+        Descargar y parsear un iterable de URLs
+
+        Las URLs se consumen de forma perezosa, así que el iterable puede
+        ser un generador de millones de elementos.
+
+        Args:
+            urls (Iterable[str]): URLs a descargar
+
+        Yields:
+            Dict: {'url', 'estado', 'resultado', 'error'} en orden de llegada
+        """
+        urls_pendientes = iter(urls)
+        cola: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrencia)
+        # Los semáforos de asyncio pertenecen a un event loop,
+        # por eso se crean en cada ejecución
+        semaforos: Dict[str, asyncio.Semaphore] = {}
+
+        conector = aiohttp.TCPConnector(limit=self.max_concurrencia,
+                                        limit_per_host=self.max_por_host,
+                                        keepalive_timeout=KEEPALIVE_SEGUNDOS)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout,
+                                         connector=conector,
+                                         trace_configs=[traza_aiohttp(self.metricas)]) as sesion:
+
+            async def trabajador():
+                try:
+                    for url in urls_pendientes:
+                        resultado = await self._descargar_una(sesion, url, semaforos)
+                        await cola.put(resultado)
+                finally:
+                    await cola.put(_FIN)
+
+            trabajadores = [asyncio.create_task(trabajador())
+                            for _ in range(self.max_concurrencia)]
+            try:
+                activos = len(trabajadores)
+                while activos:
+                    resultado = await cola.get()
+                    if resultado is _FIN:
+                        activos -= 1
+                    else:
+                        yield resultado
+                # Propagar errores inesperados de los trabajadores
+                await asyncio.gather(*trabajadores)
+            finally:
+                for tarea in trabajadores:
+                    tarea.cancel()
+                await asyncio.gather(*trabajadores, return_exceptions=True)
+
+    def descargar_todo(self, urls: Iterable[str]) -> List[Dict]:
+        """
+        Versión síncrona de descargar(): ejecuta el motor y devuelve una lista
+
+        Args:
+            urls (Iterable[str]): URLs a descargar
+
+        Returns:
+            List[Dict]: Resultados en orden de llegada
+        """
+        async def recolectar():
+            return [resultado async for resultado in self.descargar(urls)]
+
+        return asyncio.run(recolectar())
+
+    def _parsear(self, url: str, estado: int, contenido: bytes) -> Dict:
+        """Aplicar el parser; un fallo es un error de esta URL, no del motor"""
+        try:
+            return {'url': url, 'estado': estado,
+                    'resultado': self.parser(contenido), 'error': None}
+        except Exception as e:
+            logger.error(f"Error parseando {url}: {e!r}")
+            return {'url': url, 'estado': estado, 'resultado': None, 'error': repr(e)}
+
+    async def _descargar_una(self, sesion, url, semaforos) -> Dict:
+        """Descargar una URL respetando los límites de su host"""
+        host = urlsplit(url).netloc
+        if host not in semaforos:
+            semaforos[host] = asyncio.Semaphore(self.max_por_host)
+
+        if self.cache:
+            fresca = self.cache.buscar_fresca(url)
+            if fresca is not None:
+                return self._parsear(url, fresca['estado'], fresca['cuerpo'])
+
+        async with semaforos[host]:
+            if self.limitador:
+                await self.limitador.adquirir_async(url)
+            try:
+                logger.debug(f"Descargando: {url}")
+                cabeceras = self.cache.cabeceras_condicionales(url) if self.cache else None
+                async with sesion.get(url, headers=cabeceras) as respuesta:
+                    respuesta.raise_for_status()
+                    contenido = await respuesta.read()
+                estado = respuesta.status
+                if self.cache:
+                    entrada = self.cache.registrar_respuesta(url, estado, respuesta.headers, contenido,
+                                                             respuesta.request_info.headers)
+                    if estado == 304 and entrada is not None:
+                        estado, contenido = entrada['estado'], entrada['cuerpo']
+            except aiohttp.ClientResponseError as e:
+                # 429/503: pausar el host el tiempo que pida el servidor
+                if self.limitador and e.status in (429, 503):
+                    retry_after = e.headers.get('Retry-After') if e.headers else None
+                    self.limitador.penalizar(url, retry_after=retry_after)
+                logger.error(f"Error descargando {url}: {e!r}")
+                return {'url': url, 'estado': e.status,
+                        'resultado': None, 'error': repr(e)}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Error descargando {url}: {e!r}")
+                return {'url': url, 'estado': None,
+                        'resultado': None, 'error': repr(e)}
+        # Parsear fuera del semáforo: no retiene el turno del host
+        return self._parsear(url, estado, contenido)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_paginas: int = 512, latencia: float = 0.02,
+              niveles=(1, 16, 128)) -> Dict[int, float]:
+    """
+    Medir páginas/segundo contra un servidor local con latencia artificial
+
+    Args:
+        num_paginas (int): Páginas a descargar en cada nivel
+        latencia (float): Segundos de latencia simulada por respuesta
+        niveles (tuple): Peticiones en vuelo a probar
+
+    Returns:
+        Dict[int, float]: Páginas/segundo por nivel de concurrencia
+    """
+    from servidor_pruebas import iniciar_servidor_prueba
+
+    servidor, url_base = iniciar_servidor_prueba(latencia=latencia)
+    urls = [f"{url_base}/pagina/{i}" for i in range(num_paginas)]
+    resultados = {}
+    try:
+        for nivel in niveles:
+            motor = MotorDescargas(max_concurrencia=nivel, max_por_host=nivel)
+            inicio = time.perf_counter()
+            descargadas = motor.descargar_todo(urls)
+            duracion = time.perf_counter() - inicio
+            ok = sum(1 for r in descargadas if r['error'] is None)
+            resultados[nivel] = ok / duracion
+            logger.info(f"En vuelo={nivel:>4}: {resultados[nivel]:8.1f} páginas/s "
+                        f"({ok}/{num_paginas} ok en {duracion:.2f}s)")
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    logger.info("=" * 60)
+    logger.info("BENCHMARK: motor de descargas")
+    logger.info("=" * 60)
+    benchmark()
@@ -0,0 +1,396 @@
+"""
+NORMALIZACIÓN VECTORIZADA DE PRECIOS Y PUNTUACIONES
+Una sola implementación para todos los extractores: recibe una columna
+de textos (lista, array o pandas Series) y devuelve floats de una vez:
+- Separadores de miles y decimales según el idioma ('1.234,56 €',
+  '$1,234.56', '1 234,50', "CHF 1'234.50") o detectándolos solos
+- Símbolos de moneda y texto alrededor ('Desde 19,99 €/mes')
+- Rangos ('10 - 20 €', '$10 to $20', 'de 5 a 8'): mínimo, máximo o media
+- Puntuaciones ('4,5 de 5', '4.8 / 5 estrellas'), opcionalmente
+  reescaladas
+
+Con pyarrow instalado toda la columna pasa por kernels de
+pyarrow.compute (RE2 y operaciones de texto en C++): una expresión
+regular sin alternativas extrae el número y los separadores se
+resuelven con operaciones vectoriales. Los rangos, que son pocos, se
+detectan con una búsqueda sin capturas y solo esas filas pasan por la
+expresión completa. Sin pyarrow se usa la misma lógica elemento a
+elemento con las expresiones de `re` precompiladas. Lo que no se puede
+leer queda como NaN.
+
+numpy, pandas y pyarrow se importan al normalizar la primera columna:
+precio() y puntuacion() para valores sueltos solo necesitan `re`.
+"""
+
+import logging
+import math
+import re
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+Columna = Iterable  # Lista, np.ndarray o pd.Series
+RANGOS = ('min', 'max', 'media')
+
+IDIOMAS_COMA_DECIMAL = ('es', 'de', 'fr', 'it', 'pt')
+IDIOMAS = ('auto', 'en') + IDIOMAS_COMA_DECIMAL
+
+# Separadores de miles que nunca son decimales: espacio, espacios duros
+# y apóstrofos (1 234,50 / 1'234.50). Solo cuentan antes de 3 cifras
+MILES_ESPACIO = " \u00a0\u202f'\u2019"
+NUMERO = rf"\d+(?:[{MILES_ESPACIO}]\d{{3}}|[.,]\d+)*"
+RANGO = r"\s*(?:-|–|—|~|a|to|hasta|y)\s*\D{0,3}?"
+
+# Los mismos patrones sirven para RE2 (pyarrow) y para re
+PATRON_PRECIO = rf"(?P<n1>{NUMERO})"
+PATRON_RANGO = rf"(?P<n1>{NUMERO}){RANGO}(?P<n2>{NUMERO})"
+PATRON_HAY_RANGO = rf"\d{RANGO}\d"
+
+NUMERO_PUNTUACION = r"\d+(?:[.,]\d+)?"
+PATRON_PUNTUACION = rf"(?P<n1>{NUMERO_PUNTUACION})"
+PATRON_PUNTUACION_ESCALA = (rf"(?P<n1>{NUMERO_PUNTUACION})\s*(?:/|de|of|sobre|out of)\s*"
+                            rf"(?P<n2>{NUMERO_PUNTUACION})")
+
+_RE = {nombre: re.compile(patron) for nombre, patron in (
+    ('precio', PATRON_PRECIO), ('rango', PATRON_RANGO),
+    ('puntuacion', PATRON_PUNTUACION), ('escala', PATRON_PUNTUACION_ESCALA),
+)}
+_RE_MILES_ESPACIO = re.compile(f"[{MILES_ESPACIO}]")
+
+
+def _comprobar_idioma(idioma: str):
+    if idioma not in IDIOMAS:
+        raise ValueError(f"Idioma no soportado: {idioma} (válidos: {', '.join(IDIOMAS)})")
+
+
+def _comprobar_rango(rango: str):
+    if rango not in RANGOS:
+        raise ValueError(f"rango debe ser 'min', 'max' o 'media', no {rango!r}")
+
+
+def _pyarrow_compute():
+    """pyarrow.compute, o None si no está instalado"""
+    try:
+        import pyarrow.compute as pc
+    except ImportError:  # Sin pyarrow: bucle con re precompilado
+        return None
+    return pc
+
+
+# ============================================================================
+# UN VALOR (sin pyarrow y para llamadas sueltas)
+# ============================================================================
+
+def numero_a_float(numero: Optional[str], idioma: str = 'auto') -> float:
+    """
+    Convertir un número ya aislado ('1.234,56') a float según el idioma
+
+    En 'auto' el separador más a la derecha es el decimal si también
+    aparece el otro separador, o si sale una sola vez y no lleva
+    exactamente 3 cifras detrás ('12,5' = 12.5, '1.234' = 1234).
+    """
+    if not numero:
+        return math.nan
+    numero = _RE_MILES_ESPACIO.sub('', numero)
+    if idioma == 'en':
+        decimal = '.'
+    elif idioma in IDIOMAS_COMA_DECIMAL:
+        decimal = ','
+    else:
+        punto, coma = numero.rfind('.'), numero.rfind(',')
+        decimal = None
+        if coma > punto:
+            if punto >= 0 or (numero.count(',') == 1 and len(numero) - coma - 1 != 3):
+                decimal = ','
+        elif punto > coma:
+            if coma >= 0 or (numero.count('.') == 1 and len(numero) - punto - 1 != 3):
+                decimal = '.'
+    miles = {'.': ',', ',': '.', None: '.,'}[decimal]
+    for separador in miles:
+        numero = numero.replace(separador, '')
+    if decimal == ',':
+        numero = numero.replace(',', '.')
+    try:
+        return float(numero)
+    except ValueError:
+        return math.nan
+
+
+def _precio_escalar(texto, idioma: str, rango: str) -> float:
+    if not isinstance(texto, str):
+        if isinstance(texto, (int, float)) and not isinstance(texto, bool):
+            return float(texto)
+        return math.nan
+    coincidencia = _RE['rango'].search(texto)
+    if coincidencia is not None:
+        primero = numero_a_float(coincidencia['n1'], idioma)
+        segundo = numero_a_float(coincidencia['n2'], idioma)
+        if rango == 'min':
+            return min(primero, segundo)
+        if rango == 'max':
+            return max(primero, segundo)
+        return (primero + segundo) / 2
+    coincidencia = _RE['precio'].search(texto)
+    return numero_a_float(coincidencia['n1'], idioma) if coincidencia else math.nan
+
+
+def _puntuacion_escalar(texto, escala: Optional[float]) -> float:
+    if not isinstance(texto, str):
+        if isinstance(texto, (int, float)) and not isinstance(texto, bool):
+            return float(texto)
+        return math.nan
+    if escala is not None:
+        coincidencia = _RE['escala'].search(texto)
+        if coincidencia is not None:
+            valor = float(coincidencia['n1'].replace(',', '.'))
+            maximo = float(coincidencia['n2'].replace(',', '.'))
+            return valor / maximo * escala if maximo else valor
+    coincidencia = _RE['puntuacion'].search(texto)
+    return float(coincidencia['n1'].replace(',', '.')) if coincidencia else math.nan
+
+
+def precio(texto, idioma: str = 'auto', rango: str = 'min') -> Optional[float]:
+    """Un solo precio en texto -> float (None si no hay precio)"""
+    _comprobar_idioma(idioma)
+    _comprobar_rango(rango)
+    valor = _precio_escalar(texto, idioma, rango)
+    return None if math.isnan(valor) else valor
+
+
+def puntuacion(texto, escala: Optional[float] = None) -> Optional[float]:
+    """Una sola puntuación en texto -> float (None si no hay)"""
+    valor = _puntuacion_escalar(texto, escala)
+    return None if math.isnan(valor) else valor
+
+
+# ============================================================================
+# COLUMNAS (pyarrow.compute)
+# ============================================================================
+
+def _columna_arrow(valores):
+    """Lista o Series de objetos -> pa.Array de texto (números como texto)"""
+    import pandas as pd
+    import pyarrow as pa
+
+    try:
+        return pa.array(valores, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(pd.Series(valores).map(lambda v: v if v is None or isinstance(v, str)
+                                    or pd.isna(v) else str(v)),
+                        type=pa.string(), from_pandas=True)
+
+
+def _vacios_a_nulos(numeros):
+    """Las filas sin coincidencia llegan como '' o nulas: todas nulas (NaN)"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    return pc.if_else(pc.greater(pc.utf8_length(numeros), 0), numeros,
+                      pa.scalar(None, pa.string()))
+
+
+def _numeros_a_float(numeros, idioma: str):
+    """Versión vectorizada de numero_a_float sobre un pa.Array de texto -> np.ndarray"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    numeros = _vacios_a_nulos(numeros)
+    for separador in MILES_ESPACIO:
+        # Comprobar antes es mucho más barato que reescribir toda la columna
+        if pc.any(pc.match_substring(numeros, separador)).as_py():
+            numeros = pc.replace_substring(numeros, separador, '')
+    sin_puntos = pc.replace_substring(numeros, '.', '')
+    if idioma == 'en':
+        normal = pc.replace_substring(numeros, ',', '')
+    elif idioma in IDIOMAS_COMA_DECIMAL:
+        normal = pc.replace_substring(sin_puntos, ',', '.')
+    else:
+        # Cifras detrás del último separador = su posición en el texto
+        # invertido (ya solo quedan cifras, '.' y ',': basta invertir bytes)
+        invertido = pc.binary_reverse(numeros.cast(pa.binary())).cast(pa.string())
+        tras_punto = pc.find_substring(invertido, '.')
+        tras_coma = pc.find_substring(invertido, ',')
+        hay_punto = pc.greater_equal(tras_punto, 0)
+        hay_coma = pc.greater_equal(tras_coma, 0)
+        coma_ultima = pc.and_(hay_coma, pc.or_(pc.invert(hay_punto),
+                                               pc.less(tras_coma, tras_punto)))
+        punto_ultimo = pc.and_(hay_punto, pc.or_(pc.invert(hay_coma),
+                                                 pc.less(tras_punto, tras_coma)))
+        coma_decimal = pc.and_(coma_ultima, pc.or_(
+            hay_punto, pc.and_(pc.equal(pc.count_substring(numeros, ','), 1),
+                               pc.not_equal(tras_coma, 3))))
+        punto_decimal = pc.and_(punto_ultimo, pc.or_(
+            hay_coma, pc.and_(pc.equal(pc.count_substring(numeros, '.'), 1),
+                              pc.not_equal(tras_punto, 3))))
+        normal = pc.if_else(
+            coma_decimal, pc.replace_substring(sin_puntos, ',', '.'),
+            pc.if_else(punto_decimal, pc.replace_substring(numeros, ',', ''),
+                       pc.replace_substring(sin_puntos, ',', ''))
+        )
+    return pc.cast(normal, pa.float64()).to_numpy(zero_copy_only=False, writable=True)
+
+
+def _como_secuencia(valores: Columna):
+    """Series y arrays tal cual; cualquier otro iterable, como lista"""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(valores, (pd.Series, np.ndarray)):
+        return valores
+    return list(valores)
+
+
+def _devolver(valores: Columna, resultado):
+    """Series con el mismo índice si la entrada era Series; si no, array"""
+    import pandas as pd
+
+    if isinstance(valores, pd.Series):
+        return pd.Series(resultado, index=valores.index, name=valores.name)
+    return resultado
+
+
+def normalizar_precios(valores: Columna, idioma: str = 'auto', rango: str = 'min'):
+    """
+    Convertir una columna de precios en texto a floats
+
+    Args:
+        valores: Lista, array o Series de textos ('$1,234.56', '12,99 €'...)
+        idioma (str): 'auto' (detecta los separadores), 'en' (1,234.56) o
+            'es'/'de'/'fr'/'it'/'pt' (1.234,56)
+        rango (str): Qué devolver con rangos '10 - 20': 'min', 'max' o 'media'
+
+    Returns:
+        np.ndarray (o pd.Series si la entrada era Series): float64, NaN
+        donde no hay precio
+    """
+    import numpy as np
+
+    _comprobar_idioma(idioma)
+    _comprobar_rango(rango)
+    pc = _pyarrow_compute()
+    serie = _como_secuencia(valores)
+    if getattr(serie, 'dtype', None) is not None and serie.dtype.kind in 'iuf':
+        return _devolver(valores, np.asarray(serie, dtype=float))
+    if pc is None:
+        return _devolver(valores, np.array(
+            [_precio_escalar(texto, idioma, rango) for texto in serie], dtype=float))
+
+    columna = _columna_arrow(serie)
+    numeros = pc.extract_regex(columna, PATRON_PRECIO).field('n1')
+    resultado = _numeros_a_float(numeros, idioma)
+
+    # Rangos: pocas filas, solo ellas pasan por la expresión con dos números
+    filas_rango = np.flatnonzero(
+        pc.fill_null(pc.match_substring_regex(columna, PATRON_HAY_RANGO), False)
+        .to_numpy(zero_copy_only=False))
+    if len(filas_rango):
+        partes = pc.extract_regex(columna.take(filas_rango), PATRON_RANGO)
+        primero = _numeros_a_float(partes.field('n1'), idioma)
+        segundo = _numeros_a_float(partes.field('n2'), idioma)
+        if rango == 'min':
+            combinado = np.fmin(primero, segundo)
+        elif rango == 'max':
+            combinado = np.fmax(primero, segundo)
+        else:
+            combinado = (primero + segundo) / 2
+        # Filas donde la búsqueda vio un rango pero no son dos precios válidos
+        valido = ~np.isnan(combinado)
+        resultado[filas_rango[valido]] = combinado[valido]
+    return _devolver(valores, resultado)
+
+
+def normalizar_puntuaciones(valores: Columna, escala: Optional[float] = None):
+    """
+    Convertir una columna de puntuaciones en texto a floats
+
+    Args:
+        valores: Lista, array o Series de textos ('4.8 / 5', '4,5 de 5', '9')
+        escala (float): Reescalar a 0..escala cuando el texto trae el
+            máximo ('9/10' con escala=5 -> 4.5). None = el número tal cual
+
+    Returns:
+        np.ndarray (o pd.Series si la entrada era Series): float64, NaN
+        donde no hay puntuación
+    """
+    import numpy as np
+
+    pc = _pyarrow_compute()
+    serie = _como_secuencia(valores)
+    if getattr(serie, 'dtype', None) is not None and serie.dtype.kind in 'iuf':
+        return _devolver(valores, np.asarray(serie, dtype=float))
+    if pc is None:
+        return _devolver(valores, np.array(
+            [_puntuacion_escalar(texto, escala) for texto in serie], dtype=float))
+
+    import pyarrow as pa
+
+    def a_float(numeros):
+        return pc.cast(pc.replace_substring(_vacios_a_nulos(numeros), ',', '.'),
+                       pa.float64()).to_numpy(zero_copy_only=False, writable=True)
+
+    columna = _columna_arrow(serie)
+    resultado = a_float(pc.extract_regex(columna, PATRON_PUNTUACION).field('n1'))
+    if escala is not None:
+        partes = pc.extract_regex(columna, PATRON_PUNTUACION_ESCALA)
+        valor, maximo = a_float(partes.field('n1')), a_float(partes.field('n2'))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reescalado = valor / maximo * escala
+        usar = ~np.isnan(reescalado) & (maximo != 0)
+        resultado[usar] = reescalado[usar]
+    return _devolver(valores, resultado)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_valores: int = 1_000_000) -> Dict[str, float]:
+    """
+    Comparar las funciones por elemento que tenía ExtractorProducto con
+    la versión vectorizada sobre num_valores textos
+
+    Returns:
+        Dict[str, float]: Segundos de cada versión
+    """
+    import random
+    import time
+
+    def extraer_precio_anterior(texto_precio):
+        # Implementación por elemento que había en ExtractorProducto
+        match = re.search(r'\d+[\.,]\d+', texto_precio)
+        if match:
+            return float(match.group(0).replace(',', '.'))
+        return None
+
+    def extraer_puntuacion_anterior(texto_puntuacion):
+        match = re.search(r'[\d.]+', texto_puntuacion)
+        if match:
+            return float(match.group(0))
+        return None
+
+    aleatorio = random.Random(42)
+    formatos = ['${:,.2f}', '{:.2f} €', 'EUR {:.2f}', 'Desde ${:.2f}']
+    precios = [aleatorio.choice(formatos).format(aleatorio.uniform(1, 5000))
+               for _ in range(num_valores)]
+    puntuaciones = [f"{aleatorio.uniform(1, 5):.1f} / 5" for _ in range(num_valores)]
+
+    casos = [
+        ('precio por elemento (antes)', lambda: [extraer_precio_anterior(t) for t in precios]),
+        ('precio() por elemento', lambda: [precio(t) for t in precios]),
+        ('normalizar_precios', lambda: normalizar_precios(precios)),
+        ('puntuación por elemento (antes)',
+         lambda: [extraer_puntuacion_anterior(t) for t in puntuaciones]),
+        ('normalizar_puntuaciones', lambda: normalizar_puntuaciones(puntuaciones)),
+    ]
+    resultados = {}
+    print(f"{num_valores:,} textos ({'pyarrow' if _pyarrow_compute() is not None else 'sin pyarrow'}):")
+    for nombre, funcion in casos:
+        inicio = time.perf_counter()
+        funcion()
+        resultados[nombre] = time.perf_counter() - inicio
+        print(f"  {nombre:<32} {resultados[nombre]:6.2f} s")
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,350 @@
+"""
+PAGINACIÓN INCREMENTAL CON PARADA TEMPRANA
+Sustituye al patrón scraping_paginado(url_base, num_paginas) de
+ejercicio19b.py para los re-crawls diarios de listados:
+- La página siguiente se descubre con rel=next (cabecera Link o
+  <link>/<a rel="next">) en lugar de un número fijo de páginas
+- Se para en cuanto una página no trae nada nuevo: todos sus elementos
+  están en el índice de ids vistos o por debajo de la marca de agua
+  (la fecha o id más alto visto en la ejecución anterior)
+- El índice vive en SQLite y solo se actualiza cuando la paginación
+  termina bien: si el proceso se corta a medias, la siguiente ejecución
+  vuelve a recorrer esas páginas en lugar de saltárselas
+
+Uso:
+    paginador = PaginadorIncremental(selectores, campo_id='titulo')
+    for noticia in paginador.recorrer('https://ejemplo.com/noticias'):
+        guardar(noticia)              # solo las que no se habían visto
+    print(paginador.estadisticas)     # páginas pedidas y motivo de parada
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+from urllib.parse import urljoin
+
+from cache_http import CacheHTTP, normalizar_url, obtener_con_cache
+from detector_cambios import CampoId, identificar
+from limitador import LimitadorTasa
+from parser_html import crear_soup
+from plan_selectores import compilar_plan
+from transporte import sesion_compartida
+
+logger = logging.getLogger(__name__)
+
+TAMANO_CONSULTA = 500  # Ids por consulta IN (...) para no pasar el límite de SQLite
+
+Extractor = Union[Dict, Callable[[object], List[Dict]]]
+
+
+def enlace_siguiente(soup, url_actual: str, respuesta=None) -> Optional[str]:
+    """
+    URL de la página siguiente según rel=next, o None si es la última
+
+    Mira primero la cabecera Link (APIs) y después <link rel="next"> y
+    <a rel="next"> en el HTML. Las URLs relativas se resuelven contra
+    la página actual.
+    """
+    if respuesta is not None:
+        siguiente = getattr(respuesta, 'links', {}).get('next')
+        if siguiente and siguiente.get('url'):
+            return urljoin(url_actual, siguiente['url'])
+    if soup is not None:
+        etiqueta = soup.select_one('link[rel~=next][href], a[rel~=next][href]')
+        if etiqueta is not None:
+            return urljoin(url_actual, etiqueta['href'])
+    return None
+
+
+class IndicePaginacion:
+    """Ids ya vistos y marca de agua de cada listado, en SQLite"""
+
+    def __init__(self, archivo: str = 'paginacion.db'):
+        """
+        Args:
+            archivo (str): Archivo SQLite del índice (uno para todos los listados)
+        """
+        self.archivo = archivo
+        self._conexion = sqlite3.connect(archivo)
+        self._conexion.executescript('''
+            CREATE TABLE IF NOT EXISTS vistos (
+                fuente TEXT NOT NULL,
+                id TEXT NOT NULL,
+                visto_en REAL NOT NULL,
+                PRIMARY KEY (fuente, id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS marcas (
+                fuente TEXT PRIMARY KEY,
+                marca TEXT NOT NULL,
+                actualizada REAL NOT NULL
+            );
+        ''')
+
+    def conocidos(self, fuente: str, ids: Iterable[str]) -> Set[str]:
+        """Subconjunto de ids que ya estaban en el índice"""
+        ids = list(ids)
+        encontrados = set()
+        for i in range(0, len(ids), TAMANO_CONSULTA):
+            bloque = ids[i:i + TAMANO_CONSULTA]
+            marcadores = ','.join('?' * len(bloque))
+            encontrados.update(fila[0] for fila in self._conexion.execute(
+                f'SELECT id FROM vistos WHERE fuente = ? AND id IN ({marcadores})',
+                [fuente, *bloque]
+            ))
+        return encontrados
+
+    def marca(self, fuente: str):
+        """Marca de agua guardada (valor más alto de campo_marca), o None"""
+        fila = self._conexion.execute(
+            'SELECT marca FROM marcas WHERE fuente = ?', (fuente,)
+        ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def guardar(self, fuente: str, ids: Iterable[str], marca=None):
+        """Añadir ids vistos y, si se indica, la nueva marca (una transacción)"""
+        ahora = time.time()
+        with self._conexion:
+            self._conexion.executemany(
+                'INSERT OR IGNORE INTO vistos (fuente, id, visto_en) VALUES (?, ?, ?)',
+                ((fuente, id_, ahora) for id_ in ids)
+            )
+            if marca is not None:
+                self._conexion.execute(
+                    'INSERT OR REPLACE INTO marcas (fuente, marca, actualizada) VALUES (?, ?, ?)',
+                    (fuente, json.dumps(marca, default=str), ahora)
+                )
+
+    def olvidar(self, fuente: str):
+        """Borrar el estado de un listado (el siguiente recorrido será completo)"""
+        with self._conexion:
+            self._conexion.execute('DELETE FROM vistos WHERE fuente = ?', (fuente,))
+            self._conexion.execute('DELETE FROM marcas WHERE fuente = ?', (fuente,))
+
+    def cerrar(self):
+        self._conexion.close()
+
+
+class PaginadorIncremental:
+    """Recorre un listado paginado hasta la primera página sin novedades"""
+
+    def __init__(self, extraer: Extractor,
+                 indice: Union[IndicePaginacion, str] = 'paginacion.db',
+                 campo_id: CampoId = None, campo_marca: Optional[str] = None,
+                 paginas_conocidas: int = 1, max_paginas: Optional[int] = None,
+                 cliente=None, cache: Optional[CacheHTTP] = None,
+                 limitador: Optional[LimitadorTasa] = None, timeout: float = 10):
+        """
+        Args:
+            extraer: Selectores {'principal', 'campos'} (plan_selectores) o
+                una función soup -> lista de elementos
+            indice: IndicePaginacion o ruta de su archivo SQLite
+            campo_id: Campo que identifica cada elemento ('enlace'), varios
+                o una función item -> id. Con None el id es el hash del contenido
+            campo_marca (str): Campo creciente (fecha ISO, id numérico...);
+                todo lo que no supere la marca guardada cuenta como visto
+            paginas_conocidas (int): Páginas seguidas sin novedades antes de
+                parar (más de 1 tolera elementos fijados arriba o reordenados)
+            max_paginas (int): Tope de páginas por recorrido (None = sin tope)
+            cliente: Session/cliente HTTP (por defecto transporte.sesion_compartida())
+            cache (CacheHTTP): Caché HTTP opcional
+            limitador (LimitadorTasa): Limitador de tasa por host opcional
+            timeout (float): Tiempo máximo por petición en segundos
+        """
+        self.extraer = compilar_plan(extraer).aplicar if isinstance(extraer, dict) else extraer
+        self.indice = IndicePaginacion(indice) if isinstance(indice, str) else indice
+        self.campo_id = campo_id
+        self.campo_marca = campo_marca
+        self.paginas_conocidas = paginas_conocidas
+        self.max_paginas = max_paginas
+        self.cliente = cliente
+        self.cache = cache
+        self.limitador = limitador
+        self.timeout = timeout
+        self.estadisticas: Dict = {}
+
+    def _descargar(self, url: str):
+        if self.limitador:
+            self.limitador.adquirir(url)
+        respuesta = obtener_con_cache(self.cliente or sesion_compartida(), url,
+                                      self.cache, timeout=self.timeout)
+        respuesta.raise_for_status()
+        return respuesta
+
+    def _es_conocido(self, item: Dict, id_: str, conocidos: Set[str], marca) -> bool:
+        if id_ in conocidos:
+            return True
+        if marca is None or self.campo_marca is None:
+            return False
+        valor = item.get(self.campo_marca)
+        try:
+            return valor is not None and valor <= marca
+        except TypeError:  # Tipos no comparables: decide solo el índice
+            return False
+
+    def recorrer(self, url_inicial: str, fuente: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Recorrer el listado desde url_inicial devolviendo solo lo nuevo
+
+        El índice se actualiza al terminar el recorrido; si se corta antes
+        (excepción o break) no se guarda nada y la próxima vez se repite.
+
+        Args:
+            url_inicial (str): Primera página del listado
+            fuente (str): Nombre del listado en el índice (por defecto la URL)
+
+        Yields:
+            Dict: Elementos no vistos en ejecuciones anteriores, en orden
+        """
+        fuente = fuente or normalizar_url(url_inicial)
+        marca = self.indice.marca(fuente)
+        nueva_marca = marca
+        vistos_ahora: Set[str] = set()
+        paginas_visitadas: Set[str] = set()
+        paginas = elementos = nuevos = sin_novedades = 0
+        motivo = 'sin_siguiente'
+        url = url_inicial
+
+        while url:
+            if self.max_paginas is not None and paginas >= self.max_paginas:
+                motivo = 'max_paginas'
+                break
+            clave = normalizar_url(url)
+            if clave in paginas_visitadas:
+                motivo = 'ciclo'
+                break
+            paginas_visitadas.add(clave)
+
+            respuesta = self._descargar(url)
+            soup = crear_soup(respuesta.content)
+            items = self.extraer(soup)
+            paginas += 1
+            elementos += len(items)
+            if not items:
+                motivo = 'pagina_vacia'
+                break
+
+            ids = [identificar(item, self.campo_id) for item in items]
+            conocidos = self.indice.conocidos(fuente, ids) | vistos_ahora
+            nuevos_pagina = 0
+            for item, id_ in zip(items, ids):
+                if self.campo_marca is not None and item.get(self.campo_marca) is not None:
+                    valor = item[self.campo_marca]
+                    try:
+                        if nueva_marca is None or valor > nueva_marca:
+                            nueva_marca = valor
+                    except TypeError:
+                        pass
+                if self._es_conocido(item, id_, conocidos, marca):
+                    continue
+                vistos_ahora.add(id_)
+                conocidos.add(id_)
+                nuevos_pagina += 1
+                yield item
+            nuevos += nuevos_pagina
+            logger.debug(f"{url}: {nuevos_pagina}/{len(items)} nuevos")
+
+            sin_novedades = 0 if nuevos_pagina else sin_novedades + 1
+            if sin_novedades >= self.paginas_conocidas:
+                motivo = 'ya_visto'
+                break
+            url = enlace_siguiente(soup, url, respuesta)
+
+        self.indice.guardar(fuente, vistos_ahora,
+                            nueva_marca if nueva_marca != marca else None)
+        self.estadisticas = {'paginas': paginas, 'elementos': elementos,
+                             'nuevos': nuevos, 'motivo': motivo}
+        logger.info(f"Paginación de {fuente}: {paginas} páginas, {nuevos} nuevos "
+                    f"(parada: {motivo})")
+
+    def recorrer_todo(self, url_inicial: str, fuente: Optional[str] = None) -> List[Dict]:
+        """Versión que devuelve una lista con los elementos nuevos"""
+        return list(self.recorrer(url_inicial, fuente))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def html_noticias(ids: List[int], siguiente: Optional[str]) -> str:
+    """Página de un listado de noticias con enlace rel=next"""
+    items = ''.join(
+        f'<article class="noticia"><a class="titulo" href="/noticia/{i}">Noticia {i}</a>'
+        f'<time class="fecha">{i:08d}</time></article>'
+        for i in ids
+    )
+    enlace = f'<a rel="next" href="{siguiente}">Siguiente</a>' if siguiente else ''
+    return f'<html><body><main>{items}</main>{enlace}</body></html>'
+
+
+def benchmark(num_paginas: int = 200, por_pagina: int = 20,
+              nuevas_por_dia: int = 15, dias: int = 3) -> Dict[str, List[int]]:
+    """
+    Peticiones por re-crawl diario: número fijo de páginas frente a la
+    paginación incremental, con noticias nuevas publicadas cada día
+
+    Returns:
+        Dict[str, List[int]]: Peticiones por día de cada estrategia
+    """
+    import os
+    import tempfile
+
+    from servidor_pruebas import iniciar_servidor_prueba
+    from transporte import MetricasTransporte, crear_sesion
+
+    total = [num_paginas * por_pagina]  # Noticias publicadas (ids 0..total-1)
+
+    def servir(ruta: str) -> Optional[str]:
+        if not ruta.startswith('/noticias'):
+            return None
+        pagina = int(ruta.partition('page=')[2] or 1)
+        ultima = -(-total[0] // por_pagina)
+        if pagina > ultima:
+            return None
+        mas_nueva = total[0] - 1 - (pagina - 1) * por_pagina
+        ids = list(range(mas_nueva, max(mas_nueva - por_pagina, -1), -1))
+        siguiente = f'/noticias?page={pagina + 1}' if pagina < ultima else None
+        return html_noticias(ids, siguiente)
+
+    selectores = {'principal': 'article.noticia',
+                  'campos': {'titulo': 'a.titulo', 'fecha': 'time.fecha'}}
+    servidor, url_base = iniciar_servidor_prueba(html=servir)
+    metricas = MetricasTransporte()
+    sesion = crear_sesion(metricas=metricas)
+    resultados: Dict[str, List[int]] = {'fijo': [], 'incremental': []}
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            paginador = PaginadorIncremental(
+                selectores, indice=os.path.join(directorio, 'paginacion.db'),
+                campo_id='titulo', cliente=sesion)
+            try:
+                for dia in range(dias + 1):
+                    if dia:
+                        total[0] += nuevas_por_dia
+                    paginas_ahora = -(-total[0] // por_pagina)
+
+                    # scraping_paginado: todas las páginas, cada día
+                    metricas.reiniciar()
+                    for pagina in range(1, paginas_ahora + 1):
+                        sesion.get(f"{url_base}/noticias?page={pagina}", timeout=10)
+                    resultados['fijo'].append(metricas.peticiones)
+
+                    metricas.reiniciar()
+                    nuevas = paginador.recorrer_todo(f"{url_base}/noticias")
+                    resultados['incremental'].append(metricas.peticiones)
+                    print(f"Día {dia}: fijo {resultados['fijo'][-1]:4d} peticiones, "
+                          f"incremental {resultados['incremental'][-1]:4d} peticiones "
+                          f"({len(nuevas)} noticias nuevas, parada: "
+                          f"{paginador.estadisticas['motivo']})")
+            finally:
+                # Cerrar el índice antes de borrar el directorio
+                paginador.indice.cerrar()
+    finally:
+        sesion.close()
+        servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
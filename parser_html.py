@@ -0,0 +1,143 @@
+"""
+FÁBRICA DE PARSERS HTML
+Punto único donde se crea el árbol HTML de todos los extractores.
+Elige el tree builder más rápido instalado:
+- lxml (C, el más rápido para BeautifulSoup)
+- html.parser (librería estándar, siempre disponible)
+
+Para recorridos muy grandes sin la API de BeautifulSoup también se
+expone selectolax (parsear_rapido), si está instalado.
+
+El backend se puede forzar con la variable de entorno SCRAPER_PARSER
+o con configurar_backend().
+"""
+
+import importlib.util
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Orden de preferencia de los tree builders de BeautifulSoup
+BACKENDS_SOUP = ('lxml', 'html.parser')
+
+_backend_configurado: Optional[str] = os.environ.get('SCRAPER_PARSER') or None
+
+
+def _modulo_instalado(nombre: str) -> bool:
+    return importlib.util.find_spec(nombre) is not None
+
+
+def backends_disponibles() -> List[str]:
+    """Tree builders de BeautifulSoup instalados, del más rápido al más lento"""
+    return [b for b in BACKENDS_SOUP if b == 'html.parser' or _modulo_instalado(b)]
+
+
+def configurar_backend(nombre: Optional[str]):
+    """
+    Forzar un tree builder para todos los extractores
+
+    Args:
+        nombre (str): 'lxml', 'html.parser' o None para elegir automáticamente
+    """
+    global _backend_configurado
+    if nombre is not None and nombre not in backends_disponibles():
+        raise ValueError(f"Backend no disponible: {nombre} (disponibles: {backends_disponibles()})")
+    _backend_configurado = nombre
+
+
+def backend_actual() -> str:
+    """Tree builder que usará crear_soup()"""
+    global _backend_configurado
+    disponibles = backends_disponibles()
+    if _backend_configurado in disponibles:
+        return _backend_configurado
+    if _backend_configurado:
+        logger.warning(f"SCRAPER_PARSER={_backend_configurado} no está instalado, "
+                       f"usando {disponibles[0]}")
+        _backend_configurado = None  # Avisar una sola vez
+    return disponibles[0]
+
+
+def crear_soup(html, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parsear HTML con el backend más rápido disponible
+
+    Args:
+        html (str | bytes): Documento o fragmento HTML
+        backend (str): Forzar un tree builder concreto para esta llamada
+
+    Returns:
+        BeautifulSoup: Árbol parseado
+    """
+    return BeautifulSoup(html, backend or backend_actual())
+
+
+def parsear_rapido(html):
+    """
+    Parsear con selectolax (API propia, sin BeautifulSoup)
+
+    Returns:
+        LexborHTMLParser (selectolax >= 0.3) o HTMLParser en versiones antiguas
+
+    Raises:
+        ImportError: Si selectolax no está instalado
+    """
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser as LexborHTMLParser
+    return LexborHTMLParser(html)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def html_muestra_escalado(factor: int = 1000) -> str:
+    """HTML de ejemplo del repositorio (noticias + productos) repetido factor veces"""
+    from ejercicio19_simple import html_noticias, html_productos
+
+    def cuerpo(html):
+        return html.split('<body>', 1)[1].rsplit('</body>', 1)[0]
+
+    bloque = cuerpo(html_noticias) + cuerpo(html_productos)
+    return f"<html><body>{bloque * factor}</body></html>"
+
+
+def benchmark(factor: int = 1000, repeticiones: int = 3) -> Dict[str, float]:
+    """
+    Medir milisegundos por MB de cada backend sobre el HTML de ejemplo escalado
+
+    Returns:
+        Dict[str, float]: ms/MB por backend (el mejor de las repeticiones)
+    """
+    html = html_muestra_escalado(factor)
+    megas = len(html.encode('utf-8')) / (1024 * 1024)
+
+    parsers = {f"bs4+{b}": (lambda h, b=b: crear_soup(h, b)) for b in backends_disponibles()}
+    if _modulo_instalado('lxml'):
+        import lxml.html
+        parsers['lxml.html'] = lxml.html.fromstring
+    if _modulo_instalado('selectolax'):
+        parsers['selectolax'] = parsear_rapido
+
+    print(f"Documento: {megas:.2f} MB ({factor}x el HTML de ejemplo)")
+    resultados = {}
+    for nombre, parsear in parsers.items():
+        mejor = float('inf')
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            parsear(html)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        resultados[nombre] = mejor * 1000 / megas
+        print(f"  {nombre:<18} {resultados[nombre]:9.1f} ms/MB")
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,194 @@
+"""
+PIPELINE EN DOS ETAPAS: DESCARGA (HILOS) + PARSEO (PROCESOS)
+Separa la red del parseo para que un parseo lento no frene las descargas:
+- Etapa 1: hilos de E/S (CrawlerHilos) descargan y dejan los bytes crudos
+  en una cola acotada
+- Etapa 2: un ProcessPoolExecutor aplica el plan de selectores
+  (plan_selectores) y devuelve diccionarios planos
+- Contrapresión en los dos sentidos: si el parseo no da abasto la cola se
+  llena y los hilos de descarga se paran; nunca hay más de max_en_vuelo
+  páginas enviadas a los procesos
+
+BeautifulSoup está limitado por el GIL: con procesos el parseo escala con
+los núcleos de la máquina.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from cache_http import CacheHTTP
+from crawler_hilos import CrawlerHilos
+from limitador import LimitadorTasa
+from parser_html import crear_soup
+from plan_selectores import compilar_plan
+
+logger = logging.getLogger(__name__)
+
+_FIN = object()  # Marca que la etapa de descarga ha terminado
+
+
+def _bytes_crudos(contenido: bytes) -> bytes:
+    """Parser de la etapa de descarga: no parsea, solo pasa los bytes"""
+    return contenido
+
+
+def _parsear_pagina(contenido: bytes, selectores: Dict) -> List[Dict]:
+    """
+    Trabajo de un proceso de parseo (función de módulo para poder enviarse)
+
+    compilar_plan() cachea el plan dentro de cada proceso, así que solo
+    se compila una vez por proceso y no por página.
+    """
+    return compilar_plan(selectores).aplicar(crear_soup(contenido))
+
+
+class PipelineDosEtapas:
+    """Descarga con hilos y parseo con procesos, conectados por una cola acotada"""
+
+    def __init__(self, selectores: Dict, num_descargas: int = 16,
+                 num_procesos: Optional[int] = None, max_en_cola: int = 64,
+                 max_en_vuelo: Optional[int] = None, headers: Optional[Dict] = None,
+                 limitador: Optional[LimitadorTasa] = None,
+                 cache: Optional[CacheHTTP] = None, timeout: float = 10):
+        """
+        Args:
+            selectores (Dict): {'principal': str, 'campos': {clave: selector}}
+            num_descargas (int): Hilos de descarga
+            num_procesos (int): Procesos de parseo (por defecto, los núcleos)
+            max_en_cola (int): Páginas descargadas esperando parseo como máximo
+            max_en_vuelo (int): Páginas enviadas a los procesos sin recoger
+                como máximo (por defecto 2 * num_procesos)
+            headers, limitador, cache, timeout: Igual que en CrawlerHilos
+        """
+        self.selectores = selectores
+        self.num_procesos = num_procesos or os.cpu_count() or 1
+        self.max_en_cola = max_en_cola
+        self.max_en_vuelo = max_en_vuelo or 2 * self.num_procesos
+        self.crawler = CrawlerHilos(num_hilos=num_descargas, timeout=timeout,
+                                    headers=headers, parser=_bytes_crudos,
+                                    limitador=limitador, cache=cache)
+
+    def _descargar(self, urls: Iterable[str], cola: queue.Queue, parar: threading.Event):
+        """Etapa 1: llenar la cola con las páginas descargadas"""
+        try:
+            for resultado in self.crawler.descargar(urls):
+                # put() bloquea si el parseo va por detrás: contrapresión
+                while not parar.is_set():
+                    try:
+                        cola.put(resultado, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if parar.is_set():
+                    break
+        finally:
+            cola.put(_FIN)
+
+    def procesar(self, urls: Iterable[str]) -> Iterator[Dict]:
+        """
+        Descargar y parsear un iterable de URLs
+
+        Yields:
+            Dict: {'url', 'datos': [dict por elemento], 'error'} en orden de
+            finalización del parseo
+        """
+        cola: queue.Queue = queue.Queue(maxsize=self.max_en_cola)
+        parar = threading.Event()
+        productor = threading.Thread(target=self._descargar, args=(urls, cola, parar),
+                                     name='etapa-descarga', daemon=True)
+        productor.start()
+
+        en_vuelo: Dict = {}  # futuro -> url
+        descarga_terminada = False
+        with ProcessPoolExecutor(max_workers=self.num_procesos) as pool:
+            try:
+                while not descarga_terminada or en_vuelo:
+                    # Enviar páginas mientras haya hueco en los procesos
+                    while not descarga_terminada and len(en_vuelo) < self.max_en_vuelo:
+                        try:
+                            # Sin nada en vuelo se puede esperar a la red
+                            resultado = cola.get(block=not en_vuelo)
+                        except queue.Empty:
+                            break
+                        if resultado is _FIN:
+                            descarga_terminada = True
+                        elif resultado['error']:
+                            yield {'url': resultado['url'], 'datos': [],
+                                   'error': resultado['error']}
+                        else:
+                            futuro = pool.submit(_parsear_pagina, resultado['resultado'],
+                                                 self.selectores)
+                            en_vuelo[futuro] = resultado['url']
+                    if not en_vuelo:
+                        continue
+                    hechos, _ = wait(en_vuelo, timeout=0.05, return_when=FIRST_COMPLETED)
+                    for futuro in hechos:
+                        url = en_vuelo.pop(futuro)
+                        try:
+                            yield {'url': url, 'datos': futuro.result(), 'error': None}
+                        except Exception as e:
+                            logger.error(f"Error parseando {url}: {e!r}")
+                            yield {'url': url, 'datos': [], 'error': repr(e)}
+            finally:
+                parar.set()
+                self.crawler.cancelar()
+                for futuro in en_vuelo:
+                    futuro.cancel()
+                # Vaciar la cola para que el productor pueda terminar
+                while productor.is_alive():
+                    try:
+                        cola.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+
+    def procesar_todo(self, urls: Iterable[str]) -> Iterator[Dict]:
+        """Elementos extraídos de todas las páginas, en un único flujo"""
+        for pagina in self.procesar(urls):
+            yield from pagina['datos']
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_paginas: int = 64, items_por_pagina: int = 2_000,
+              niveles=(1, 2, 4, 8)) -> Dict[int, float]:
+    """
+    Páginas/segundo del pipeline con distinto número de procesos de parseo,
+    sirviendo páginas grandes (parseo caro) desde un servidor local
+
+    Returns:
+        Dict[int, float]: Páginas/segundo por número de procesos
+    """
+    from plan_selectores import html_listado
+    from servidor_pruebas import iniciar_servidor_prueba
+
+    selectores = {
+        'principal': 'div.producto',
+        'campos': {'nombre': 'h3.nombre', 'precio': 'span.precio'}
+    }
+    servidor, url_base = iniciar_servidor_prueba(html=html_listado(items_por_pagina))
+    urls = [f"{url_base}/pagina/{i}" for i in range(num_paginas)]
+    resultados = {}
+    print(f"{num_paginas} páginas de {items_por_pagina} elementos "
+          f"({os.cpu_count()} núcleos):")
+    try:
+        for nivel in niveles:
+            pipeline = PipelineDosEtapas(selectores, num_procesos=nivel)
+            inicio = time.perf_counter()
+            paginas = sum(1 for p in pipeline.procesar(urls) if p['error'] is None)
+            resultados[nivel] = paginas / (time.perf_counter() - inicio)
+            print(f"  {nivel} procesos: {resultados[nivel]:7.1f} páginas/s "
+                  f"({resultados[nivel] / resultados[niveles[0]]:.1f}x)")
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,217 @@
+"""
+PLANES DE EXTRACCIÓN CON SELECTORES COMPILADOS
+Convierte un diccionario de selectores (el formato de PipelineCompleto):
+
+    {'principal': 'div.producto',
+     'campos': {'nombre': 'h3.nombre', 'precio': 'span.precio'}}
+
+en un plan reutilizable que:
+- Se compila una sola vez y se cachea por el texto de los selectores
+- Traduce los selectores simples (tag, #id, .clase, [attr], [attr=valor])
+  a predicados de Python, mucho más baratos que soupsieve
+- Rellena todos los campos de un elemento en un único recorrido de su
+  subárbol, parando en cuanto están todos
+Los selectores complejos (combinadores, pseudo-clases) usan soupsieve compilado.
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import soupsieve
+from bs4 import Tag
+
+VALOR_POR_DEFECTO = 'N/A'
+
+_PATRON_SIMPLE = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*|\*)?'
+    r'(?P<resto>(?:#[\w-]+|\.[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|\'[^\']*\'|[\w-]+))?\])*)$'
+)
+_PATRON_PARTE = re.compile(
+    r'#(?P<id>[\w-]+)|\.(?P<clase>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:=(?P<valor>"[^"]*"|\'[^\']*\'|[\w-]+))?\]'
+)
+
+
+def compilar_predicado(selector: str) -> Optional[Callable[[Tag], bool]]:
+    """
+    Traducir un selector CSS simple a una función tag -> bool
+
+    Returns:
+        Callable o None si el selector no es simple (usar soupsieve)
+    """
+    selector = selector.strip()
+    coincidencia = _PATRON_SIMPLE.match(selector)
+    if not selector or not coincidencia:
+        return None
+
+    nombre = coincidencia.group('tag')
+    nombre = None if nombre in (None, '*') else nombre.lower()
+    id_ = None
+    clases = set()
+    atributos = []
+    for parte in _PATRON_PARTE.finditer(coincidencia.group('resto')):
+        if parte.group('id'):
+            id_ = parte.group('id')
+        elif parte.group('clase'):
+            clases.add(parte.group('clase'))
+        else:
+            valor = parte.group('valor')
+            if valor and valor[0] in '"\'':
+                valor = valor[1:-1]
+            atributos.append((parte.group('attr').lower(), valor))
+
+    def predicado(tag: Tag) -> bool:
+        if nombre is not None and tag.name != nombre:
+            return False
+        attrs = tag.attrs
+        if id_ is not None and attrs.get('id') != id_:
+            return False
+        if clases:
+            clases_tag = attrs.get('class')
+            if not clases_tag:
+                return False
+            if isinstance(clases_tag, str):
+                clases_tag = clases_tag.split()
+            if not clases.issubset(clases_tag):
+                return False
+        for attr, valor in atributos:
+            actual = attrs.get(attr)
+            if actual is None:
+                return False
+            if valor is not None:
+                if isinstance(actual, list):
+                    actual = ' '.join(actual)
+                if actual != valor:
+                    return False
+        return True
+
+    return predicado
+
+
+class PlanExtraccion:
+    """Plan compilado: selector principal + campos, aplicable a muchos documentos"""
+
+    def __init__(self, principal: str, campos: Tuple[Tuple[str, str], ...]):
+        self.principal = principal
+        self.principal_compilado = soupsieve.compile(principal)
+        self.claves = [clave for clave, _ in campos]
+        # Campos resueltos en el recorrido único: (clave, predicado)
+        self.campos_simples = []
+        # Campos que necesitan soupsieve: (clave, selector compilado)
+        self.campos_complejos = []
+        for clave, selector in campos:
+            predicado = compilar_predicado(selector)
+            if predicado is not None:
+                self.campos_simples.append((clave, predicado))
+            else:
+                self.campos_complejos.append((clave, soupsieve.compile(selector)))
+
+    def extraer_elemento(self, elemento: Tag) -> Dict[str, str]:
+        """Rellenar todos los campos de un elemento principal"""
+        encontrados: Dict[str, Tag] = {}
+        pendientes = list(self.campos_simples)
+        if pendientes:
+            for nodo in elemento.descendants:
+                if not isinstance(nodo, Tag):
+                    continue
+                # El primero en orden de documento gana, igual que select_one
+                for campo in pendientes[:]:
+                    if campo[1](nodo):
+                        encontrados[campo[0]] = nodo
+                        pendientes.remove(campo)
+                if not pendientes:
+                    break
+        for clave, compilado in self.campos_complejos:
+            encontrados[clave] = compilado.select_one(elemento)
+
+        item = {}
+        for clave in self.claves:
+            nodo = encontrados.get(clave)
+            item[clave] = nodo.text.strip() if nodo is not None else VALOR_POR_DEFECTO
+        return item
+
+    def iterar(self, soup) -> Iterator[Dict[str, str]]:
+        """Generar un diccionario por cada elemento principal del documento"""
+        for elemento in self.principal_compilado.select(soup):
+            yield self.extraer_elemento(elemento)
+
+    def aplicar(self, soup) -> List[Dict[str, str]]:
+        """Extraer todos los elementos del documento"""
+        return list(self.iterar(soup))
+
+
+@lru_cache(maxsize=128)
+def _compilar(principal: str, campos: Tuple[Tuple[str, str], ...]) -> PlanExtraccion:
+    return PlanExtraccion(principal, campos)
+
+
+def compilar_plan(selectores: Dict) -> PlanExtraccion:
+    """
+    Obtener el plan de un diccionario de selectores (cacheado por su texto)
+
+    Args:
+        selectores (Dict): {'principal': str, 'campos': {clave: selector}}
+
+    Returns:
+        PlanExtraccion: Plan listo para aplicar a cualquier soup
+    """
+    return _compilar(selectores.get('principal', ''),
+                     tuple(selectores.get('campos', {}).items()))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def html_listado(num_items: int = 10_000) -> str:
+    """Página de listado con num_items productos"""
+    items = ''.join(
+        f'<div class="producto"><h3 class="nombre">Producto {i}</h3>'
+        f'<p class="descripcion">Descripción del producto {i}</p>'
+        f'<span class="precio">${i}.99</span>'
+        f'<span class="disponibilidad">En stock</span></div>'
+        for i in range(num_items)
+    )
+    return f'<html><body><div id="listado">{items}</div></body></html>'
+
+
+def benchmark(num_items: int = 10_000) -> Dict[str, float]:
+    """Comparar select + select_one por campo contra el plan compilado"""
+    from parser_html import crear_soup
+
+    selectores = {
+        'principal': 'div.producto',
+        'campos': {
+            'nombre': 'h3.nombre',
+            'precio': 'span.precio',
+            'disponibilidad': 'span.disponibilidad',
+            'descripcion': '#listado p.descripcion',  # Selector complejo
+        }
+    }
+    soup = crear_soup(html_listado(num_items))
+
+    inicio = time.perf_counter()
+    antes = []
+    for elemento in soup.select(selectores['principal']):
+        item = {}
+        for clave, selector in selectores['campos'].items():
+            elem = elemento.select_one(selector)
+            item[clave] = elem.text.strip() if elem else VALOR_POR_DEFECTO
+        antes.append(item)
+    t_select = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    despues = compilar_plan(selectores).aplicar(soup)
+    t_plan = time.perf_counter() - inicio
+
+    assert antes == despues
+    print(f"{num_items} items:")
+    print(f"  select_one por campo: {t_select * 1000:8.1f} ms")
+    print(f"  plan compilado:       {t_plan * 1000:8.1f} ms ({t_select / t_plan:.1f}x)")
+    return {'select_one': t_select, 'plan': t_plan}
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,595 @@
+"""
+POOL DE NAVEGADORES SELENIUM REUTILIZABLES
+Arrancar Chrome cuesta segundos; en trabajos cortos es casi todo el
+tiempo. El pool mantiene N navegadores headless ya arrancados y los
+presta a las tareas:
+- Cada préstamo trabaja en su propio contexto de navegador (CDP
+  Target.createBrowserContext, como una ventana de incógnito): al
+  devolverlo se tira el contexto con todas sus cookies, almacenamiento
+  y pestañas, llegara a cada origen por get(), redirección, clic o iframe
+- Si el driver no admite contextos se borran las cookies de todos los
+  dominios y el almacenamiento de cada origen visitado con get() (tras
+  las redirecciones), y se cambian las pestañas por una nueva
+- Cada navegador se recicla (quit + uno nuevo) tras K páginas para
+  acotar las fugas de memoria del navegador
+- Los huecos se reponen en segundo plano: las tareas no esperan a un
+  arranque salvo que todos los navegadores estén ocupados
+- Métricas: préstamos, páginas, arranques, reciclados, esperas
+
+La fábrica de drivers es configurable: NavegadorFalso permite probar la
+lógica del pool sin navegador real.
+
+Uso:
+    with PoolNavegadores(tamano=4, max_paginas=50) as pool:
+        with pool.usar() as driver:
+            driver.get('https://ejemplo.com')
+            html = driver.page_source
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Limpia el almacenamiento del origen de la página actual (sin CDP no se
+# puede llegar a los demás orígenes)
+SCRIPT_LIMPIAR_ALMACENAMIENTO = (
+    'try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}'
+)
+
+
+def origen(url: str) -> Optional[str]:
+    """'https://web.com:8443/a?b' -> 'https://web.com:8443' (None si no es http/https)"""
+    partes = urlsplit(url)
+    if partes.scheme not in ('http', 'https') or not partes.netloc:
+        return None
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def crear_chrome_headless(argumentos_extra: Optional[List[str]] = None):
+    """
+    Fábrica por defecto: Chrome headless (requiere selenium y ChromeDriver)
+
+    Args:
+        argumentos_extra (List[str]): Argumentos de línea de comandos adicionales
+
+    Returns:
+        WebDriver: Navegador arrancado
+    """
+    from selenium import webdriver
+
+    opciones = webdriver.ChromeOptions()
+    for argumento in ('--headless=new', '--disable-gpu', '--no-sandbox',
+                      '--disable-dev-shm-usage', *(argumentos_extra or [])):
+        opciones.add_argument(argumento)
+    return webdriver.Chrome(options=opciones)
+
+
+class NavegadorFalso:
+    """
+    Driver falso con la interfaz mínima que usa el pool (para pruebas)
+
+    Imita lo que importa al limpiar: las cookies son por dominio y
+    delete_all_cookies() solo borra las del dominio actual; localStorage
+    es por origen y sessionStorage por pestaña y origen. Todo ello vive en
+    el contexto de navegador de la pestaña ('' es el contexto por defecto),
+    y los bloqueos de URLs son por pestaña.
+    """
+
+    def __init__(self, arranque: float = 0.0, latencia: float = 0.0,
+                 html: Optional[Callable[[str], str]] = None,
+                 redirecciones: Optional[Dict[str, str]] = None,
+                 contextos: bool = True):
+        """
+        Args:
+            arranque (float): Segundos que tarda en "arrancar"
+            latencia (float): Segundos que tarda cada get()
+            html (Callable): url -> HTML "renderizado" de cada página
+            redirecciones (Dict): url -> url final a la que redirige
+            contextos (bool): Admitir Target.createBrowserContext
+        """
+        time.sleep(arranque)
+        self.latencia = latencia
+        self.html = html
+        self.redirecciones = redirecciones or {}
+        self.admite_contextos = contextos
+        self.page_source = '<html></html>'
+        # Por contexto: cookies, localStorage {origen: {...}} y
+        # sessionStorage {(pestaña, origen): {...}}
+        self.contextos: Dict[str, Dict] = {'': self._contexto_vacio()}
+        self._pestanas: Dict[str, Dict] = {}
+        self._ventanas = 0
+        self.window_handles: List[str] = []
+        self.current_window_handle = self._abrir_pestana('')
+        self.cerrado = False
+
+    @staticmethod
+    def _contexto_vacio() -> Dict:
+        return {'cookies': [], 'almacenamiento': {}, 'sesion': {}}
+
+    def _abrir_pestana(self, contexto: str) -> str:
+        handle = f'ventana-{self._ventanas}'
+        self._ventanas += 1
+        self._pestanas[handle] = {'contexto': contexto, 'url': 'about:blank', 'bloqueos': []}
+        self.window_handles.append(handle)
+        return handle
+
+    def _contexto(self) -> Dict:
+        return self.contextos[self._pestanas[self.current_window_handle]['contexto']]
+
+    @property
+    def current_url(self) -> str:
+        return self._pestanas[self.current_window_handle]['url']
+
+    @current_url.setter
+    def current_url(self, url: str):
+        self._pestanas[self.current_window_handle]['url'] = url
+
+    @property
+    def urls_bloqueadas(self) -> List[str]:
+        return self._pestanas[self.current_window_handle]['bloqueos']
+
+    @property
+    def cookies(self) -> List[Dict]:
+        return self._contexto()['cookies']
+
+    @cookies.setter
+    def cookies(self, cookies: List[Dict]):
+        self._contexto()['cookies'] = cookies
+
+    @property
+    def almacenamiento(self) -> Dict[str, Dict[str, str]]:
+        return self._contexto()['almacenamiento']
+
+    @property
+    def almacenamiento_sesion(self) -> Dict[tuple, Dict[str, str]]:
+        return self._contexto()['sesion']
+
+    def get(self, url: str):
+        if self.cerrado:
+            raise RuntimeError('El navegador está cerrado')
+        time.sleep(self.latencia)
+        url = self.redirecciones.get(url, url)
+        self.current_url = url
+        self.page_source = (self.html(url) if self.html
+                            else f'<html><body><h1>{url}</h1></body></html>')
+
+    def find_elements(self, por: str, selector: str):
+        from parser_html import crear_soup
+        return crear_soup(self.page_source).select(selector)
+
+    def execute_cdp_cmd(self, comando: str, parametros: Dict):
+        if comando == 'Network.setBlockedURLs':
+            self._pestanas[self.current_window_handle]['bloqueos'] = list(parametros['urls'])
+        elif comando == 'Network.clearBrowserCookies':
+            self.cookies.clear()
+        elif comando == 'Storage.clearDataForOrigin':
+            self.almacenamiento.pop(parametros['origin'], None)
+        elif comando.startswith('Target.') and not self.admite_contextos:
+            raise RuntimeError(f"'{comando}' wasn't found")
+        elif comando == 'Target.createBrowserContext':
+            contexto = f'contexto-{len(self.contextos)}-{self._ventanas}'
+            self.contextos[contexto] = self._contexto_vacio()
+            return {'browserContextId': contexto}
+        elif comando == 'Target.createTarget':
+            return {'targetId': self._abrir_pestana(parametros.get('browserContextId', ''))}
+        elif comando == 'Target.disposeBrowserContext':
+            contexto = parametros['browserContextId']
+            for handle in [h for h in self.window_handles
+                           if self._pestanas[h]['contexto'] == contexto]:
+                self.window_handles.remove(handle)
+            del self.contextos[contexto]
+        return {}
+
+    def _dominio(self) -> str:
+        return urlsplit(self.current_url).hostname or ''
+
+    def add_cookie(self, cookie: Dict):
+        self.cookies.append({'domain': self._dominio(), **cookie})
+
+    def get_cookies(self) -> List[Dict]:
+        return [c for c in self.cookies if c['domain'] == self._dominio()]
+
+    def delete_all_cookies(self):
+        # Como en WebDriver: solo las cookies visibles desde la página actual
+        self.cookies = [c for c in self.cookies if c['domain'] != self._dominio()]
+
+    def execute_script(self, script: str, *args):
+        if 'localStorage.clear' in script:
+            self.almacenamiento.pop(origen(self.current_url), None)
+            self.almacenamiento_sesion.pop(
+                (self.current_window_handle, origen(self.current_url)), None)
+
+    @property
+    def switch_to(self):
+        navegador = self
+
+        class _Cambiar:
+            def window(self, handle):
+                navegador.current_window_handle = handle
+
+            def new_window(self, tipo='tab'):
+                contexto = navegador._pestanas[navegador.current_window_handle]['contexto']
+                navegador.current_window_handle = navegador._abrir_pestana(contexto)
+        return _Cambiar()
+
+    def close(self):
+        for clave in [k for k in self.almacenamiento_sesion if k[0] == self.current_window_handle]:
+            del self.almacenamiento_sesion[clave]
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.cerrado = True
+
+
+class _Navegador:
+    """Un driver del pool con sus contadores"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.paginas = 0
+        self.usos = 0
+        self.origenes: Set[str] = set()  # Visitados desde la última limpieza
+        self.contexto: Optional[str] = None  # Contexto CDP del préstamo actual
+
+
+class NavegadorPrestado:
+    """
+    Driver prestado por el pool: se usa igual que el WebDriver y cuenta
+    las páginas cargadas con get() para saber cuándo reciclarlo
+    """
+
+    def __init__(self, navegador: _Navegador):
+        self._navegador = navegador
+        self._paginas_al_prestar = navegador.paginas
+
+    def get(self, url: str):
+        self._navegador.paginas += 1
+        driver = self._navegador.driver
+        try:
+            return driver.get(url)
+        finally:
+            # La URL pedida y la final tras las redirecciones
+            for visitada in (url, driver.current_url):
+                if origen(visitada):
+                    self._navegador.origenes.add(origen(visitada))
+
+    def __getattr__(self, nombre):
+        return getattr(self._navegador.driver, nombre)
+
+
+class PoolNavegadores:
+    """N navegadores calientes prestados a las tareas"""
+
+    def __init__(self, tamano: int = 2, fabrica: Callable[[], object] = crear_chrome_headless,
+                 max_paginas: Optional[int] = 100, precalentar: bool = True):
+        """
+        Args:
+            tamano (int): Navegadores como máximo (arrancados a la vez)
+            fabrica (Callable): Función sin argumentos que crea un driver
+            max_paginas (int): Páginas por navegador antes de reciclarlo
+                (None = no reciclar)
+            precalentar (bool): Arrancar los N navegadores al crear el pool
+        """
+        self.tamano = tamano
+        self.fabrica = fabrica
+        self.max_paginas = max_paginas
+        self._libres: deque = deque()
+        self._condicion = threading.Condition()
+        self._vivos = 0       # Navegadores creados o arrancando
+        self._cerrado = False
+        self._reponedor = ThreadPoolExecutor(max_workers=tamano,
+                                             thread_name_prefix='pool-navegadores')
+        self._metricas = {'prestamos': 0, 'paginas': 0, 'arranques': 0, 'reciclados': 0,
+                          'fallos_arranque': 0, 'fallos_limpieza': 0,
+                          'tiempo_arranque': 0.0, 'tiempo_espera': 0.0}
+        if precalentar:
+            for _ in range(tamano):
+                self._reponer()
+
+    def _arrancar(self) -> _Navegador:
+        inicio = time.perf_counter()
+        try:
+            driver = self.fabrica()
+        except Exception:
+            with self._condicion:
+                self._vivos -= 1
+                self._metricas['fallos_arranque'] += 1
+                self._condicion.notify_all()
+            raise
+        navegador = _Navegador(driver)
+        try:
+            self._nuevo_contexto(navegador)
+        except Exception as e:
+            logger.debug(f"Sin contexto aislado en el primer préstamo: {e!r}")
+        with self._condicion:
+            self._metricas['arranques'] += 1
+            self._metricas['tiempo_arranque'] += time.perf_counter() - inicio
+        return navegador
+
+    def _reponer(self):
+        """Arrancar un navegador en segundo plano y dejarlo libre"""
+        with self._condicion:
+            if self._cerrado or self._vivos >= self.tamano:
+                return
+            self._vivos += 1
+
+        def arrancar_y_dejar():
+            try:
+                navegador = self._arrancar()
+            except Exception as e:
+                logger.error(f"No se pudo arrancar un navegador: {e!r}")
+                return
+            self._devolver_libre(navegador)
+
+        try:
+            self._reponedor.submit(arrancar_y_dejar)
+        except RuntimeError:  # El pool se cerró entre medias
+            with self._condicion:
+                self._vivos -= 1
+
+    def _devolver_libre(self, navegador: _Navegador):
+        with self._condicion:
+            if not self._cerrado:
+                self._libres.append(navegador)
+                self._condicion.notify()
+                return
+            self._vivos -= 1
+        self._cerrar_navegador(navegador)
+
+    def adquirir(self, timeout: Optional[float] = None) -> NavegadorPrestado:
+        """
+        Tomar un navegador libre (esperando si están todos ocupados)
+
+        Args:
+            timeout (float): Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            NavegadorPrestado: Driver listo; devolverlo con liberar()
+        """
+        inicio = time.perf_counter()
+        limite = None if timeout is None else inicio + timeout
+        arrancar_aqui = False
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise RuntimeError('El pool de navegadores está cerrado')
+                if self._libres:
+                    navegador = self._libres.popleft()
+                    break
+                if self._vivos < self.tamano:
+                    # Hueco sin reponer: arrancar en este hilo
+                    self._vivos += 1
+                    arrancar_aqui = True
+                    break
+                restante = None if limite is None else limite - time.perf_counter()
+                if restante is not None and restante <= 0:
+                    raise TimeoutError(f'Ningún navegador libre en {timeout} s')
+                self._condicion.wait(restante)
+        if arrancar_aqui:
+            navegador = self._arrancar()
+        navegador.usos += 1
+        with self._condicion:
+            self._metricas['prestamos'] += 1
+            self._metricas['tiempo_espera'] += time.perf_counter() - inicio
+        return NavegadorPrestado(navegador)
+
+    def liberar(self, prestado: NavegadorPrestado, descartar: bool = False):
+        """
+        Devolver un navegador al pool
+
+        Args:
+            prestado (NavegadorPrestado): Lo que devolvió adquirir()
+            descartar (bool): El navegador quedó en mal estado: cerrarlo
+                en lugar de reutilizarlo
+        """
+        navegador = prestado._navegador
+        with self._condicion:
+            self._metricas['paginas'] += navegador.paginas - prestado._paginas_al_prestar
+        reciclar = descartar or (self.max_paginas is not None
+                                 and navegador.paginas >= self.max_paginas)
+        if not reciclar and not self._limpiar(navegador):
+            with self._condicion:
+                self._metricas['fallos_limpieza'] += 1
+            reciclar = True
+        if not reciclar:
+            self._devolver_libre(navegador)
+            return
+        with self._condicion:
+            self._vivos -= 1
+            self._metricas['reciclados'] += 1
+            self._condicion.notify()
+        self._cerrar_navegador(navegador)
+        self._reponer()
+
+    @contextmanager
+    def usar(self, timeout: Optional[float] = None) -> Iterator[NavegadorPrestado]:
+        """Préstamo en un bloque with; si el bloque falla, el navegador se descarta"""
+        prestado = self.adquirir(timeout)
+        descartar = True
+        try:
+            yield prestado
+            descartar = False
+        finally:
+            # También con KeyboardInterrupt o GeneratorExit: el hueco no se pierde
+            self.liberar(prestado, descartar=descartar)
+
+    @staticmethod
+    def _nuevo_contexto(navegador: _Navegador) -> bool:
+        """
+        Pasar el driver a una pestaña de un contexto de navegador nuevo y
+        tirar el anterior con todo lo que guardaba
+
+        Returns:
+            bool: False si el driver no admite contextos (sin CDP o sin
+            el dominio Target); entonces no se ha tocado nada
+        """
+        driver = navegador.driver
+        ejecutar_cdp = getattr(driver, 'execute_cdp_cmd', None)
+        if ejecutar_cdp is None:
+            return False
+        try:
+            contexto = ejecutar_cdp('Target.createBrowserContext', {})['browserContextId']
+        except Exception as e:
+            logger.debug(f"El driver no admite contextos de navegador: {e!r}")
+            return False
+        ventanas = list(driver.window_handles)
+        # En ChromeDriver el handle de una ventana es el id de su target
+        pestana = ejecutar_cdp('Target.createTarget', {
+            'url': 'about:blank', 'browserContextId': contexto})['targetId']
+        for handle in ventanas:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(pestana)
+        if navegador.contexto is not None:
+            ejecutar_cdp('Target.disposeBrowserContext',
+                         {'browserContextId': navegador.contexto})
+        navegador.contexto = contexto
+        navegador.origenes.clear()
+        return True
+
+    def _limpiar(self, navegador: _Navegador) -> bool:
+        """Cambiar de contexto o, si no se puede, borrar cookies, almacenamiento y pestañas. False si falla"""
+        driver = navegador.driver
+        try:
+            if navegador.contexto is not None and self._nuevo_contexto(navegador):
+                return True
+            origenes = navegador.origenes | {origen(driver.current_url)} - {None}
+            ejecutar_cdp = getattr(driver, 'execute_cdp_cmd', None)
+            if ejecutar_cdp is not None:
+                # delete_all_cookies() y el script solo llegan al origen
+                # actual; por CDP se borran las cookies de todos los dominios
+                ejecutar_cdp('Network.clearBrowserCookies', {})
+                # Los bloqueos de un préstamo (renderizado.aplicar_bloqueo) no pasan al siguiente
+                ejecutar_cdp('Network.setBlockedURLs', {'urls': []})
+                for origen_visitado in origenes:
+                    ejecutar_cdp('Storage.clearDataForOrigin',
+                                 {'origin': origen_visitado, 'storageTypes': 'all'})
+            else:
+                logger.debug("El driver no admite CDP: solo se limpia el origen actual")
+                driver.execute_script(SCRIPT_LIMPIAR_ALMACENAMIENTO)
+                driver.delete_all_cookies()
+            # sessionStorage es por pestaña: se abre una nueva y se cierran las demás
+            ventanas = list(driver.window_handles)
+            driver.switch_to.new_window('tab')
+            nueva = driver.current_window_handle
+            for handle in ventanas:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(nueva)
+            navegador.origenes.clear()
+            return True
+        except Exception as e:
+            logger.warning(f"No se pudo limpiar un navegador, se recicla: {e!r}")
+            return False
+
+    @staticmethod
+    def _cerrar_navegador(navegador: _Navegador):
+        try:
+            navegador.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error cerrando un navegador: {e!r}")
+
+    def metricas(self) -> Dict:
+        """
+        Returns:
+            Dict: tamano, libres, ocupados, prestamos, paginas, arranques,
+            reciclados, fallos, arranque_medio_s y espera_media_ms
+        """
+        with self._condicion:
+            m = dict(self._metricas)
+            libres = len(self._libres)
+            vivos = self._vivos
+        return {
+            'tamano': self.tamano,
+            'libres': libres,
+            'ocupados': vivos - libres,
+            'prestamos': m['prestamos'],
+            'paginas': m['paginas'],
+            'arranques': m['arranques'],
+            'reciclados': m['reciclados'],
+            'fallos_arranque': m['fallos_arranque'],
+            'fallos_limpieza': m['fallos_limpieza'],
+            'arranque_medio_s': round(m['tiempo_arranque'] / m['arranques'], 3) if m['arranques'] else 0.0,
+            'espera_media_ms': round(1000 * m['tiempo_espera'] / m['prestamos'], 1) if m['prestamos'] else 0.0,
+        }
+
+    def cerrar(self):
+        """Cerrar los navegadores libres; los prestados se cierran al liberarse"""
+        with self._condicion:
+            self._cerrado = True
+            libres = list(self._libres)
+            self._libres.clear()
+            self._vivos -= len(libres)
+            self._condicion.notify_all()
+        self._reponedor.shutdown(wait=True)
+        # Los que terminaron de arrancar durante el shutdown ya se cerraron
+        for navegador in libres:
+            self._cerrar_navegador(navegador)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_tareas: int = 20, paginas_por_tarea: int = 3, arranque: float = 0.5,
+              latencia: float = 0.02, tamano: int = 2) -> Dict[str, float]:
+    """
+    Un navegador nuevo por tarea (inicializar_driver/cerrar_driver) frente
+    al pool, con un driver falso que tarda `arranque` segundos en arrancar
+
+    Returns:
+        Dict[str, float]: Segundos totales de cada estrategia
+    """
+    def fabrica():
+        return NavegadorFalso(arranque=arranque, latencia=latencia)
+
+    def tarea(driver, i):
+        for pagina in range(paginas_por_tarea):
+            driver.get(f'https://ejemplo.com/{i}/{pagina}')
+
+    resultados = {}
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=tamano) as hilos:
+        def sin_pool(i):
+            driver = fabrica()
+            try:
+                tarea(driver, i)
+            finally:
+                driver.quit()
+        list(hilos.map(sin_pool, range(num_tareas)))
+    resultados['sin_pool'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with PoolNavegadores(tamano=tamano, fabrica=fabrica, max_paginas=30) as pool:
+        with ThreadPoolExecutor(max_workers=tamano) as hilos:
+            def con_pool(i):
+                with pool.usar() as driver:
+                    tarea(driver, i)
+            list(hilos.map(con_pool, range(num_tareas)))
+        metricas = pool.metricas()
+    resultados['pool'] = time.perf_counter() - inicio
+
+    print(f"{num_tareas} tareas de {paginas_por_tarea} páginas, {tamano} en paralelo, "
+          f"arranque de {arranque} s:")
+    print(f"  Navegador por tarea: {resultados['sin_pool']:6.2f} s ({num_tareas} arranques)")
+    print(f"  Pool de {tamano}:         {resultados['pool']:6.2f} s "
+          f"({metricas['arranques']} arranques, {metricas['reciclados']} reciclados)")
+    print(f"  Métricas: {metricas}")
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
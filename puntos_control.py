@@ -0,0 +1,145 @@
+"""
+PUNTOS DE CONTROL PARA CRAWLS REANUDABLES
+Guarda cada cierto tiempo (o cada N páginas) todo lo necesario para
+continuar un crawl interrumpido sin repetir el trabajo hecho:
+- La frontera (URLs pendientes) y el conjunto de URLs vistas
+- El offset de cada archivo de salida (sumideros reanudables)
+- El estado del limitador de tasa (tokens y pausas por host)
+
+Todo vive en el SQLite de la frontera y se escribe en una única
+transacción incremental: solo las URLs nuevas, las completadas y los
+valores que cambiaron desde el punto anterior.
+
+Uso:
+    control = PuntoControl('crawl_tienda', reanudar=True)
+    sumidero = control.registrar_sumidero('productos', SumideroJSONL('p.jsonl', reanudable=True))
+    for resultado in rastrear(semillas, punto_control=control):
+        sumidero.escribir(...)
+    control.cerrar()
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from exportadores import Sumidero
+from frontera import Frontera
+from limitador import LimitadorTasa
+
+logger = logging.getLogger(__name__)
+
+ARCHIVO_FRONTERA = 'frontera.db'
+
+
+class PuntoControl:
+    """Estado de un crawl guardado periódicamente en un directorio"""
+
+    def __init__(self, directorio: str = 'punto_control', intervalo: float = 60.0,
+                 cada_paginas: Optional[int] = None, reanudar: bool = False,
+                 **opciones_frontera):
+        """
+        Args:
+            directorio (str): Directorio donde se guarda el estado
+            intervalo (float): Segundos entre puntos de control (None = solo por páginas)
+            cada_paginas (int): Guardar también cada N páginas completadas
+            reanudar (bool): Continuar el crawl guardado en el directorio;
+                con False se empieza de cero y se borra el estado anterior
+            **opciones_frontera: max_en_memoria, max_profundidad... (ver Frontera)
+        """
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self.cada_paginas = cada_paginas
+        self.reanudar = reanudar
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, ARCHIVO_FRONTERA)
+        if not reanudar:
+            for sufijo in ('', '-wal', '-shm'):
+                if os.path.exists(ruta + sufijo):
+                    os.remove(ruta + sufijo)
+        self.frontera = Frontera(ruta, confirmar_completadas=True, **opciones_frontera)
+        self.sumideros: Dict[str, Sumidero] = {}
+        self.limitador: Optional[LimitadorTasa] = None
+        self.paginas = 0
+        self._paginas_guardadas = 0
+        self._ultimo_guardado = time.monotonic()
+        # Último valor escrito de cada clave: solo se reescribe lo que cambia
+        self._guardado: Dict[str, str] = {}
+        if reanudar:
+            self.paginas = self._paginas_guardadas = int(self.frontera.leer_meta('paginas') or 0)
+            logger.info(f"Reanudando crawl: {self.paginas} páginas completadas, "
+                        f"{len(self.frontera)} pendientes")
+
+    def _leer(self, clave: str):
+        valor = self.frontera.leer_meta(clave) if self.reanudar else None
+        if valor is not None:
+            self._guardado[clave] = valor
+        return json.loads(valor) if valor is not None else None
+
+    def registrar_sumidero(self, nombre: str, sumidero: Sumidero) -> Sumidero:
+        """
+        Incluir un archivo de salida en los puntos de control
+
+        El sumidero debe crearse con reanudable=True. Al reanudar se trunca
+        su temporal al offset guardado y se continúa desde ahí.
+        """
+        estado = self._leer(f'sumidero:{nombre}')
+        if estado is not None:
+            sumidero.reanudar(estado)
+        self.sumideros[nombre] = sumidero
+        return sumidero
+
+    def registrar_limitador(self, limitador: LimitadorTasa) -> LimitadorTasa:
+        """Incluir el limitador de tasa (tokens y pausas por host)"""
+        estado = self._leer('limitador')
+        if estado is not None:
+            limitador.restaurar(estado)
+        self.limitador = limitador
+        return limitador
+
+    def completada(self, url: str):
+        """Marcar una URL como terminada (su salida ya está en los sumideros)"""
+        self.frontera.completar(url)
+        self.paginas += 1
+        if self.toca_guardar():
+            self.guardar()
+
+    def toca_guardar(self) -> bool:
+        if self.cada_paginas and self.paginas - self._paginas_guardadas >= self.cada_paginas:
+            return True
+        return (self.intervalo is not None
+                and time.monotonic() - self._ultimo_guardado >= self.intervalo)
+
+    def guardar(self):
+        """Escribir un punto de control (incremental, en una transacción)"""
+        inicio = time.perf_counter()
+        valores = {'paginas': str(self.paginas)}
+        # Primero los sumideros al disco: el offset guardado nunca apunta
+        # más allá de lo que de verdad está escrito
+        for nombre, sumidero in self.sumideros.items():
+            valores[f'sumidero:{nombre}'] = json.dumps(sumidero.punto_control())
+        if self.limitador is not None:
+            valores['limitador'] = json.dumps(self.limitador.estado())
+        cambiados = {clave: valor for clave, valor in valores.items()
+                     if self._guardado.get(clave) != valor}
+        self.frontera.guardar_punto_control(cambiados)
+        self._guardado.update(cambiados)
+        self._paginas_guardadas = self.paginas
+        self._ultimo_guardado = time.monotonic()
+        logger.debug(f"Punto de control: {self.paginas} páginas, {len(self.frontera)} "
+                     f"pendientes ({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+
+    def cerrar(self, terminado: bool = True):
+        """
+        Guardar el último punto de control y cerrar la frontera
+
+        Args:
+            terminado (bool): Cerrar también los sumideros (archivos finales);
+                con False quedan a medias para reanudar en otra ejecución
+        """
+        self.guardar()
+        if terminado:
+            for sumidero in self.sumideros.values():
+                sumidero.cerrar()
+        self.frontera.cerrar()
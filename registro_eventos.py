@@ -0,0 +1,239 @@
+"""
+REGISTRO DE EVENTOS EN SEGUNDO PLANO
+Escritor de logs JSON Lines pensado para crawls con muchos hilos:
+- registrar() serializa el evento en el momento (los cambios posteriores
+  en detalles no llegan al log) y lo añade a una cola acotada (sin syscalls)
+- Un hilo escritor escribe las líneas por lotes; un error de escritura
+  se registra y descarta ese lote, no detiene el hilo
+- Se vacía al disco por tamaño de lote o por tiempo, lo que llegue antes
+- Rota el archivo al superar un tamaño y comprime las copias con gzip
+- cerrar() (o la salida del programa) vacía la cola antes de terminar
+- Modo depuración: escribe y hace flush en cada evento, como antes
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class EscritorEventos:
+    """Archivo JSON Lines alimentado desde una cola por un hilo escritor"""
+
+    def __init__(self, archivo: str, tamano_lote: int = 500,
+                 intervalo_vaciado: Optional[float] = 1.0,
+                 max_bytes: Optional[int] = 10 * 1024 * 1024, copias: int = 5,
+                 tamano_cola: int = 10_000, bloquear_si_llena: bool = True,
+                 depuracion: bool = False, eco: Optional[logging.Logger] = None):
+        """
+        Args:
+            archivo (str): Ruta del log (JSON Lines)
+            tamano_lote (int): Eventos por escritura como máximo
+            intervalo_vaciado (float): Segundos máximos que un evento espera en
+                memoria antes de llegar al disco (None = solo por tamaño)
+            max_bytes (int): Tamaño a partir del cual se rota (None = nunca)
+            copias (int): Copias rotadas (.1.gz, .2.gz, ...) que se conservan
+            tamano_cola (int): Eventos pendientes como máximo
+            bloquear_si_llena (bool): Si la cola está llena, esperar (True) o
+                descartar el evento y contarlo en self.descartados (False)
+            depuracion (bool): Escribir y hacer flush en cada evento, sin hilo
+            eco (Logger): Repetir cada evento en este logger de logging
+        """
+        self.archivo = archivo
+        self.tamano_lote = max(1, tamano_lote)
+        self.intervalo_vaciado = intervalo_vaciado
+        self.max_bytes = max_bytes
+        self.copias = copias
+        self.bloquear_si_llena = bloquear_si_llena
+        self.depuracion = depuracion
+        self.eco = eco
+        self.descartados = 0
+        self.escritos = 0
+        self.errores = 0
+        self.cerrado = False
+
+        self._archivo = open(archivo, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        # deque.append es atómico y mucho más barato que queue.Queue.put:
+        # los hilos del crawl solo tocan un lock cuando la cola está llena
+        self._pendientes: Deque[tuple] = deque()
+        self._tamano_cola = tamano_cola
+        self._hay_lote = threading.Event()
+        self._hay_espacio = threading.Condition()
+        self._terminar = False
+        self._hilo = None
+        if not depuracion:
+            self._hilo = threading.Thread(target=self._bucle, name='escritor-eventos',
+                                          daemon=True)
+            self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def registrar(self, evento: str, detalles):
+        """
+        Encolar un evento (o escribirlo ya en modo depuración)
+
+        La línea se serializa aquí, en el hilo que llama: si detalles no es
+        serializable (p. ej. una referencia circular) el error sale aquí.
+        Si el hilo escritor ya no está vivo el evento se descarta.
+        """
+        if self.cerrado:
+            raise ValueError(f"El registro {self.archivo} está cerrado")
+        entrada = self._serializar(evento, detalles)
+        if self.depuracion:
+            with self._lock:
+                self._escribir([entrada])
+            return
+        if len(self._pendientes) >= self._tamano_cola:
+            if not self.bloquear_si_llena:
+                self.descartados += 1
+                return
+            with self._hay_espacio:
+                while len(self._pendientes) >= self._tamano_cola:
+                    if not self._hilo.is_alive():
+                        self.descartados += 1
+                        return
+                    self._hay_lote.set()
+                    self._hay_espacio.wait(0.1)
+        elif not self._hilo.is_alive():
+            self.descartados += 1
+            return
+        self._pendientes.append(entrada)
+        if len(self._pendientes) >= self.tamano_lote and not self._hay_lote.is_set():
+            self._hay_lote.set()
+
+    def _serializar(self, evento: str, detalles) -> tuple:
+        """(línea JSON, texto para el eco) con el estado actual de detalles"""
+        linea = json.dumps({
+            'timestamp': datetime.now().isoformat(),
+            'evento': evento,
+            'detalles': detalles
+        }, ensure_ascii=False, default=str)
+        eco = f"[{evento}] {detalles}" if self.eco is not None else None
+        return linea, eco
+
+    # ----- Hilo escritor -----
+
+    def _bucle(self):
+        while True:
+            # Despertar al completar un lote o al cumplirse el intervalo
+            self._hay_lote.wait(self.intervalo_vaciado)
+            self._hay_lote.clear()
+            terminar = self._terminar
+            while self._pendientes:
+                lote = []
+                while self._pendientes and len(lote) < self.tamano_lote:
+                    lote.append(self._pendientes.popleft())
+                try:
+                    with self._lock:
+                        self._escribir(lote)
+                except Exception:
+                    # Disco lleno, permisos... se pierde el lote, no el hilo
+                    self.errores += 1
+                    self.descartados += len(lote)
+                    logger.exception(f"No se pudieron escribir {len(lote)} eventos en {self.archivo}")
+                with self._hay_espacio:
+                    self._hay_espacio.notify_all()
+            if terminar:
+                break
+
+    def _escribir(self, lote: List[tuple]):
+        """Escribir un lote de líneas ya serializadas de una vez y rotar si hace falta"""
+        if self.eco is not None:
+            for _, eco in lote:
+                self.eco.info(eco)
+        self._archivo.write('\n'.join(linea for linea, _ in lote) + '\n')
+        self._archivo.flush()
+        self.escritos += len(lote)
+        if self.max_bytes is not None and self._archivo.tell() >= self.max_bytes:
+            self._rotar()
+
+    def _rotar(self):
+        """archivo -> archivo.1.gz, archivo.1.gz -> archivo.2.gz, ..."""
+        self._archivo.close()
+        if self.copias > 0:
+            for i in range(self.copias - 1, 0, -1):
+                origen = f"{self.archivo}.{i}.gz"
+                if os.path.exists(origen):
+                    os.replace(origen, f"{self.archivo}.{i + 1}.gz")
+            with open(self.archivo, 'rb') as entrada, \
+                    gzip.open(f"{self.archivo}.1.gz", 'wb') as salida:
+                shutil.copyfileobj(entrada, salida)
+        self._archivo = open(self.archivo, 'w', encoding='utf-8')
+
+    # ----- Cierre -----
+
+    def cerrar(self):
+        """Vaciar la cola pendiente y cerrar el archivo"""
+        if self.cerrado:
+            return
+        self.cerrado = True
+        atexit.unregister(self.cerrar)
+        if self._hilo is not None:
+            self._terminar = True
+            self._hay_lote.set()
+            self._hilo.join()
+        self._archivo.close()
+        if self.descartados:
+            logger.warning(f"{self.descartados} eventos descartados "
+                           f"(cola llena o {self.errores} errores de escritura)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_eventos: int = 200_000, num_hilos: int = 8) -> dict:
+    """
+    Eventos por segundo registrados desde varios hilos: flush por evento
+    (modo depuración) frente al escritor por lotes. Se mide lo que ven los
+    hilos del crawl (registrar) y el total hasta que todo está en disco
+
+    Returns:
+        dict: {modo: (eventos/s en registrar, eventos/s hasta el disco)}
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    por_hilo = num_eventos // num_hilos
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, depuracion in (('flush por evento', True), ('por lotes', False)):
+            # Cola del tamaño de la prueba: registrar no espera al escritor y
+            # se ve el coste real en los hilos del crawl
+            escritor = EscritorEventos(os.path.join(directorio, f'{depuracion}.log'),
+                                       depuracion=depuracion, max_bytes=None,
+                                       tamano_cola=num_eventos)
+
+            def trabajo(hilo):
+                for i in range(por_hilo):
+                    escritor.registrar('descarga', {'hilo': hilo, 'pagina': i})
+
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(num_hilos) as pool:
+                list(pool.map(trabajo, range(num_hilos)))
+            t_registrar = time.perf_counter() - inicio
+            escritor.cerrar()  # Vacía la cola pendiente
+            t_total = time.perf_counter() - inicio
+            total = por_hilo * num_hilos
+            resultados[nombre] = (total / t_registrar, total / t_total)
+            print(f"  {nombre:<17} registrar: {total / t_registrar:10,.0f} eventos/s"
+                  f"   hasta disco: {total / t_total:10,.0f} eventos/s")
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,301 @@
+"""
+POLÍTICA DE RENDERIZADO: PRIMERO HTTP, NAVEGADOR SOLO SI HACE FALTA
+La mayoría de páginas "dinámicas" traen los datos en el propio HTML,
+dentro de JSON embebido (__NEXT_DATA__ de Next.js, application/ld+json,
+application/json). Renderizarlas con Selenium cuesta segundos y descarga
+imágenes, fuentes y scripts de terceros que no sirven para nada.
+
+- Paso 1: GET normal (transporte compartido, caché opcional) y
+  extracción del JSON embebido
+- Paso 2: si faltan los selectores requeridos (y el JSON no basta),
+  se escala al navegador, prestado de un PoolNavegadores
+- En el navegador se bloquean tipos de recurso (imágenes, fuentes...)
+  y patrones de URL (analítica, anuncios) con Network.setBlockedURLs
+
+Uso:
+    politica = PoliticaRenderizado(selectores_requeridos=['div.producto'])
+    pagina = politica.obtener('https://tienda.com/listado')
+    pagina['modo']    # 'estatico' o 'navegador'
+    pagina['soup'], pagina['json']
+"""
+
+import json
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from cache_http import CacheHTTP, obtener_con_cache
+from parser_html import crear_soup
+from pool_navegadores import PoolNavegadores
+from transporte import sesion_compartida
+
+logger = logging.getLogger(__name__)
+
+# Extensiones por tipo de recurso. Network.setBlockedURLs solo entiende
+# URLs con comodines; bloquear por tipo exige Fetch.enable y contestar
+# cada evento Fetch.requestPaused, que execute_cdp_cmd no puede recibir
+EXTENSIONES_POR_TIPO = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'avif'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'mp3', 'm3u8', 'ogg'],
+    'stylesheet': ['css'],
+}
+# Cada extensión al final de la URL y seguida de query string (a.png?v=3)
+PATRONES_POR_TIPO = {
+    tipo: [patron for ext in extensiones for patron in (f'*.{ext}', f'*.{ext}?*')]
+    for tipo, extensiones in EXTENSIONES_POR_TIPO.items()
+}
+TIPOS_BLOQUEADOS = ('image', 'font', 'media', 'stylesheet')
+PATRONES_TERCEROS = (
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*googlesyndication.com*',
+)
+
+
+def extraer_json_embebido(soup) -> Dict:
+    """
+    Datos JSON que la página trae en etiquetas <script>
+
+    Returns:
+        Dict: {'next_data': dict o None, 'ld_json': [objetos],
+               'json': {id del script: dict}}
+    """
+    datos = {'next_data': None, 'ld_json': [], 'json': {}}
+    for script in soup.find_all('script'):
+        tipo = (script.get('type') or '').lower()
+        id_ = script.get('id')
+        if id_ != '__NEXT_DATA__' and tipo not in ('application/ld+json', 'application/json'):
+            continue
+        texto = script.string or script.get_text()
+        try:
+            contenido = json.loads(texto)
+        except (TypeError, ValueError):
+            logger.debug(f"JSON embebido no válido en <script id={id_!r} type={tipo!r}>")
+            continue
+        if id_ == '__NEXT_DATA__':
+            datos['next_data'] = contenido
+        elif tipo == 'application/ld+json':
+            # Un script puede traer un objeto, una lista o un @graph
+            objetos = contenido if isinstance(contenido, list) else [contenido]
+            for objeto in objetos:
+                if isinstance(objeto, dict) and '@graph' in objeto:
+                    datos['ld_json'].extend(objeto['@graph'])
+                else:
+                    datos['ld_json'].append(objeto)
+        elif id_:
+            datos['json'][id_] = contenido
+    return datos
+
+
+def patrones_bloqueo(tipos: Iterable[str] = TIPOS_BLOQUEADOS,
+                     patrones: Iterable[str] = PATRONES_TERCEROS) -> List[str]:
+    """Lista de patrones de URL a bloquear para unos tipos de recurso"""
+    resultado = []
+    for tipo in tipos:
+        if tipo not in PATRONES_POR_TIPO:
+            raise ValueError(f"Tipo de recurso desconocido: {tipo} "
+                             f"(válidos: {', '.join(PATRONES_POR_TIPO)})")
+        resultado.extend(PATRONES_POR_TIPO[tipo])
+    resultado.extend(patrones)
+    return resultado
+
+
+def aplicar_bloqueo(driver, patrones: List[str]) -> bool:
+    """
+    Bloquear URLs en un navegador Chromium vía DevTools
+
+    Returns:
+        bool: False si el driver no admite comandos CDP (p. ej. Firefox)
+    """
+    ejecutar = getattr(driver, 'execute_cdp_cmd', None)
+    if ejecutar is None:
+        logger.debug("El driver no admite CDP: no se bloquean recursos")
+        return False
+    ejecutar('Network.enable', {})
+    ejecutar('Network.setBlockedURLs', {'urls': patrones})
+    return True
+
+
+class PoliticaRenderizado:
+    """Decide, página a página, si basta con HTTP o hace falta el navegador"""
+
+    def __init__(self, selectores_requeridos: Iterable[str] = (),
+                 requisito_json: Optional[Callable[[Dict], bool]] = None,
+                 bloquear_tipos: Iterable[str] = TIPOS_BLOQUEADOS,
+                 bloquear_patrones: Iterable[str] = PATRONES_TERCEROS,
+                 pool: Optional[PoolNavegadores] = None, cliente=None,
+                 cache: Optional[CacheHTTP] = None, timeout: float = 10,
+                 solo_navegador: bool = False):
+        """
+        Args:
+            selectores_requeridos: Selectores CSS que deben existir para dar
+                la página por buena sin navegador (y que se esperan en él)
+            requisito_json (Callable): Recibe el JSON embebido y devuelve True
+                si los datos ya están ahí (alternativa a los selectores)
+            bloquear_tipos: Tipos de recurso a bloquear en el navegador
+                ('image', 'font', 'media', 'stylesheet')
+            bloquear_patrones: Patrones de URL a bloquear ('*ads.com*')
+            pool (PoolNavegadores): Pool de navegadores; si no se indica se
+                crea uno de tamaño 1 la primera vez que hace falta
+            cliente: Session HTTP (por defecto transporte.sesion_compartida())
+            cache (CacheHTTP): Caché HTTP para el paso estático
+            timeout (float): Segundos máximos por petición y por espera
+            solo_navegador (bool): Saltarse el paso estático (comparativas)
+        """
+        self.selectores_requeridos = list(selectores_requeridos)
+        self.requisito_json = requisito_json
+        self.patrones = patrones_bloqueo(bloquear_tipos, bloquear_patrones)
+        self.pool = pool
+        self._pool_propio = False
+        self.cliente = cliente
+        self.cache = cache
+        self.timeout = timeout
+        self.solo_navegador = solo_navegador
+        self.estadisticas = {'estatico': 0, 'navegador': 0, 'errores_estatico': 0}
+
+    def _suficiente(self, soup, datos_json: Dict) -> bool:
+        """¿Tiene la página lo que se pide sin ejecutar JavaScript?"""
+        if self.requisito_json is not None:
+            try:
+                if self.requisito_json(datos_json):
+                    return True
+            except (KeyError, IndexError, TypeError):
+                pass
+        if not self.selectores_requeridos:
+            return self.requisito_json is None
+        return all(soup.select_one(selector) is not None
+                   for selector in self.selectores_requeridos)
+
+    def _estatico(self, url: str) -> Optional[Dict]:
+        respuesta = obtener_con_cache(self.cliente or sesion_compartida(), url,
+                                      self.cache, timeout=self.timeout)
+        respuesta.raise_for_status()
+        soup = crear_soup(respuesta.content)
+        datos_json = extraer_json_embebido(soup)
+        if not self._suficiente(soup, datos_json):
+            return None
+        return {'url': url, 'modo': 'estatico', 'soup': soup, 'json': datos_json}
+
+    def _esperar_selectores(self, driver):
+        """Esperar a que existan los selectores requeridos (sin importar selenium)"""
+        limite = time.monotonic() + self.timeout
+        pendientes = list(self.selectores_requeridos)
+        while pendientes:
+            # 'css selector' es el valor de By.CSS_SELECTOR
+            pendientes = [s for s in pendientes if not driver.find_elements('css selector', s)]
+            if not pendientes:
+                break
+            if time.monotonic() >= limite:
+                logger.warning(f"Timeout esperando {pendientes} en {driver.current_url}")
+                break
+            time.sleep(0.1)
+
+    def _navegador(self, url: str) -> Dict:
+        if self.pool is None:
+            self.pool = PoolNavegadores(tamano=1, precalentar=False)
+            self._pool_propio = True
+        with self.pool.usar(timeout=self.timeout * 3) as driver:
+            aplicar_bloqueo(driver, self.patrones)
+            driver.get(url)
+            self._esperar_selectores(driver)
+            html = driver.page_source
+        soup = crear_soup(html)
+        return {'url': url, 'modo': 'navegador', 'soup': soup,
+                'json': extraer_json_embebido(soup)}
+
+    def obtener(self, url: str) -> Dict:
+        """
+        Obtener una página por la vía más barata que sirva
+
+        Returns:
+            Dict: {'url', 'modo': 'estatico' | 'navegador', 'soup', 'json'}
+        """
+        if not self.solo_navegador:
+            try:
+                pagina = self._estatico(url)
+            except Exception as e:
+                # Bloqueos anti-bot (403), cuerpos raros...: lo intenta el navegador
+                logger.info(f"Paso estático fallido en {url}: {e!r}")
+                self.estadisticas['errores_estatico'] += 1
+                pagina = None
+            if pagina is not None:
+                self.estadisticas['estatico'] += 1
+                return pagina
+            logger.debug(f"Faltan datos en el HTML de {url}: se usa el navegador")
+        self.estadisticas['navegador'] += 1
+        return self._navegador(url)
+
+    def cerrar(self):
+        """Cerrar el pool si lo creó la política"""
+        if self._pool_propio and self.pool is not None:
+            self.pool.cerrar()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_paginas: int = 40, proporcion_js: float = 0.2,
+              arranque: float = 0.5, render: float = 0.3) -> Dict[str, float]:
+    """
+    Navegador para todo frente a la política estática primero, con un
+    servidor local y un navegador falso que tarda `render` s por página
+
+    Un 1 - proporcion_js de las páginas trae los datos en el HTML o en
+    __NEXT_DATA__; el resto solo los tiene tras ejecutar JavaScript.
+
+    Returns:
+        Dict[str, float]: Segundos de cada estrategia
+    """
+    from pool_navegadores import NavegadorFalso
+    from servidor_pruebas import iniciar_servidor_prueba
+
+    cada_js = max(1, round(1 / proporcion_js)) if proporcion_js else 0
+
+    def necesita_js(ruta: str) -> bool:
+        numero = int(ruta.rsplit('/', 1)[-1])
+        return bool(cada_js) and numero % cada_js == 0
+
+    def servir(ruta: str) -> str:
+        if necesita_js(ruta):
+            return '<html><body><div id="app"></div><script src="/app.js"></script></body></html>'
+        datos = json.dumps({'props': {'pageProps': {'producto': {'nombre': ruta}}}})
+        return (f'<html><body><div class="producto">{ruta}</div>'
+                f'<script id="__NEXT_DATA__" type="application/json">{datos}</script>'
+                f'</body></html>')
+
+    def renderizar(url: str) -> str:
+        # El navegador "ejecuta" el JavaScript: el producto siempre aparece
+        return f'<html><body><div class="producto">{url}</div></body></html>'
+
+    servidor, url_base = iniciar_servidor_prueba(html=servir)
+    urls = [f"{url_base}/producto/{i}" for i in range(num_paginas)]
+    resultados = {}
+    try:
+        for nombre, solo_navegador in (('siempre navegador', True), ('estático primero', False)):
+            pool = PoolNavegadores(
+                tamano=1, precalentar=False,
+                fabrica=lambda: NavegadorFalso(arranque=arranque, latencia=render,
+                                               html=renderizar))
+            politica = PoliticaRenderizado(['div.producto'], pool=pool,
+                                           solo_navegador=solo_navegador)
+            inicio = time.perf_counter()
+            for url in urls:
+                politica.obtener(url)
+            resultados[nombre] = time.perf_counter() - inicio
+            pool.cerrar()
+            print(f"  {nombre:<18}: {resultados[nombre]:6.2f} s  {politica.estadisticas}")
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,57 @@
+"""
+Pruebas de los sumideros de exportadores
+
+    python -m unittest test_exportadores
+"""
+
+import os
+import tempfile
+import unittest
+
+from exportadores import SumideroParquet
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+@unittest.skipIf(pq is None, 'pyarrow no está instalado')
+class PruebasParquet(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.archivo = os.path.join(directorio.name, 'datos.parquet')
+
+    def escribir(self, registros, tamano_lote=2):
+        with SumideroParquet(self.archivo, tamano_lote=tamano_lote) as sumidero:
+            sumidero.escribir_todos(registros)
+        return pq.read_table(self.archivo)
+
+    def test_entero_luego_decimal_luego_nulo(self):
+        tabla = self.escribir([
+            {'precio': 10, 'rating': None}, {'precio': 20, 'rating': None},
+            {'precio': 10.5, 'rating': 4}, {'precio': 7, 'rating': 4.5},
+            {'precio': None, 'rating': None},
+        ])
+        self.assertEqual(tabla.column('precio').to_pylist(), [10.0, 20.0, 10.5, 7.0, None])
+        # Nula en el primer lote: se guarda como texto y los números se convierten
+        self.assertEqual(tabla.column('rating').to_pylist(), [None, None, '4', '4.5', None])
+        self.assertEqual(tabla.num_rows, 5)
+
+    def test_valor_incompatible_queda_nulo_sin_abortar(self):
+        with self.assertLogs('exportadores', level='WARNING'):
+            tabla = self.escribir([
+                {'precio': 1.5}, {'precio': 2.5},
+                {'precio': 'agotado'}, {'precio': 3},
+            ])
+        self.assertEqual(tabla.column('precio').to_pylist(), [1.5, 2.5, None, 3.0])
+
+    def test_tipos_mezclados_en_el_primer_lote(self):
+        tabla = self.escribir([{'stock': 5}, {'stock': 'muchos'}, {'stock': 2}])
+        self.assertEqual(tabla.column('stock').to_pylist(), ['5', 'muchos', '2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
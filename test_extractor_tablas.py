@@ -0,0 +1,84 @@
+"""
+Pruebas de extractor_tablas (con lxml si está instalado y con html.parser)
+
+    python -m unittest test_extractor_tablas
+"""
+
+import unittest
+from unittest import mock
+
+import extractor_tablas
+from extractor_tablas import iterar_filas_tabla, iterar_tablas
+
+SOLO_ENCABEZADOS = (
+    "<table class=x><tr><th>A</th></tr></table>"
+    "<table class=x><tr><th>B</th></tr><tr><td>2</td></tr></table>"
+)
+
+ANIDADAS = (
+    "<table class=x><tr><th>Exterior</th></tr>"
+    "<tr><td>1<table class=x><tr><th>Interior</th></tr><tr><td>i</td></tr></table></td></tr>"
+    "<tr><td>2</td></tr></table>"
+)
+
+
+def fuente_con_resto(html, leidos):
+    """Entregar html y luego muchas tablas más, contando cuántas se leen"""
+    yield html
+    for _ in range(100):
+        leidos.append(1)
+        yield "<table><tr><td>x</td></tr></table>"
+
+
+class PruebasExtractor:
+    """Casos comunes; cada subclase fija el parser"""
+
+    def test_tabla_solo_con_encabezados_cuenta(self):
+        self.assertEqual(list(iterar_filas_tabla(SOLO_ENCABEZADOS, indice=0, clase='x')), [])
+        self.assertEqual(list(iterar_filas_tabla(SOLO_ENCABEZADOS, indice=1, clase='x')),
+                         [{'B': '2'}])
+
+    def test_tabla_sin_datos_deja_de_leer(self):
+        leidos = []
+        filas = list(iterar_filas_tabla(fuente_con_resto(SOLO_ENCABEZADOS, leidos),
+                                        indice=0, clase='x'))
+        self.assertEqual(filas, [])
+        self.assertEqual(leidos, [])
+
+    def test_anidadas_en_orden_de_documento(self):
+        exterior = list(iterar_filas_tabla(ANIDADAS, indice=0, clase='x'))
+        self.assertEqual([f['Exterior'] for f in exterior], ['1', '2'])
+        self.assertEqual(list(iterar_filas_tabla(ANIDADAS, indice=1, clase='x')),
+                         [{'Interior': 'i'}])
+
+    def test_pie_con_th_son_datos(self):
+        html = ("<table><thead><tr><th>A</th><th>B</th></tr></thead>"
+                "<tbody><tr><td>1</td><td>2</td></tr></tbody>"
+                "<tfoot><tr><th>Total</th><th>2</th></tr></tfoot></table>")
+        self.assertEqual(list(iterar_filas_tabla(html)),
+                         [{'A': '1', 'B': '2'}, {'A': 'Total', 'B': '2'}])
+
+    def test_iterar_tablas_solo_entrega_filas(self):
+        filas = list(iterar_tablas(SOLO_ENCABEZADOS))
+        self.assertEqual(filas, [(1, ['x'], {'B': '2'})])
+
+
+class PruebasLxml(PruebasExtractor, unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            self.skipTest('lxml no está instalado')
+
+
+class PruebasStdlib(PruebasExtractor, unittest.TestCase):
+
+    def setUp(self):
+        parche = mock.patch.object(extractor_tablas, 'crear_parser', extractor_tablas._ParserStdlib)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+
+if __name__ == '__main__':
+    unittest.main()
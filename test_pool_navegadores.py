@@ -0,0 +1,160 @@
+"""
+Pruebas de PoolNavegadores con NavegadorFalso (sin navegador real)
+
+    python -m unittest test_pool_navegadores
+"""
+
+import unittest
+
+from pool_navegadores import NavegadorFalso, PoolNavegadores
+
+
+def crear_pool(**opciones) -> PoolNavegadores:
+    opciones.setdefault('tamano', 1)
+    opciones.setdefault('fabrica', NavegadorFalso)
+    opciones.setdefault('precalentar', False)
+    return PoolNavegadores(**opciones)
+
+
+class PruebasPrestamo(unittest.TestCase):
+
+    def test_reutiliza_el_navegador_caliente(self):
+        with crear_pool(tamano=2) as pool:
+            for _ in range(5):
+                with pool.usar(timeout=1) as driver:
+                    driver.get('https://a.com/')
+            metricas = pool.metricas()
+        self.assertEqual(metricas['prestamos'], 5)
+        self.assertEqual(metricas['paginas'], 5)
+        self.assertEqual(metricas['arranques'], 1)
+
+    def test_recicla_tras_max_paginas(self):
+        with crear_pool(max_paginas=3) as pool:
+            for _ in range(2):
+                with pool.usar(timeout=1) as driver:
+                    for pagina in range(3):
+                        driver.get(f'https://a.com/{pagina}')
+            metricas = pool.metricas()
+        self.assertEqual(metricas['reciclados'], 2)
+        self.assertEqual(metricas['arranques'], 2)
+
+    def test_excepcion_descarta_el_navegador(self):
+        with crear_pool() as pool:
+            with self.assertRaises(ValueError):
+                with pool.usar(timeout=1) as driver:
+                    raise ValueError('fallo en la tarea')
+            self.assertTrue(driver._navegador.driver.cerrado)
+            with pool.usar(timeout=1):
+                pass
+            self.assertEqual(pool.metricas()['reciclados'], 1)
+
+    def test_keyboard_interrupt_no_pierde_el_hueco(self):
+        with crear_pool() as pool:
+            with self.assertRaises(KeyboardInterrupt):
+                with pool.usar(timeout=1):
+                    raise KeyboardInterrupt
+            # Con el único hueco perdido esto agotaría el timeout
+            with pool.usar(timeout=1):
+                pass
+
+    def test_generador_abandonado_no_pierde_el_hueco(self):
+        with crear_pool() as pool:
+            def paginas():
+                with pool.usar(timeout=1) as driver:
+                    for i in range(10):
+                        driver.get(f'https://a.com/{i}')
+                        yield driver.page_source
+
+            generador = paginas()
+            next(generador)
+            generador.close()  # GeneratorExit dentro del with
+            with pool.usar(timeout=1):
+                pass
+
+    def test_timeout_si_todos_ocupados(self):
+        with crear_pool() as pool:
+            with pool.usar(timeout=1):
+                with self.assertRaises(TimeoutError):
+                    pool.adquirir(timeout=0.05)
+
+
+class PruebasLimpieza(unittest.TestCase):
+
+    def test_borra_cookies_de_todos_los_dominios(self):
+        with crear_pool() as pool:
+            with pool.usar(timeout=1) as driver:
+                driver.get('https://a.com/')
+                driver.add_cookie({'name': 'sesion', 'value': '1'})
+                driver.get('https://b.com/')
+                driver.add_cookie({'name': 'sesion', 'value': '2'})
+            with pool.usar(timeout=1) as driver:
+                self.assertEqual(driver.cookies, [])
+
+    def test_borra_almacenamiento_de_cada_origen_visitado(self):
+        with crear_pool() as pool:
+            with pool.usar(timeout=1) as driver:
+                for sitio in ('https://a.com', 'https://b.com'):
+                    driver.get(sitio + '/')
+                    driver.almacenamiento[sitio] = {'token': sitio}
+                    driver.almacenamiento_sesion[(driver.current_window_handle, sitio)] = {'x': '1'}
+            with pool.usar(timeout=1) as driver:
+                self.assertEqual(driver.almacenamiento, {})
+                self.assertEqual(driver.almacenamiento_sesion, {})
+                self.assertEqual(driver.current_url, 'about:blank')
+
+    def test_quita_los_bloqueos_de_urls(self):
+        with crear_pool() as pool:
+            with pool.usar(timeout=1) as driver:
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': ['*.png', '*.png?*']})
+            with pool.usar(timeout=1) as driver:
+                self.assertEqual(driver.urls_bloqueadas, [])
+
+    def test_redireccion_a_otro_origen(self):
+        fabrica = lambda: NavegadorFalso(redirecciones={'https://a.com/': 'https://b.com/login'})
+        with crear_pool(fabrica=fabrica) as pool:
+            with pool.usar(timeout=1) as driver:
+                driver.get('https://a.com/')
+                driver.almacenamiento['https://b.com'] = {'token': 'b'}
+                driver.add_cookie({'name': 'sesion', 'value': 'b'})
+            with pool.usar(timeout=1) as driver:
+                self.assertEqual(driver.almacenamiento, {})
+                self.assertEqual(driver.cookies, [])
+
+    def test_origen_sin_get_no_pasa_al_siguiente_prestamo(self):
+        # Navegación por clic o window.location: el pool no la ve
+        with crear_pool() as pool:
+            with pool.usar(timeout=1) as driver:
+                driver.get('https://a.com/')
+                driver.current_url = 'https://c.com/'
+                driver.almacenamiento['https://c.com'] = {'token': 'c'}
+                driver.current_url = 'https://a.com/'
+            with pool.usar(timeout=1) as driver:
+                self.assertEqual(driver.almacenamiento, {})
+                # Los contextos de préstamos anteriores se tiran
+                self.assertEqual(len(driver.contextos), 2)
+
+    def test_sin_contextos_limpia_el_origen_tras_redireccion(self):
+        fabrica = lambda: NavegadorFalso(redirecciones={'https://a.com/': 'https://b.com/login'},
+                                         contextos=False)
+        with crear_pool(fabrica=fabrica) as pool:
+            with pool.usar(timeout=1) as driver:
+                driver.get('https://a.com/')
+                driver.almacenamiento['https://b.com'] = {'token': 'b'}
+                # b.com ya no es la página actual: solo se sabe de ella por get()
+                driver.current_url = 'about:blank'
+            with pool.usar(timeout=1) as driver:
+                self.assertIsNone(driver._navegador.contexto)
+                self.assertEqual(driver.almacenamiento, {})
+
+    def test_cierra_las_pestanas_extra(self):
+        with crear_pool() as pool:
+            with pool.usar(timeout=1) as driver:
+                driver.switch_to.new_window('tab')
+                driver.switch_to.new_window('tab')
+            with pool.usar(timeout=1) as driver:
+                self.assertEqual(len(driver.window_handles), 1)
+                self.assertEqual(driver.window_handles, [driver.current_window_handle])
+
+
+if __name__ == '__main__':
+    unittest.main()
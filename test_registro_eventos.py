@@ -0,0 +1,77 @@
+"""
+Pruebas de EscritorEventos
+
+    python -m unittest test_registro_eventos
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from registro_eventos import EscritorEventos
+
+
+class PruebasEscritor(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.archivo = os.path.join(directorio.name, 'eventos.log')
+
+    def leer(self):
+        with open(self.archivo, encoding='utf-8') as f:
+            return [json.loads(linea) for linea in f]
+
+    def test_guarda_los_detalles_del_momento(self):
+        with EscritorEventos(self.archivo) as escritor:
+            detalles = {'pagina': 1}
+            escritor.registrar('descarga', detalles)
+            detalles['pagina'] = 2
+            detalles['extra'] = True
+        self.assertEqual([e['detalles'] for e in self.leer()], [{'pagina': 1}])
+
+    def test_referencia_circular_falla_al_registrar(self):
+        with EscritorEventos(self.archivo) as escritor:
+            circular = {}
+            circular['yo'] = circular
+            with self.assertRaises(ValueError):
+                escritor.registrar('error', circular)
+            escritor.registrar('ok', {})
+        self.assertEqual([e['evento'] for e in self.leer()], ['ok'])
+
+    def test_error_de_escritura_no_detiene_el_hilo(self):
+        escritor = EscritorEventos(self.archivo, intervalo_vaciado=0.01)
+        escribir = escritor._escribir
+        fallo = threading.Event()
+
+        def escribir_con_fallo(lote):
+            if not fallo.is_set():
+                fallo.set()
+                raise OSError(28, 'No queda espacio en el dispositivo')
+            escribir(lote)
+
+        escritor._escribir = escribir_con_fallo
+        with self.assertLogs('registro_eventos', level='ERROR'):
+            escritor.registrar('perdido', {})
+            escritor._hay_lote.set()
+            self.assertTrue(fallo.wait(5))
+            escritor.registrar('escrito', {})
+            escritor.cerrar()  # Espera al hilo: el error ya está registrado
+        self.assertEqual(escritor.errores, 1)
+        self.assertEqual([e['evento'] for e in self.leer()], ['escrito'])
+
+    def test_cola_llena_sin_hilo_no_se_bloquea(self):
+        escritor = EscritorEventos(self.archivo, tamano_cola=1, intervalo_vaciado=None)
+        escritor._terminar = True
+        escritor._hay_lote.set()
+        escritor._hilo.join()
+        escritor.registrar('a', {})
+        escritor.registrar('b', {})  # Antes esperaba para siempre
+        self.assertEqual(escritor.descartados, 2)
+        escritor.cerrar()
+
+
+if __name__ == '__main__':
+    unittest.main()
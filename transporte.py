@@ -0,0 +1,376 @@
+"""
+CAPA DE TRANSPORTE HTTP COMPARTIDA
+Un único sitio donde se configuran las conexiones de todos los scrapers:
+- Sesiones requests con tamaño de pool explícito por host y nº de hosts
+- Keep-alive TCP (la conexión se sondea en lugar de caerse en silencio)
+- Reintentos opcionales con urllib3 Retry
+- Cliente HTTP/2 opcional (httpx): muchas peticiones multiplexadas por
+  una sola conexión TLS por host
+- Métricas: peticiones, conexiones abiertas y handshakes TLS, de donde
+  salen la tasa de reutilización y los handshakes por cada 1000 peticiones
+
+Uso:
+    sesion = sesion_compartida()          # la misma en todo el proceso
+    sesion.get(url, timeout=10)
+    print(METRICAS.resumen())
+"""
+
+import logging
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 es opcional
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+POOL_POR_HOST = 16       # Conexiones guardadas por host
+MAX_HOSTS = 32           # Hosts con pool propio antes de expulsar el más antiguo
+KEEPALIVE_SEGUNDOS = 60  # Inactividad antes de sondear (o cerrar) una conexión
+
+# Errores de estado HTTP y de red de los dos clientes posibles
+# (requests y httpx), para que quien descarga pueda capturarlos igual
+ERRORES_ESTADO = (requests.exceptions.HTTPError,)
+ERRORES_RED = (requests.exceptions.RequestException,)
+if httpx is not None:
+    ERRORES_ESTADO += (httpx.HTTPStatusError,)
+    ERRORES_RED += (httpx.HTTPError,)
+
+
+class MetricasTransporte:
+    """Contadores de peticiones y conexiones (seguros entre hilos)"""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._candado:
+            self.peticiones = 0
+            self.conexiones = 0
+            self.handshakes_tls = 0
+
+    def registrar_peticion(self):
+        with self._candado:
+            self.peticiones += 1
+
+    def registrar_conexion(self, tls: bool):
+        with self._candado:
+            self.conexiones += 1
+            if tls:
+                self.handshakes_tls += 1
+
+    def registrar_handshake(self):
+        with self._candado:
+            self.handshakes_tls += 1
+
+    @property
+    def reutilizacion(self) -> float:
+        """Fracción de peticiones servidas por una conexión ya abierta"""
+        if not self.peticiones:
+            return 0.0
+        return max(0.0, 1 - self.conexiones / self.peticiones)
+
+    @property
+    def handshakes_por_mil(self) -> float:
+        """Handshakes TLS por cada 1000 peticiones"""
+        if not self.peticiones:
+            return 0.0
+        return 1000 * self.handshakes_tls / self.peticiones
+
+    def resumen(self) -> Dict:
+        """
+        Returns:
+            Dict: peticiones, conexiones, handshakes_tls, reutilizacion,
+            conexiones_por_mil y handshakes_por_mil
+        """
+        with self._candado:
+            peticiones = self.peticiones
+        return {
+            'peticiones': peticiones,
+            'conexiones': self.conexiones,
+            'handshakes_tls': self.handshakes_tls,
+            'reutilizacion': round(self.reutilizacion, 4),
+            'conexiones_por_mil': round(1000 * self.conexiones / peticiones, 1) if peticiones else 0.0,
+            'handshakes_por_mil': round(self.handshakes_por_mil, 1),
+        }
+
+
+# Métricas globales: todas las sesiones creadas aquí cuentan en ellas
+# salvo que se pasen unas propias
+METRICAS = MetricasTransporte()
+
+
+def opciones_socket(keepalive: Optional[float] = KEEPALIVE_SEGUNDOS):
+    """
+    Opciones de socket de cada conexión nueva: TCP_NODELAY (como urllib3)
+    y, si se indica, keep-alive TCP con sondeos tras `keepalive` segundos
+    """
+    opciones = list(HTTPConnection.default_socket_options)
+    if keepalive:
+        opciones.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # No todas las plataformas exponen los ajustes finos
+        for nombre, valor in (('TCP_KEEPIDLE', int(keepalive)),
+                              ('TCP_KEEPINTVL', max(1, int(keepalive) // 4)),
+                              ('TCP_KEEPCNT', 3)):
+            if hasattr(socket, nombre):
+                opciones.append((socket.IPPROTO_TCP, getattr(socket, nombre), valor))
+    return opciones
+
+
+def _clases_pool(metricas: MetricasTransporte):
+    """Pools de urllib3 que cuentan cada conexión que abren"""
+
+    class PoolHTTPMedido(HTTPConnectionPool):
+        def _new_conn(self):
+            metricas.registrar_conexion(tls=False)
+            return super()._new_conn()
+
+    class PoolHTTPSMedido(HTTPSConnectionPool):
+        def _new_conn(self):
+            metricas.registrar_conexion(tls=True)
+            return super()._new_conn()
+
+    return {'http': PoolHTTPMedido, 'https': PoolHTTPSMedido}
+
+
+class AdaptadorTransporte(HTTPAdapter):
+    """HTTPAdapter con keep-alive TCP y métricas de conexiones"""
+
+    def __init__(self, metricas: MetricasTransporte,
+                 keepalive: Optional[float] = KEEPALIVE_SEGUNDOS, **kwargs):
+        # HTTPAdapter.__init__ ya crea el PoolManager: antes de llamarlo
+        self.metricas = metricas
+        self.keepalive = keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault('socket_options', opciones_socket(self.keepalive))
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = _clases_pool(self.metricas)
+
+    def send(self, request, **kwargs):
+        self.metricas.registrar_peticion()
+        return super().send(request, **kwargs)
+
+
+def crear_sesion(headers: Optional[Dict] = None, pool_por_host: int = POOL_POR_HOST,
+                 max_hosts: int = MAX_HOSTS,
+                 keepalive: Optional[float] = KEEPALIVE_SEGUNDOS,
+                 reintentos: Optional[Retry] = None, bloquear: bool = False,
+                 metricas: Optional[MetricasTransporte] = None) -> requests.Session:
+    """
+    Crear una requests.Session con el transporte configurado
+
+    Args:
+        headers (Dict): Cabeceras enviadas en cada petición
+        pool_por_host (int): Conexiones keep-alive guardadas por host
+            (requests usa 10); debe ser >= hilos que comparten la sesión
+        max_hosts (int): Hosts distintos con pool propio
+        keepalive (float): Segundos de inactividad antes de sondear la
+            conexión (None = sin keep-alive TCP)
+        reintentos (Retry): Política de reintentos de urllib3 (por defecto ninguno)
+        bloquear (bool): Esperar a que quede libre una conexión en lugar de
+            abrir una extra que no se guarda al terminar
+        metricas (MetricasTransporte): Dónde contar (por defecto METRICAS)
+
+    Returns:
+        requests.Session: Sesión lista; sesion.metricas apunta a sus métricas
+    """
+    metricas = metricas or METRICAS
+    sesion = requests.Session()
+    if headers:
+        sesion.headers.update(headers)
+    adaptador = AdaptadorTransporte(metricas, keepalive=keepalive,
+                                    pool_connections=max_hosts, pool_maxsize=pool_por_host,
+                                    max_retries=reintentos if reintentos is not None else 0,
+                                    pool_block=bloquear)
+    sesion.mount('http://', adaptador)
+    sesion.mount('https://', adaptador)
+    sesion.metricas = metricas
+    return sesion
+
+
+_sesion_compartida: Optional[requests.Session] = None
+_candado_compartida = threading.Lock()
+
+
+def sesion_compartida() -> requests.Session:
+    """
+    Sesión única del proceso para las funciones que hacen peticiones sueltas
+
+    Sustituye a requests.get()/post(), que abren una conexión (y un
+    handshake TLS) en cada llamada. Es segura entre hilos para peticiones
+    sin estado; las cookies sí se comparten.
+    """
+    global _sesion_compartida
+    if _sesion_compartida is None:
+        with _candado_compartida:
+            if _sesion_compartida is None:
+                _sesion_compartida = crear_sesion()
+    return _sesion_compartida
+
+
+def crear_cliente_http2(headers: Optional[Dict] = None, pool_por_host: int = POOL_POR_HOST,
+                        max_hosts: int = MAX_HOSTS,
+                        keepalive: Optional[float] = KEEPALIVE_SEGUNDOS,
+                        metricas: Optional[MetricasTransporte] = None):
+    """
+    Crear un cliente httpx con HTTP/2 (requiere `pip install httpx[http2]`)
+
+    Con HTTP/2 todas las peticiones a un host comparten una conexión, así
+    que hay un handshake TLS por host en lugar de uno por hilo. Con
+    servidores que solo hablan HTTP/1.1 se usa HTTP/1.1 con keep-alive.
+    El cliente es seguro entre hilos y su get() admite los mismos
+    argumentos que el de requests (url, params, headers, timeout).
+
+    Returns:
+        httpx.Client: Cliente con las métricas enganchadas
+    """
+    if httpx is None:
+        raise ImportError("HTTP/2 necesita httpx: pip install 'httpx[http2]'")
+    metricas = metricas or METRICAS
+
+    def traza(evento: str, info: Dict):
+        # Eventos de httpcore: una conexión nueva pasa por connect_tcp
+        if evento == 'connection.connect_tcp.complete':
+            metricas.registrar_conexion(tls=False)
+        elif evento == 'connection.start_tls.complete':
+            # La conexión ya se contó al abrir el TCP: solo falta el TLS
+            metricas.registrar_handshake()
+
+    def al_pedir(peticion):
+        metricas.registrar_peticion()
+        peticion.extensions['trace'] = traza
+
+    limites = httpx.Limits(max_connections=pool_por_host * max_hosts,
+                           max_keepalive_connections=pool_por_host * max_hosts,
+                           keepalive_expiry=keepalive)
+    cliente = httpx.Client(http2=True, headers=headers, limits=limites,
+                           follow_redirects=True, event_hooks={'request': [al_pedir]})
+    cliente.metricas = metricas
+    return cliente
+
+
+def crear_cliente(http2: bool = False, **opciones):
+    """
+    requests.Session o cliente HTTP/2 según se pida
+
+    Si se pide HTTP/2 y httpx no está instalado se avisa y se usa una
+    sesión requests con las mismas opciones.
+    """
+    if http2:
+        if httpx is not None:
+            return crear_cliente_http2(**opciones)
+        logger.warning("httpx no está instalado: se usa HTTP/1.1 (requests)")
+    return crear_sesion(**opciones)
+
+
+def traza_aiohttp(metricas: Optional[MetricasTransporte] = None):
+    """
+    TraceConfig de aiohttp que cuenta peticiones y conexiones en las métricas
+
+    Returns:
+        aiohttp.TraceConfig: Para ClientSession(trace_configs=[...])
+    """
+    import aiohttp
+
+    metricas = metricas or METRICAS
+    traza = aiohttp.TraceConfig()
+
+    async def al_empezar(sesion, contexto, params):
+        metricas.registrar_peticion()
+        contexto.tls = params.url.scheme == 'https'
+
+    async def al_conectar(sesion, contexto, params):
+        metricas.registrar_conexion(tls=getattr(contexto, 'tls', False))
+
+    traza.on_request_start.append(al_empezar)
+    traza.on_connection_create_end.append(al_conectar)
+    return traza
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(num_peticiones: int = 1000, num_hilos: int = 16) -> Dict[str, Dict]:
+    """
+    Conexiones por cada 1000 peticiones con cada forma de pedir páginas
+    contra un servidor local
+
+    El servidor local es HTTP: cada conexión nueva contra un sitio HTTPS
+    sería además un handshake TLS, así que conexiones_por_mil es también
+    el número de handshakes por 1000 peticiones en producción.
+
+    Returns:
+        Dict[str, Dict]: Resumen de métricas y peticiones/s por configuración
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from servidor_pruebas import iniciar_servidor_prueba
+
+    servidor, url_base = iniciar_servidor_prueba()
+    urls = [f"{url_base}/pagina/{i}" for i in range(num_peticiones)]
+    resultados = {}
+
+    def medir(nombre, crear_cliente_prueba, hilos=1):
+        """crear_cliente_prueba(metricas) -> función que pide una URL"""
+        metricas = MetricasTransporte()
+        pedir, cerrar = crear_cliente_prueba(metricas)
+        inicio = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=hilos) as pool:
+                list(pool.map(pedir, urls))
+        finally:
+            cerrar()
+        resumen = metricas.resumen()
+        resumen['peticiones_s'] = round(num_peticiones / (time.perf_counter() - inicio), 1)
+        resultados[nombre] = resumen
+        print(f"  {nombre:<32} {resumen['peticiones_s']:8.1f} pet/s  "
+              f"reutilización {resumen['reutilizacion']:6.1%}  "
+              f"{resumen['conexiones_por_mil']:7.1f} conexiones/1000")
+
+    def sin_sesion(metricas):
+        # Lo que hace requests.get(): una sesión (y una conexión) por llamada
+        def pedir(url):
+            with crear_sesion(metricas=metricas) as sesion:
+                sesion.get(url, timeout=10)
+        return pedir, lambda: None
+
+    def con_pool(pool_por_host):
+        def crear(metricas):
+            sesion = crear_sesion(pool_por_host=pool_por_host, metricas=metricas)
+            return (lambda url: sesion.get(url, timeout=10)), sesion.close
+        return crear
+
+    def http2(metricas):
+        cliente = crear_cliente_http2(metricas=metricas)
+        return (lambda url: cliente.get(url, timeout=10)), cliente.close
+
+    print(f"{num_peticiones} peticiones a {url_base}:")
+    try:
+        medir('requests.get (sin sesión)', sin_sesion)
+        medir('sesión compartida, 1 hilo', con_pool(POOL_POR_HOST))
+        medir(f'sesión pool=10, {num_hilos} hilos', con_pool(10), hilos=num_hilos)
+        medir(f'sesión pool={num_hilos}, {num_hilos} hilos', con_pool(num_hilos),
+              hilos=num_hilos)
+        if httpx is not None:
+            medir(f'httpx http2=True, {num_hilos} hilos', http2, hilos=num_hilos)
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark()